@@ -0,0 +1,429 @@
+"""
+Micro-benchmarks of the maze core across grid sizes, complexities and echo radii.
+
+Every case is timed several times and its median, in seconds per operation, is saved
+as a JSON baseline. Comparing two result files flags the cases that got slower by more
+than a threshold, so a change can be measured before and after it lands:
+
+    python bench.py run --save before.json
+    ... make the change ...
+    python bench.py run --save after.json --compare before.json
+    python bench.py compare before.json after.json --threshold 0.1
+
+genMaze, is_reachable, the solvers, detectCollision and resolveCollision are timed as
+they are, and loadMaze against genMaze on a maze file in a temporary directory. The echo reveal (formerly getMazeWithinEchoCircle) is timed through
+RevealEngine over an echo's whole growth, and the maze drawing (formerly drawMaze)
+through each renderer's draw_base() plus, for the chunked renderer, building a full
+view of chunks.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from milkyway import (  # noqa: E402
+    LineOfSight,
+    RevealEngine,
+    Solver,
+    WallIndex,
+    detectCollision,
+    genMaze,
+    is_reachable,
+    loadMaze,
+    resolveCollision,
+    saveMaze,
+    sweptMove,
+)
+from milkyway.app import game  # noqa: E402
+from milkyway.app.render import CellRenderer, ChunkedRenderer, EchoSprites, MazeRenderer  # noqa: E402
+from milkyway.solver import ALGORITHMS  # noqa: E402
+
+SIZES = [(30, 21), (101, 101), (301, 301), (1001, 1001), (2001, 2001)]
+COMPLEXITIES = [0.0, 0.4, 1.0]
+RADII = [64, 256, 1024]  # echo radii in pixels; an echo fades out at about 256.
+COLLISION_PROBES = 1000  # player rects tested per collision benchmark call.
+LAYERS_MAX_PIXELS = 4096  # "layers" draws the whole maze; bigger mazes are not drawn that way.
+VIEW_SIZE = (1280, 900)  # the maze area of the window for "cells" and "chunks".
+SEED = 1
+
+
+class Case:
+    """
+    One benchmark: `make()` builds its inputs and returns (run, reset, ops). run() is the
+    timed call, reset() undoes its effects between calls without being timed, and ops is
+    how many operations one run() does, so results are per operation.
+    """
+
+    def __init__(self, name, params, make):
+        self.name = name
+        self.params = params
+        self.make = make
+
+    @property
+    def id(self):
+        return f"{self.name}[{','.join(f'{key}={value}' for key, value in self.params.items())}]"
+
+
+def sizeName(size):
+    return f"{size[0]}x{size[1]}"
+
+
+_mazes = {}
+
+
+def benchMaze(size):
+    """
+    The maze every benchmark of a size runs on, generated once per size.
+    """
+    maze = _mazes.get(size)
+    if maze is None:
+        _mazes.clear()  # keep one 2001x2001 maze in memory at a time, not several.
+        maze = _mazes[size] = genMaze(*size, seed=SEED)
+    maze.clear_revealed()
+    return maze
+
+
+def probeRects(maze, count):
+    """
+    Player-sized rects at random positions over the maze, most of them touching walls.
+    """
+    rng = random.Random(SEED)
+    width = maze.width * game.CELL_SIZE - game.PLAYER_SIZE
+    height = maze.height * game.CELL_SIZE - game.PLAYER_SIZE
+    return [
+        pygame.Rect(rng.randrange(width), rng.randrange(height), game.PLAYER_SIZE, game.PLAYER_SIZE)
+        for _ in range(count)
+    ]
+
+
+def noReset():
+    pass
+
+
+def makeGenMaze(size, complexity):
+    def run():
+        genMaze(*size, complexity, seed=SEED)
+
+    return run, noReset, 1
+
+
+_maze_files = []  # the TemporaryDirectory maze files are written to, deleted on exit.
+
+
+def makeLoadMaze(size):
+    if not _maze_files:
+        _maze_files.append(tempfile.TemporaryDirectory(prefix="bench-mazes-"))
+    path = os.path.join(_maze_files[0].name, f"{sizeName(size)}.maze")
+    saveMaze(path, benchMaze(size), 0.4, SEED)
+
+    def run():
+        loadMaze(path)
+
+    return run, noReset, 1
+
+
+def makeIsReachable(size):
+    maze = benchMaze(size)
+    end = (size[0] - 1, size[1] - 1)
+
+    def run():
+        is_reachable(maze, (0, 0), end)
+
+    return run, noReset, 1
+
+
+def makeSolve(size, algorithm):
+    maze = benchMaze(size)
+    solve = ALGORITHMS[algorithm]
+    goal = (size[0] - 1, size[1] - 1)
+
+    def run():
+        solve(maze, (0, 0), goal)
+
+    return run, noReset, 1
+
+
+def makeHint(size):
+    """
+    A hint of the next HINT_STEPS cells from a cell whose path is already cached.
+    """
+    maze = benchMaze(size)
+    solver = Solver(maze, (size[0] - 1, size[1] - 1), game.SOLVER_ALGORITHM)
+    solver.path((0, 0))
+
+    def run():
+        solver.path((0, 0), game.HINT_STEPS)
+
+    return run, noReset, 1
+
+
+def makeReveal(size, radius, line_of_sight):
+    """
+    One echo from the middle of the maze, grown tick by tick until it reaches `radius`.
+    """
+    maze = benchMaze(size)
+    origin = (size[0] // 2 * game.CELL_SIZE, size[1] // 2 * game.CELL_SIZE)
+    state = {}
+
+    def reset():
+        maze.clear_revealed()
+        los = LineOfSight(maze, game.LINE_OF_SIGHT_CACHE_SIZE) if line_of_sight else None
+        state["engine"] = RevealEngine(maze, game.CELL_SIZE, los)
+
+    def run():
+        engine = state["engine"]
+        ring_id = engine.add_ring(origin, game.ECHO_RADIUS_START)
+        for r in range(game.ECHO_RADIUS_START, radius + 1, game.ECHO_RADIUS_INCREMENT):
+            engine.set_radius(ring_id, r)
+            engine.tick()
+
+    return run, reset, 1
+
+
+def makeDrawBase(size, mode):
+    maze = benchMaze(size)
+    sprites = EchoSprites(game.ECHO_THICKNESS, game.ECHO_SPRITE_CACHE_BYTES)
+    colors = {
+        "path": game.MAZE_PATH_COLOR,
+        "hidden_wall": game.MAZE_HIDDEN_WALL_COLOR,
+        "shown_wall": game.MAZE_SHOWN_WALL_COLOR,
+        "exit": game.MAZE_EXIT_COLOR,
+    }
+    if mode == "layers":
+        screen = pygame.display.set_mode((size[0] * game.CELL_SIZE, size[1] * game.CELL_SIZE))
+        renderer = MazeRenderer(screen, maze, game.CELL_SIZE, colors, sprites)
+        return renderer.draw_base, noReset, 1
+    screen = pygame.display.set_mode(VIEW_SIZE)
+    if mode == "cells":
+        renderer = CellRenderer(screen, maze, game.CELL_SIZE, colors, sprites, VIEW_SIZE)
+
+        def run():
+            renderer.draw_base()
+            renderer.draw_maze([])  # scales the cells into the maze layer.
+
+        return run, noReset, 1
+
+    renderer = ChunkedRenderer(
+        screen, maze, game.CELL_SIZE, colors, sprites, VIEW_SIZE, game.CHUNK_CELLS,
+        game.MAX_CHUNKS_CACHED,
+    )
+    renderer.follow(pygame.Rect(maze.width // 2 * game.CELL_SIZE, maze.height // 2 * game.CELL_SIZE, 1, 1))
+
+    def run():
+        renderer.draw_base()
+        renderer.draw_maze([])  # builds every chunk in view from the grid.
+
+    return run, noReset, 1
+
+
+def makeCollision(size, function):
+    maze = benchMaze(size)
+    probes = probeRects(maze, COLLISION_PROBES)
+    if function == "sweptMove":
+        wall_index = WallIndex(maze, game.CELL_SIZE, game.WALL_INDEX_BUCKET_CELLS)
+        speed = game.PLAYER_XAXIS_MOVEMENT_SPEED * game.PLAYER_SHIFT_KEY_MULTIPLIER
+
+        def run():
+            for rect in probes:
+                sweptMove(wall_index, rect.x, rect.y, rect.width, rect.height, speed, speed)
+
+        return run, noReset, len(probes)
+
+    collide = {"detectCollision": detectCollision, "resolveCollision": resolveCollision}[function]
+
+    def run():
+        for rect in probes:
+            collide(rect, maze, game.CELL_SIZE)
+
+    return run, noReset, len(probes)
+
+
+def allCases(sizes):
+    cases = []
+    for size in sizes:
+        for complexity in COMPLEXITIES:
+            cases.append(
+                Case("genMaze", {"size": sizeName(size), "complexity": complexity},
+                     lambda size=size, c=complexity: makeGenMaze(size, c))
+            )
+    for size in sizes:
+        cases.append(Case("loadMaze", {"size": sizeName(size)}, lambda size=size: makeLoadMaze(size)))
+    for size in sizes:
+        cases.append(Case("is_reachable", {"size": sizeName(size)},
+                          lambda size=size: makeIsReachable(size)))
+    for size in sizes:
+        for algorithm in ALGORITHMS:
+            cases.append(Case("solve", {"size": sizeName(size), "algorithm": algorithm},
+                              lambda size=size, a=algorithm: makeSolve(size, a)))
+        cases.append(Case("hint", {"size": sizeName(size)}, lambda size=size: makeHint(size)))
+    for size in sizes:
+        for radius in RADII:
+            for los in (True, False):
+                cases.append(
+                    Case("reveal", {"size": sizeName(size), "radius": radius,
+                                    "los": "on" if los else "off"},
+                         lambda size=size, r=radius, los=los: makeReveal(size, r, los))
+                )
+    for size in sizes:
+        modes = ["cells", "chunks"]
+        if max(size) * game.CELL_SIZE <= LAYERS_MAX_PIXELS:
+            modes.insert(0, "layers")
+        for mode in modes:
+            cases.append(Case("draw_base", {"size": sizeName(size), "mode": mode},
+                              lambda size=size, mode=mode: makeDrawBase(size, mode)))
+    for size in sizes:
+        for function in ("detectCollision", "resolveCollision", "sweptMove"):
+            cases.append(Case(function, {"size": sizeName(size)},
+                              lambda size=size, f=function: makeCollision(size, f)))
+    return cases
+
+
+def timeCase(case, min_time, min_samples, max_samples):
+    """
+    Time run() at least min_samples times and until min_time seconds were spent in it.
+
+    Returns:
+        dict: median, min and mean seconds per operation, and the sample count
+    """
+    run, reset, ops = case.make()
+    reset()
+    run()  # warm up caches (e.g. echo sprites, chunk surfaces) before timing.
+    samples = []
+    spent = 0.0
+    while len(samples) < max_samples and (len(samples) < min_samples or spent < min_time):
+        reset()
+        start = time.perf_counter_ns()
+        run()
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        samples.append(elapsed / ops)
+        spent += elapsed
+    return {
+        "params": case.params,
+        "median_s": statistics.median(samples),
+        "min_s": min(samples),
+        "mean_s": statistics.fmean(samples),
+        "samples": len(samples),
+    }
+
+
+def runBenchmarks(sizes, pattern, min_time, min_samples, max_samples):
+    pygame.display.init()
+    results = {}
+    for case in allCases(sizes):
+        if pattern and pattern not in case.id:
+            continue
+        result = results[case.id] = timeCase(case, min_time, min_samples, max_samples)
+        print(f"{case.id:<60} {formatSeconds(result['median_s']):>10}  ({result['samples']} samples)")
+    pygame.display.quit()
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def formatSeconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def compare(baseline, current, threshold, key="median_s"):
+    """
+    Print every case found in both result sets with its change, and flag the ones that
+    got slower by more than `threshold` (0.1 -> 10%).
+
+    Returns:
+        list: ids of the regressed cases
+    """
+    regressions = []
+    base_results, results = baseline["results"], current["results"]
+    print(f"{'case':<60} {'baseline':>10} {'current':>10} {'change':>8}")
+    for case_id, result in results.items():
+        base = base_results.get(case_id)
+        if base is None:
+            print(f"{case_id:<60} {'-':>10} {formatSeconds(result[key]):>10}      new")
+            continue
+        change = result[key] / base[key] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(case_id)
+        elif change < -threshold:
+            flag = "  improved"
+        print(f"{case_id:<60} {formatSeconds(base[key]):>10} {formatSeconds(result[key]):>10} "
+              f"{change:>+8.1%}{flag}")
+    missing = [case_id for case_id in base_results if case_id not in results]
+    if missing:
+        print(f"{len(missing)} baseline case(s) not run this time.")
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}.")
+    return regressions
+
+
+def parseSize(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def loadResults(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the maze core.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", nargs="+", type=parseSize, default=SIZES,
+                            help="maze sizes as WIDTHxHEIGHT (default: 30x21 up to 2001x2001)")
+    run_parser.add_argument("--filter", default="", help="only run cases whose id contains this")
+    run_parser.add_argument("--min-time", type=float, default=0.5,
+                            help="seconds to spend timing each case, at least")
+    run_parser.add_argument("--min-samples", type=int, default=3)
+    run_parser.add_argument("--max-samples", type=int, default=1000)
+    run_parser.add_argument("--save", help="write the results to this JSON file")
+    run_parser.add_argument("--compare", help="compare the results with this baseline file")
+    run_parser.add_argument("--threshold", type=float, default=0.1,
+                            help="slowdown flagged as a regression (default: 0.1 = 10%%)")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="slowdown flagged as a regression (default: 0.1 = 10%%)")
+    compare_parser.add_argument("--key", choices=["median_s", "min_s", "mean_s"], default="median_s")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        current = runBenchmarks(args.sizes, args.filter, args.min_time, args.min_samples,
+                                args.max_samples)
+        if args.save:
+            with open(args.save, "w") as f:
+                json.dump(current, f, indent=2)
+        regressions = []
+        if args.compare:
+            regressions = compare(loadResults(args.compare), current, args.threshold)
+    else:
+        regressions = compare(loadResults(args.baseline), loadResults(args.current),
+                              args.threshold, args.key)
+    sys.exit(1 if regressions else 0)
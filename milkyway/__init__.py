@@ -0,0 +1,53 @@
+"""
+EchoMaze: a maze game played by echolocation.
+
+The package has two layers:
+    milkyway        the core: maze generation, grid and cache, collision, walking distances,
+                    line of sight, echo reveal, the solver, maze prefetching and the frame
+                    profiler. Plain Python and NumPy; importing it does not import pygame.
+    milkyway.app    the game on top of it: rendering, HUD, input, sound and the main loop.
+
+milkyway.cli is the command line entry point (the `echomaze` command); it imports the
+game, and pygame, only once its arguments are parsed.
+"""
+
+from .collision import WallIndex, detectCollision, resolveCollision, sweptMove, wallRectangles
+from .distance import UNREACHABLE, DistanceField
+from .echoes import EchoPool
+from .maze import genMaze, genMazeRows, is_reachable
+from .mazecache import MazeCache, loadMaze, saveMaze
+from .mazegrid import CELL_PATH, CELL_REVEALED, CELL_WALL, MazeGrid
+from .prefetch import MazePrefetcher
+from .profiler import FrameProfiler
+from .reveal import RevealEngine
+from .solver import Solver, astar, bfs, bidirectional_bfs
+from .visibility import LineOfSight
+
+__all__ = [
+    "CELL_PATH",
+    "CELL_REVEALED",
+    "CELL_WALL",
+    "UNREACHABLE",
+    "DistanceField",
+    "EchoPool",
+    "FrameProfiler",
+    "LineOfSight",
+    "MazeCache",
+    "MazeGrid",
+    "MazePrefetcher",
+    "RevealEngine",
+    "Solver",
+    "WallIndex",
+    "astar",
+    "bfs",
+    "bidirectional_bfs",
+    "detectCollision",
+    "genMaze",
+    "genMazeRows",
+    "is_reachable",
+    "loadMaze",
+    "resolveCollision",
+    "saveMaze",
+    "sweptMove",
+    "wallRectangles",
+]
@@ -0,0 +1,3 @@
+"""
+The game: pygame rendering, HUD, input, sound and the main loop (game.runGame).
+"""
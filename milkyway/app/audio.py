@@ -0,0 +1,177 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# the level of a bin of walls, from how many walls are in it: 0, 1, 2-3, 4-7, 8 or more.
+_LEVEL_THRESHOLDS = np.array([1, 2, 4, 8])
+_LEVEL_GAINS = np.array([0.0, 0.35, 0.55, 0.8, 1.0])
+
+
+def echo_profile(origin, walls, max_distance, distance_bins=16, pan_bins=5):
+    """
+    Quantize the walls an echo reflects off into a profile: for every (distance, pan) bin,
+    the level of how many walls are in it. Echoes from similar places get the same
+    profile, and so the same sound.
+
+    Args:
+        origin: (x, y) cell the echo starts from
+        walls: list of (x, y) wall cells the echo reaches
+        max_distance: float - cells; walls further away are not heard
+        distance_bins: int - bins over 0..max_distance
+        pan_bins: int - bins from full left to full right
+
+    Returns:
+        tuple: distance_bins * pan_bins levels, row-major by distance, hashable
+    """
+    levels = np.zeros(distance_bins * pan_bins, dtype=np.int64)
+    if walls:
+        cells = np.asarray(walls, dtype=np.float64)
+        dx = cells[:, 0] - origin[0]
+        dy = cells[:, 1] - origin[1]
+        distance = np.hypot(dx, dy)
+        heard = distance <= max_distance
+        dx, distance = dx[heard], distance[heard]
+        distance_bin = np.minimum(
+            (distance / max_distance * distance_bins).astype(np.int64), distance_bins - 1
+        )
+        pan = dx / np.maximum(distance, 1.0)  # -1 (left) .. 1 (right)
+        pan_bin = np.rint((pan + 1) / 2 * (pan_bins - 1)).astype(np.int64)
+        counts = np.bincount(distance_bin * pan_bins + pan_bin, minlength=len(levels))
+        levels = np.searchsorted(_LEVEL_THRESHOLDS, counts, side="right")
+    return tuple(levels.tolist())
+
+
+def synthesize_echo(
+    profile,
+    sample_rate,
+    max_distance,
+    seconds_per_cell,
+    distance_bins=16,
+    pan_bins=5,
+    pitch=1800.0,
+    ping_seconds=0.03,
+):
+    """
+    Build the sound of an echo: a short ping, then one reflection per non-empty bin of
+    the profile, delayed by the round trip to that distance, attenuated with distance and
+    panned with equal power between the left and right channel.
+
+    Returns:
+        numpy.ndarray: (samples, 2) int16 stereo samples
+    """
+    ping_samples = int(ping_seconds * sample_rate)
+    t = np.arange(ping_samples) / sample_rate
+    ping = np.sin(2 * np.pi * pitch * t) * np.exp(-t / (ping_seconds / 5))
+
+    longest_delay = 2 * max_distance * seconds_per_cell
+    out = np.zeros((int(longest_delay * sample_rate) + ping_samples + 1, 2))
+    out[:ping_samples] += 0.5 * ping[:, np.newaxis]  # the ping itself, centered.
+
+    levels = np.asarray(profile).reshape(distance_bins, pan_bins)
+    for distance_bin, pan_bin in zip(*np.nonzero(levels)):
+        distance = (distance_bin + 0.5) / distance_bins * max_distance
+        start = int(2 * distance * seconds_per_cell * sample_rate)
+        gain = _LEVEL_GAINS[levels[distance_bin, pan_bin]] / (1 + 0.25 * distance) ** 2
+        angle = pan_bin / (pan_bins - 1) * np.pi / 2  # 0 -> left, pi / 2 -> right
+        out[start : start + ping_samples, 0] += gain * np.cos(angle) * ping
+        out[start : start + ping_samples, 1] += gain * np.sin(angle) * ping
+
+    peak = np.abs(out).max()
+    if peak > 1.0:
+        out /= peak
+    return (out * 32767).astype(np.int16)
+
+
+class EchoAudio:
+    """
+    Plays the sound of every echo through pygame.mixer.
+
+    The sound of an echo comes from its profile (see echo_profile()). Sounds are
+    synthesized with NumPy the first time a profile is heard and kept in an LRU cache
+    bounded by bytes, so repeated echoes from the same spot only look up a cached Sound.
+    Mixing happens on SDL's audio thread: play() only starts a Sound on a free channel
+    and returns, and when every channel is busy the echo is not heard rather than
+    cutting another one off.
+
+    If the mixer cannot be opened (no audio device), `enabled` is False and play() does
+    nothing. SDL_AUDIODRIVER=dummy gives a working mixer with no output, e.g. headless.
+    """
+
+    def __init__(
+        self,
+        max_distance,
+        seconds_per_cell,
+        volume,
+        channels,
+        max_bytes,
+        sample_rate=44100,
+        buffer=512,
+    ):
+        """
+        Args:
+            max_distance: float - cells an echo is heard over
+            seconds_per_cell: float - delay per cell of the round trip to a wall
+            volume: float in [0.0, 1.0]
+            channels: int - echoes that can sound at the same time
+            max_bytes: int - memory for cached sounds
+            sample_rate, buffer: mixer settings; a small buffer keeps the latency low
+        """
+        self.max_distance = max_distance
+        self.seconds_per_cell = seconds_per_cell
+        self.volume = volume
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self.sounds = OrderedDict()  # profile -> (Sound, bytes), least recently used first.
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0  # echoes not heard because every channel was busy.
+        try:
+            # 16-bit stereo exactly, as synthesize_echo() produces; SDL converts if needed.
+            if pygame.mixer.get_init() != (sample_rate, -16, 2):
+                pygame.mixer.quit()
+                pygame.mixer.init(sample_rate, -16, 2, buffer, allowedchanges=0)
+            pygame.mixer.set_num_channels(channels)
+            self.enabled = True
+        except pygame.error as error:
+            print("Echo sound is off, the audio device could not be opened:", error)
+            self.enabled = False
+
+    def sound(self, profile):
+        """
+        The Sound of a profile, from the cache or freshly synthesized.
+        """
+        cached = self.sounds.get(profile)
+        if cached is not None:
+            self.sounds.move_to_end(profile)
+            self.hits += 1
+            return cached[0]
+        self.misses += 1
+        samples = synthesize_echo(
+            profile, self.sample_rate, self.max_distance, self.seconds_per_cell
+        )
+        sound = pygame.sndarray.make_sound(samples)
+        sound.set_volume(self.volume)
+        self.sounds[profile] = (sound, samples.nbytes)
+        self.bytes += samples.nbytes
+        while self.bytes > self.max_bytes and len(self.sounds) > 1:
+            _, (_, size) = self.sounds.popitem(last=False)
+            self.bytes -= size
+        return sound
+
+    def play(self, origin, walls):
+        """
+        Play the echo of the `walls` cells heard from the `origin` cell.
+
+        Returns:
+            bool: True if it started playing
+        """
+        if not self.enabled:
+            return False
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            self.dropped += 1  # checked first, so a dropped echo is not synthesized either.
+            return False
+        channel.play(self.sound(echo_profile(origin, walls, self.max_distance)))
+        return True
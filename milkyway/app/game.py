@@ -0,0 +1,991 @@
+import math
+import os
+import time
+import pygame
+import random
+
+from ..collision import WallIndex, sweptMove
+from ..distance import DistanceField
+from ..echoes import EchoPool
+from ..maze import genMaze, genMazeRows
+from ..mazecache import MazeCache
+from ..mazegrid import MazeGrid
+from ..prefetch import MazePrefetcher
+from ..profiler import FrameProfiler
+from ..reveal import RevealEngine
+from ..visibility import LineOfSight
+from .audio import EchoAudio
+from .hud import Hud
+from .inputs import AutoPlayInput, KeyboardInput
+from .render import CellRenderer, ChunkedRenderer, EchoSprites, MazeRenderer, draw_frame_graph
+
+########################################################
+# Config: All config lives here. Self explanatory names.
+########################################################
+
+DEBUG_MODE = False
+GAME_FRAME_RATE = 60  # frames drawn per second, at most; 0 -> uncapped.
+# The game itself advances in fixed steps, SIMULATION_RATE per second whatever the frame rate,
+# several per frame when frames are slow. Speeds, increments and "frames" counts in the config
+# are per step. Past MAX_STEPS_PER_FRAME steps in a frame the game slows down instead.
+SIMULATION_RATE = 60
+MAX_STEPS_PER_FRAME = 5
+# When nothing moves, no echo is alive and no input comes in, the loop sleeps until the next
+# event and only the HUD clock is redrawn, IDLE_FRAME_RATE times per second. Any input brings
+# back the full frame rate. 0 -> always run at the full frame rate.
+IDLE_FRAME_RATE = 10
+
+MAZE_TITLE = "One Maze to Rule Them All"
+MAZE_COMPLEXITY = 0.4  # 0.0 -> very simple (straighter, longer corridors), 1.0 -> very complex (more turns/branching feel)
+
+CELL_SIZE = 20
+MAZE_W, MAZE_H = 30, 21
+MAZE_SEED = None  # seed of the maze generator. None -> a new random maze every game.
+# Levels: reaching the exit moves on to the next maze, until SESSION_LEVELS are solved. The
+# next PREFETCH_DEPTH mazes are generated in worker processes while a level is played.
+SESSION_LEVELS = 1
+PREFETCH_DEPTH = 1  # 0 -> every maze is generated when its level starts.
+# Maze cache: mazes of at least MAZE_CACHE_MIN_CELLS cells are kept on disk once generated,
+# keyed by size, complexity and seed, and loaded instead of carved again. None -> no cache.
+MAZE_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "echomaze")
+MAZE_CACHE_BYTES = 256 * 1024 * 1024  # least recently used maze files are deleted past this.
+MAZE_CACHE_MIN_CELLS = 10_000  # smaller mazes carve in a few ms; not worth a file.
+MAZE_HIDDEN_WALL_COLOR = (0, 0, 0)  # black
+if DEBUG_MODE:
+    MAZE_HIDDEN_WALL_COLOR = (128, 128, 128)  # grey color for debugging purposes.
+MAZE_SHOWN_WALL_COLOR = (173, 216, 230)  # Light blue
+MAZE_PATH_COLOR = (0, 0, 0)  # Black
+MAZE_ENTRANCE_COLOR = (0, 0, 0)  # Black
+MAZE_EXIT_COLOR = (255, 0, 0)  # Red
+
+ECHO_RADIUS_MAX = 25  # TODO: this is not being used. delete it later.
+ECHO_RADIUS_MIN = 0
+ECHO_RADIUS_START = 0
+ECHO_RADIUS_INCREMENT = 4  # how much the radius increases by each frame.
+ECHO_THICKNESS = 2  # width of the echo circle
+ECHO_COLOR = (255, 255, 255)  # White
+MAX_ECHOES_ALLOWED = None  # maximum number of echoes a player can use. None -> unlimited.
+ECHO_POOL_CAPACITY = 4096  # most echoes alive at once; more are dropped until some fade out.
+# "single": one echo per key press or click.
+# "rapid": holding the echo key or mouse button fires an echo every SONAR_INTERVAL_FRAMES frames.
+# "continuous": fires an echo every SONAR_INTERVAL_FRAMES frames without any input.
+SONAR_MODE = "single"
+SONAR_INTERVAL_FRAMES = 4
+ECHO_LINE_OF_SIGHT = True  # echoes only reveal walls the sound can reach; False -> every wall in the ring.
+LINE_OF_SIGHT_CACHE_SIZE = 256  # echo origin cells whose visible walls are kept.
+
+ECHO_ALPHA_MAX = 255
+ECHO_ALPHA_MIN = 0
+ECHO_ALPHA_START = 255
+ECHO_ALPHA_DECREMENT = 4  # how much the alpha decreases by each frame.
+ECHO_ALPHA_STEP = 8  # echo rings are cached per radius and alpha, alpha rounded to this step.
+ECHO_SPRITE_CACHE_BYTES = 32 * 1024 * 1024  # memory for cached echo rings; least recent dropped.
+
+# Echo sound: every echo plays a ping and its reflections off the walls in line of sight,
+# delayed, attenuated and panned by where they are. Needs an audio device; False -> silent.
+ECHO_SOUND = True
+# cells an echo is heard over: as far as its ring grows before fading out.
+ECHO_SOUND_RANGE_CELLS = ECHO_RADIUS_INCREMENT * ECHO_ALPHA_START / ECHO_ALPHA_DECREMENT / CELL_SIZE
+ECHO_SOUND_SECONDS_PER_CELL = 0.01  # delay of a reflection per cell of distance to the wall.
+ECHO_SOUND_VOLUME = 0.5
+ECHO_SOUND_CHANNELS = 16  # echoes heard at the same time; more are silent.
+ECHO_SOUND_CACHE_BYTES = 8 * 1024 * 1024  # memory for cached echo sounds; least recent dropped.
+
+PLAYER_SIZE = 15  # 15x15 pixels
+PLAYER_START_X = 5
+PLAYER_START_Y = 5
+PLAYER_COLOR = (255, 0, 0)  # Red
+PLAYER_BLINK_COLOR = (255, 255, 255)  # White
+PLAYER_COLLISSION_FLASH_FRAMES = 4  # how many frames to show the collision flash.
+PLAYER_EXIT_COLOR = (0, 255, 0)  # Green
+PLAYER_XAXIS_MOVEMENT_SPEED = 4
+PLAYER_YAXIS_MOVEMENT_SPEED = 4
+PLAYER_SHIFT_KEY_MULTIPLIER = 2
+PLAYER_DIAGONAL_MOVEMENT_FACTOR = 0.7071  # factor for diagonal movement.
+WALL_INDEX_BUCKET_CELLS = 8  # collision: wall rectangles are bucketed on a grid of 8x8 cells.
+
+# PLAYER_RIGHT_KEY = pygame.K_d
+# PLAYER_LEFT_KEY = pygame.K_a
+# PLAYER_UP_KEY = pygame.K_w
+# PLAYER_DOWN_KEY = pygame.K_s
+PLAYER_RIGHT_KEY = pygame.K_RIGHT
+PLAYER_LEFT_KEY = pygame.K_LEFT
+PLAYER_UP_KEY = pygame.K_UP
+PLAYER_DOWN_KEY = pygame.K_DOWN
+
+PLAYER_ECHO_KEY = pygame.K_SPACE  # Press space to trigger an echo.
+PLAYER_SHIFT_KEY = pygame.K_LSHIFT
+
+PLAYER_SHOW_ALL_WALLS_KEY = pygame.K_RETURN  # Press return to show all walls.
+PLAYER_HINT_KEY = pygame.K_h  # Press h to show the next steps towards the exit.
+
+# the keys above by action, for the synthetic, recorded and replayed inputs (inputs.py).
+INPUT_BINDINGS = {
+    "up": PLAYER_UP_KEY,
+    "right": PLAYER_RIGHT_KEY,
+    "down": PLAYER_DOWN_KEY,
+    "left": PLAYER_LEFT_KEY,
+    "echo": PLAYER_ECHO_KEY,
+    "shift": PLAYER_SHIFT_KEY,
+    "show_all": PLAYER_SHOW_ALL_WALLS_KEY,
+}
+
+# Hints and auto-play follow the shortest way to the exit. Hints walk down the distance field.
+# Auto-play searches once with SOLVER_ALGORITHM: "bfs", "astar" or "bidirectional". On perfect
+# mazes every search ends up exploring most of the maze, and plain BFS has the least overhead
+# per cell (see the "solve" cases of bench.py).
+SOLVER_ALGORITHM = "bfs"
+HINT_STEPS = 12  # cells of the way shown by a hint.
+HINT_FRAMES = 120  # frames a hint stays on screen.
+HINT_COLOR = (255, 215, 0)  # gold
+AUTOPLAY = False  # the game walks itself to the exit, with the frame rate uncapped.
+
+# UI/HUD config
+HUD_PANEL_WIDTH = 180  # pixels reserved on the right for HUD so it never overlaps maze
+HUD_BG_COLOR = (18, 18, 28)  # dark grey
+HUD_TEXT_COLOR = (220, 220, 235)  # light grey
+HUD_PADDING = 12
+
+# Profiler config: every stage of the main loop is timed into a ring buffer.
+PROFILER_STAGES = (
+    "events",
+    "movement",
+    "collision",
+    "reveal",
+    "maze draw",
+    "echo draw",
+    "hud",
+    "flip/tick",
+)
+PROFILER_HISTORY_FRAMES = 600  # frames kept, 10 seconds at 60 fps.
+PROFILER_GRAPH_KEY = pygame.K_F3  # press F3 to show/hide the frame-time graph in the HUD.
+PROFILER_SHOW_GRAPH = DEBUG_MODE
+PROFILER_STATS_EVERY_FRAMES = 30  # how often the HUD recomputes the percentiles.
+PROFILER_GRAPH_HEIGHT = 60
+PROFILER_GRAPH_COLORS = {"background": (8, 8, 14), "budget": (90, 90, 110), "line": (120, 220, 120)}
+# written on exit, next to the game-over summary. ".json" or ".csv"; None -> not written.
+PROFILER_DUMP_PATH = "frame_profile.json" if DEBUG_MODE else None
+
+# Rendering config
+# "layers": the maze is drawn at CELL_SIZE pixels per cell and only changed rects are redrawn.
+#           Switches to "chunks" by itself when the maze does not fit in WINDOW_MAX_SIZE.
+# "cells":  the maze is drawn at one pixel per cell and scaled to the window, so draw calls
+#           don't depend on the number of cells. The displayed cell size is derived from
+#           the window at runtime.
+# "chunks": a camera follows the player over a maze of any size, drawn at CELL_SIZE from
+#           cached CHUNK_CELLS x CHUNK_CELLS chunk surfaces.
+# In "cells" and "chunks" modes the window can be resized or made fullscreen.
+RENDER_MODE = "layers"
+WINDOW_MAX_SIZE = (1600, 900)  # largest initial window size, HUD included.
+WINDOW_FULLSCREEN = False  # "cells"/"chunks" mode: start in fullscreen.
+WINDOW_FULLSCREEN_KEY = pygame.K_F11  # "cells"/"chunks" mode: press F11 to toggle fullscreen.
+CHUNK_CELLS = 32  # "chunks" mode: cells per side of a chunk.
+MAX_CHUNKS_CACHED = 64  # "chunks" mode: chunk surfaces kept in the LRU cache (raised to fit the view).
+
+# Endless descent: the maze is streamed row by row with genMazeRows and has no exit. Only
+# ENDLESS_WINDOW_ROWS rows are kept. New rows are pulled in as the camera nears the bottom
+# of them and rows far behind the player are dropped. Always rendered in "chunks" mode.
+ENDLESS_MODE = False
+ENDLESS_WINDOW_ROWS = 160  # rows kept in memory; more than two screens of rows plus a scroll.
+ENDLESS_SCROLL_ROWS = 40  # rows pulled in and dropped at a time. even, so the lattice stays aligned.
+
+########################################################
+# Game helpers
+########################################################
+
+def hasPlayerReachedExit(player, exit_rect):
+    """
+    Check if the player has reached fully inside the exit rectangle.
+    """
+    # check if player's center cell is equal to the center of the exit rectangle.
+    player_center_x = player.centerx // CELL_SIZE
+    player_center_y = player.centery // CELL_SIZE
+
+    if (player_center_x == exit_rect.x // CELL_SIZE) and (
+        player_center_y == exit_rect.y // CELL_SIZE
+    ):
+        # check if player's center is fully inside the exit rectangle.
+        if (
+            (player.centerx >= exit_rect.left) and (player.centerx <= exit_rect.right)
+        ) and (
+            (player.centery >= exit_rect.top) and (player.centery <= exit_rect.bottom)
+        ):
+            return True
+        else:
+            return False
+
+    return False
+
+
+def mazeCache(width, height):
+    """
+    The MazeCache mazes of this size are kept in, or None if they are not cached.
+    """
+    if MAZE_CACHE_DIR is None or width * height < MAZE_CACHE_MIN_CELLS:
+        return None
+    return MazeCache(MAZE_CACHE_DIR, MAZE_CACHE_BYTES)
+
+
+def printMazeGenerated(width, height, seconds):
+    """
+    Print how long generating a maze took, and its throughput.
+    """
+    seconds = max(seconds, 1e-9)
+    print(
+        f"successfully generated {width}x{height} maze in {seconds * 1000:.2f} ms "
+        f"({width * height / seconds:,.0f} cells/second)"
+    )
+
+
+def openWindow(size, fullscreen, resizable):
+    """
+    Open (or re-open) the game window. Only the "cells" and "chunks" render modes can
+    resize or go fullscreen.
+    """
+    if fullscreen:
+        return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+    flags = pygame.RESIZABLE if resizable else 0
+    return pygame.display.set_mode(size, flags)
+
+
+########################################################
+# Game
+########################################################
+def runGame(
+    maze_size=(MAZE_W, MAZE_H),
+    frame_rate=GAME_FRAME_RATE,
+    input_source=None,
+    max_frames=None,
+    seed=MAZE_SEED,
+    maze=None,
+    distance_field=None,
+    wall_index=None,
+):
+    """
+    Play one maze: build it, open the window and run the main loop until the player quits,
+    reaches the exit or max_frames have run. Uses the config above.
+
+    Args:
+        maze_size: (width, height) of the maze in cells (the width only in ENDLESS_MODE)
+        frame_rate: int - frames per second to cap the loop at; 0 -> uncapped
+        input_source: KeyboardInput or one of the synthetic inputs; None -> the keyboard
+        max_frames: optional int - stop after this many frames
+        seed: optional int - seed of the maze; None -> a random seed, returned in the result
+        maze: optional MazeGrid generated from `seed` beforehand, used instead of generating
+            it here; its size overrides maze_size. Not used in ENDLESS_MODE.
+        distance_field, wall_index: optional DistanceField to the exit and WallIndex of
+            `maze`, built beforehand, e.g. by a MazePrefetcher
+
+    The game advances in fixed steps of 1 / SIMULATION_RATE seconds, as many per frame as
+    the input's step_count() allows: the wall clock for the keyboard, one per frame for the
+    synthetic inputs, the recorded count for a replay. Nothing else depends on the wall
+    clock, so the same seed, config, per-frame input and steps always play out the same way.
+
+    Returns:
+        dict: solved, echoes_used, frames, steps, idle_frames, time_taken (seconds), the CPU
+            and wall seconds the main loop ran for, seed, the FrameProfiler, and
+            the time.perf_counter() times runGame was called and the first frame was shown
+            (None if no frame was)
+    """
+    started_at = time.perf_counter()
+    first_frame_at = None
+    if input_source is None and AUTOPLAY:
+        input_source = AutoPlayInput(INPUT_BINDINGS, CELL_SIZE, SOLVER_ALGORITHM)
+        frame_rate = 0  # as fast as the game can run.
+    elif input_source is None:
+        input_source = KeyboardInput()
+    if seed is None:
+        seed = random.randrange(2**32)
+
+    # init
+    render_mode = RENDER_MODE
+    player = pygame.Rect(PLAYER_START_X, PLAYER_START_Y, PLAYER_SIZE, PLAYER_SIZE)
+    echoes = EchoPool(ECHO_POOL_CAPACITY)
+    pygame.init()
+    clock = pygame.time.Clock()
+    player_collision_flash_frames = 0  # frames remaining to show a wall-hit flash outline
+    echoes_count = 0  # number of echoes used so far.
+    sonar_cooldown_frames = 0  # "rapid"/"continuous" sonar: frames until the next echo can fire.
+
+    cellSize = CELL_SIZE
+    mazeX, mazeY = maze_size
+    generated_here = ENDLESS_MODE or maze is None
+    start_time = time.perf_counter()
+    if ENDLESS_MODE:
+        # a sliding window of rows over an endless maze, in the same grid format.
+        maze_rows = genMazeRows(mazeX, complexity=MAZE_COMPLEXITY, seed=seed)
+        mazeY = ENDLESS_WINDOW_ROWS
+        maze = MazeGrid(mazeX, mazeY)
+        maze.scroll([next(maze_rows) for _ in range(mazeY)])
+        rows_scrolled = 0  # rows dropped off the top so far.
+        render_mode = "chunks"
+    elif maze is not None:
+        mazeX, mazeY = maze.width, maze.height  # generated ahead, e.g. by a MazePrefetcher.
+    else:
+        maze_cache = mazeCache(mazeX, mazeY)
+        if maze_cache is None:
+            maze = genMaze(mazeX, mazeY, MAZE_COMPLEXITY, seed=seed)
+        else:
+            maze = maze_cache.get(mazeX, mazeY, MAZE_COMPLEXITY, seed)
+            if maze_cache.hits:
+                generated_here = False
+                print(
+                    f"loaded {mazeX}x{mazeY} maze from the cache in "
+                    f"{(time.perf_counter() - start_time) * 1000:.2f} ms"
+                )
+    end_time = time.perf_counter()
+    if generated_here:
+        printMazeGenerated(mazeX, mazeY, end_time - start_time)
+
+    # Window setup
+    mazePixelWidth, mazePixelHeight = mazeX * cellSize, mazeY * cellSize
+    screenWidth, screenHeight = mazePixelWidth + HUD_PANEL_WIDTH, mazePixelHeight
+    if render_mode == "layers" and (
+        screenWidth > WINDOW_MAX_SIZE[0] or screenHeight > WINDOW_MAX_SIZE[1]
+    ):
+        print("maze is larger than the window, scrolling it with a camera.")
+        render_mode = "chunks"
+    if render_mode != "layers":
+        screenWidth = min(screenWidth, WINDOW_MAX_SIZE[0])
+        screenHeight = min(screenHeight, WINDOW_MAX_SIZE[1])
+    windowed_size = (screenWidth, screenHeight)
+    fullscreen = render_mode != "layers" and WINDOW_FULLSCREEN
+
+    screen = openWindow(windowed_size, fullscreen, render_mode != "layers")
+    screenWidth, screenHeight = screen.get_size()
+    pygame.display.set_caption(MAZE_TITLE)
+
+    exit_rect = pygame.Rect(
+        (mazeX - 1) * CELL_SIZE, (mazeY - 1) * CELL_SIZE, CELL_SIZE, CELL_SIZE
+    )  # useful for collision detection.
+
+    # walking distance from every cell to the exit, computed once. the HUD reads it per frame.
+    if ENDLESS_MODE:
+        distance_field = None  # no exit to walk to.
+    else:
+        if distance_field is None:
+            distance_field = DistanceField(maze, [(mazeX - 1, mazeY - 1)])
+        start_cell = (PLAYER_START_X // CELL_SIZE, PLAYER_START_Y // CELL_SIZE)
+        if DEBUG_MODE:
+            print("maze metrics:", distance_field.metrics(start_cell))
+
+    hint_cells = []  # markers of the cells shown by the last hint, in maze pixels.
+    hint_frames = 0  # frames left to show them.
+
+    # walls merged into rectangles once, for swept collision. the player's position is kept in
+    # floats so sub-pixel movement accumulates; the player rect is its floor.
+    if ENDLESS_MODE or wall_index is None:
+        wall_index = WallIndex(maze, CELL_SIZE, WALL_INDEX_BUCKET_CELLS)
+    player_position = [float(player.x), float(player.y)]
+    input_source.start(maze, player)
+
+    # walls revealed by echoes stay revealed; each echo reveals the ring it sweeps from its origin,
+    # up to the first wall in every direction when ECHO_LINE_OF_SIGHT is on.
+    line_of_sight = LineOfSight(maze, LINE_OF_SIGHT_CACHE_SIZE) if ECHO_LINE_OF_SIGHT else None
+    reveal_engine = RevealEngine(maze, CELL_SIZE, line_of_sight)
+
+    # echoes are heard off the walls in line of sight of their origin, whether or not they
+    # only reveal those. the sounds are mixed on the audio thread.
+    echo_audio = sound_line_of_sight = None
+    if ECHO_SOUND:
+        echo_audio = EchoAudio(
+            ECHO_SOUND_RANGE_CELLS,
+            ECHO_SOUND_SECONDS_PER_CELL,
+            ECHO_SOUND_VOLUME,
+            ECHO_SOUND_CHANNELS,
+            ECHO_SOUND_CACHE_BYTES,
+        )
+        sound_line_of_sight = line_of_sight or LineOfSight(maze, LINE_OF_SIGHT_CACHE_SIZE)
+
+    # retained renderer: the maze is drawn once, then only changed rects are redrawn and presented.
+    maze_colors = {
+        "path": MAZE_PATH_COLOR,
+        "hidden_wall": MAZE_HIDDEN_WALL_COLOR,
+        "shown_wall": MAZE_SHOWN_WALL_COLOR,
+        "exit": MAZE_EXIT_COLOR,
+    }
+    echo_sprites = EchoSprites(ECHO_THICKNESS, ECHO_SPRITE_CACHE_BYTES, ECHO_ALPHA_STEP)
+    if render_mode == "cells":
+        renderer = CellRenderer(
+            screen,
+            maze,
+            CELL_SIZE,
+            maze_colors,
+            echo_sprites,
+            (screenWidth - HUD_PANEL_WIDTH, screenHeight),
+            show_exit=not ENDLESS_MODE,
+        )
+    elif render_mode == "chunks":
+        renderer = ChunkedRenderer(
+            screen,
+            maze,
+            CELL_SIZE,
+            maze_colors,
+            echo_sprites,
+            (screenWidth - HUD_PANEL_WIDTH, screenHeight),
+            CHUNK_CELLS,
+            MAX_CHUNKS_CACHED,
+            show_exit=not ENDLESS_MODE,
+        )
+    else:
+        renderer = MazeRenderer(screen, maze, CELL_SIZE, maze_colors, echo_sprites)
+    hud_rect = pygame.Rect(screenWidth - HUD_PANEL_WIDTH, 0, HUD_PANEL_WIDTH, screenHeight)
+
+    # HUD font
+    hud_font = pygame.font.SysFont(None, 22)
+
+    # retained HUD: each line is redrawn only when its text changes.
+    hud = Hud(hud_font, hud_rect, HUD_TEXT_COLOR, HUD_BG_COLOR, HUD_PADDING)
+    hud.add_line("time", "Time: ", "{:.1f}s")
+    hud.add_line("echoes", "# of Echoes Used: ")
+    hud.add_line("fps", "FPS: ")
+    hud.add_line("cpu", "CPU: ", "{:.0%}")
+    if ENDLESS_MODE:
+        hud.add_line("depth", "Depth: ", "{} rows")
+    else:
+        hud.add_line("distance", "To Exit: ", "{} cells")
+        hud.add_line("progress", "Progress: ", "{:.0%}")
+    hud.add_line("frame_label", "Frame p50/95/99 (ms):", "")
+    hud.add_line("frame_percentiles", "  ")
+    hud.add_line("slowest_stage", "  slowest: ")
+
+    profiler = FrameProfiler(PROFILER_STAGES, PROFILER_HISTORY_FRAMES)
+    show_profile_graph = PROFILER_SHOW_GRAPH
+    profile_stats = {}  # stage -> [p50, p95, p99] in ms, refreshed every few frames for the HUD.
+
+    # main loop
+    run = True
+
+    maze_solve_start_time = time.time()
+
+
+    solvedtheMaze = False  # flag to indicate if the maze has been solved.
+    frames = 0  # frames run so far.
+
+    # fixed timestep: the game advances in steps of 1 / SIMULATION_RATE seconds, as many per
+    # frame as the time since the last frame is worth, whatever the frame rate. The player is
+    # drawn between its last two positions by how far the time left over is into the next step.
+    step_seconds = 1.0 / SIMULATION_RATE
+    accumulator = 0.0  # seconds of game time not simulated yet.
+    last_frame_time = time.perf_counter()
+    previous_position = (player_position[0], player_position[1])  # before the last step.
+    steps = 0  # simulation steps run so far.
+
+    # idle scheduling: a frame is busy when something on screen changes; the frame after the
+    # last busy one is still drawn in full, to clear what was shown. then the loop sleeps.
+    was_busy = True
+    drawn_player = None
+    idle_frames = 0  # frames that slept instead of running at the frame rate.
+    # CPU time the process used per second of wall time, for the HUD and the result.
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    cpu_sample = (cpu_start, wall_start)
+    fire_echo = False  # an echo asked for, fired by the next step.
+
+    while run:
+        profiler.start_frame()
+        events = input_source.poll()
+        for event in events:  # handle key presses and mouse clicks.
+            if event.type == pygame.QUIT:
+                run = False
+            if (event.type == pygame.MOUSEBUTTONDOWN) or (
+                event.type == pygame.KEYDOWN and event.key == PLAYER_ECHO_KEY
+            ):
+                fire_echo = True
+
+            if event.type == pygame.KEYDOWN and event.key == PLAYER_HINT_KEY and distance_field is not None:
+                # downhill on the distance field: O(HINT_STEPS), no search in the frame loop.
+                player_cell = (player.centerx // CELL_SIZE, player.centery // CELL_SIZE)
+                marker = CELL_SIZE // 3
+                hint_cells = [
+                    pygame.Rect(
+                        x * CELL_SIZE + (CELL_SIZE - marker) // 2,
+                        y * CELL_SIZE + (CELL_SIZE - marker) // 2,
+                        marker,
+                        marker,
+                    )
+                    for x, y in distance_field.path(*player_cell, HINT_STEPS)[1:]
+                ]
+                hint_frames = HINT_FRAMES
+
+            if event.type == pygame.KEYDOWN and event.key == PLAYER_SHOW_ALL_WALLS_KEY:
+                renderer.set_color("hidden_wall", (128, 128, 128))
+                print("Showing all walls.")
+
+            if render_mode != "layers" and (
+                event.type == pygame.VIDEORESIZE
+                or (event.type == pygame.KEYDOWN and event.key == WINDOW_FULLSCREEN_KEY)
+            ):
+                if event.type == pygame.KEYDOWN:
+                    fullscreen = not fullscreen
+                    screen = openWindow(windowed_size, fullscreen, True)
+                else:
+                    screen = pygame.display.get_surface()  # already resized by pygame.
+                    if not fullscreen:
+                        windowed_size = screen.get_size()
+                # re-derive the displayed cell size and repaint the whole window once.
+                screenWidth, screenHeight = screen.get_size()
+                hud_rect = pygame.Rect(
+                    screenWidth - HUD_PANEL_WIDTH, 0, HUD_PANEL_WIDTH, screenHeight
+                )
+                screen.fill((0, 0, 0))
+                renderer.resize(screen, (screenWidth - HUD_PANEL_WIDTH, screenHeight))
+                renderer.mark_dirty(screen.get_rect())
+                hud.set_rect(hud_rect)
+
+            if event.type == pygame.KEYDOWN and event.key == PROFILER_GRAPH_KEY:
+                show_profile_graph = not show_profile_graph
+                hud.invalidate()  # clears the graph away.
+
+        # find out if any key is pressed by the player.
+        key = input_source.pressed()  # returns immediately.
+
+        # steps due since the last frame. past MAX_STEPS_PER_FRAME the backlog is dropped and
+        # the game slows down, rather than each frame taking longer to catch up than the last.
+        now = time.perf_counter()
+        accumulator += now - last_frame_time
+        last_frame_time = now
+        steps_due = int(accumulator / step_seconds)
+        if steps_due > MAX_STEPS_PER_FRAME:
+            steps_due = MAX_STEPS_PER_FRAME
+            accumulator = steps_due * step_seconds
+        step_count = input_source.step_count(steps_due)
+        if step_count == steps_due:
+            accumulator -= step_count * step_seconds
+        else:
+            accumulator = 0.0  # the input sets the pace: synthetic and replayed input.
+        profiler.lap("events")
+
+        newly_revealed_cells = []
+        for _ in range(step_count):
+            steps += 1
+            if player_collision_flash_frames > 0:
+                player_collision_flash_frames -= 1
+            if hint_frames > 0:
+                hint_frames -= 1
+
+            # sonar: on top of presses, "rapid" repeats while the echo key is held, "continuous" always.
+            if sonar_cooldown_frames > 0:
+                sonar_cooldown_frames -= 1
+            elif SONAR_MODE == "continuous" or (
+                SONAR_MODE == "rapid" and (key[PLAYER_ECHO_KEY] or input_source.mouse_pressed())
+            ):
+                fire_echo = True
+            if fire_echo:
+                fire_echo = False
+                sonar_cooldown_frames = SONAR_INTERVAL_FRAMES
+                if MAX_ECHOES_ALLOWED is not None and echoes_count >= MAX_ECHOES_ALLOWED:
+                    print("Maximum number of echoes allowed reached. No more echoes can be used.")
+                elif len(echoes) < echoes.capacity:  # a full pool drops the echo.
+                    echoes_count += 1
+                    echoes.spawn(
+                        player.centerx,
+                        player.centery,
+                        ECHO_RADIUS_START,
+                        ECHO_ALPHA_START,
+                        reveal_engine.add_ring(player.center, ECHO_RADIUS_START),
+                    )  # schedule the echo to be drawn.
+                    if echo_audio is not None:
+                        origin_cell = (player.centerx // CELL_SIZE, player.centery // CELL_SIZE)
+                        echo_audio.play(
+                            origin_cell,
+                            sound_line_of_sight.walls_between(origin_cell, -1, ECHO_SOUND_RANGE_CELLS),
+                        )
+
+            # movement speed setup
+            if key[pygame.K_LSHIFT] or key[pygame.K_RSHIFT]:
+                x_axis_movement_speed = (
+                    PLAYER_XAXIS_MOVEMENT_SPEED * PLAYER_SHIFT_KEY_MULTIPLIER
+                )
+                y_axis_movement_speed = (
+                    PLAYER_YAXIS_MOVEMENT_SPEED * PLAYER_SHIFT_KEY_MULTIPLIER
+                )
+            else:
+                x_axis_movement_speed = PLAYER_XAXIS_MOVEMENT_SPEED
+                y_axis_movement_speed = PLAYER_YAXIS_MOVEMENT_SPEED
+
+            # movement logic
+            diag_factor = PLAYER_DIAGONAL_MOVEMENT_FACTOR
+            move_x, move_y = 0, 0
+            if key[PLAYER_UP_KEY] and key[PLAYER_RIGHT_KEY]:  # top right
+                move_x, move_y = (
+                    x_axis_movement_speed * diag_factor,
+                    -y_axis_movement_speed * diag_factor,
+                )
+            elif key[PLAYER_RIGHT_KEY] and key[PLAYER_DOWN_KEY]:  # bottom right
+                move_x, move_y = (
+                    x_axis_movement_speed * diag_factor,
+                    y_axis_movement_speed * diag_factor,
+                )
+            elif key[PLAYER_DOWN_KEY] and key[PLAYER_LEFT_KEY]:  # bottom left
+                move_x, move_y = (
+                    -x_axis_movement_speed * diag_factor,
+                    y_axis_movement_speed * diag_factor,
+                )
+            elif key[PLAYER_LEFT_KEY] and key[PLAYER_UP_KEY]:  # top left
+                move_x, move_y = (
+                    -x_axis_movement_speed * diag_factor,
+                    -y_axis_movement_speed * diag_factor,
+                )
+            elif key[PLAYER_LEFT_KEY]:  # left
+                move_x = -x_axis_movement_speed
+            elif key[PLAYER_RIGHT_KEY]:  # right
+                move_x = x_axis_movement_speed
+            elif key[PLAYER_UP_KEY]:  # up
+                move_y = -y_axis_movement_speed
+            elif key[PLAYER_DOWN_KEY]:  # down
+                move_y = y_axis_movement_speed
+
+            profiler.lap("movement")
+
+            # sweep the player along each axis against the wall index; it stops flush at a wall.
+            previous_position = (player_position[0], player_position[1])
+            player_position[0], player_position[1], hit_wall = sweptMove(
+                wall_index,
+                player_position[0],
+                player_position[1],
+                player.width,
+                player.height,
+                move_x,
+                move_y,
+            )
+            player.x, player.y = math.floor(player_position[0]), math.floor(player_position[1])
+            if hit_wall:  # player has collided with a wall.
+                # schedule a brief non-blocking flash; rendering happens in the draw step
+                player_collision_flash_frames = PLAYER_COLLISSION_FLASH_FRAMES
+            profiler.lap("collision")
+
+            # endless descent: when the camera nears the bottom of the rows in memory, pull in new
+            # rows and drop as many from the top. everything in maze coordinates moves up with them.
+            if ENDLESS_MODE and (player.centery + screenHeight) // CELL_SIZE >= mazeY:
+                maze.scroll([next(maze_rows) for _ in range(ENDLESS_SCROLL_ROWS)])
+                rows_scrolled += ENDLESS_SCROLL_ROWS
+                scroll_pixels = ENDLESS_SCROLL_ROWS * CELL_SIZE
+                player_position[1] -= scroll_pixels
+                previous_position = (previous_position[0], previous_position[1] - scroll_pixels)
+                player.y = math.floor(player_position[1])
+                echoes.shift(0, -scroll_pixels)
+                reveal_engine.shift(0, -scroll_pixels)
+                if sound_line_of_sight is not None:
+                    sound_line_of_sight.clear()
+                wall_index = WallIndex(maze, CELL_SIZE, WALL_INDEX_BUCKET_CELLS)
+                renderer.draw_base()
+                newly_revealed_cells = []  # redrawn by draw_base(), and since moved.
+
+            # draw the echoes. concentric cirles in increasing and descreasing brightness.
+
+            # grow and fade every echo in one step. the ones that faded out stop revealing walls.
+            for ring_id in echoes.step(ECHO_RADIUS_INCREMENT, ECHO_ALPHA_DECREMENT):
+                reveal_engine.remove_ring(ring_id)
+            reveal_engine.set_radii(
+                echoes.ring_id[: len(echoes)].tolist(), echoes.radius[: len(echoes)].tolist()
+            )
+
+            # reveal the walls swept by each echo ring since the last step. they stay revealed.
+            newly_revealed_cells.extend(reveal_engine.tick())
+
+            # the player may have gone off the maze. bring it back in.
+            player_position[0] = max(0, min(player_position[0], mazePixelWidth - player.width))
+            player_position[1] = max(0, min(player_position[1], mazePixelHeight - player.height))
+            player.x, player.y = math.floor(player_position[0]), math.floor(player_position[1])
+            profiler.lap("reveal")
+
+            # check if the player has reached the exit.
+            if not ENDLESS_MODE and hasPlayerReachedExit(player, exit_rect):
+                print("You have reached the exit!")
+                solvedtheMaze = True
+                run = False
+                break
+
+        # calculate the echo circles, with per-pixel alpha so transparency reflects echo alpha.
+        circles_to_draw = echoes.circles(ECHO_COLOR, ECHO_ALPHA_MIN, ECHO_ALPHA_MAX)
+
+        # draw everything here: maze, echoes, player. only the parts that changed are redrawn.
+
+        # the player between its last two positions, by how far into the next step we are.
+        blend = 1.0 if solvedtheMaze or step_count != steps_due else accumulator / step_seconds
+        player_moved_to = pygame.Rect(
+            math.floor(previous_position[0] + (player_position[0] - previous_position[0]) * blend),
+            math.floor(previous_position[1] + (player_position[1] - previous_position[1]) * blend),
+            player.width,
+            player.height,
+        )
+        busy = (
+            not IDLE_FRAME_RATE
+            or len(events) > 0
+            or player_moved_to != drawn_player
+            or len(echoes) > 0
+            or len(newly_revealed_cells) > 0
+            or player_collision_flash_frames > 0
+            or hint_frames > 0
+            or show_profile_graph
+            or solvedtheMaze
+        )
+        drawn_player = player_moved_to
+
+        if busy or was_busy:
+            # 1. the newly revealed walls and every changed part of the maze as seen by the
+            #    camera, then the echoes over it.
+            renderer.follow(drawn_player)
+            renderer.reveal_cells(newly_revealed_cells)
+            renderer.draw_maze(circles_to_draw)
+            profiler.lap("maze draw")
+            renderer.draw_echoes()
+
+            # 2. draw the hint, if one is showing, then the player.
+            if hint_frames > 0:
+                for rect in hint_cells:
+                    hint_on_screen = renderer.world_to_screen(rect)
+                    pygame.draw.rect(screen, HINT_COLOR, hint_on_screen)
+                    renderer.add_sprite(hint_on_screen)
+            player_on_screen = renderer.world_to_screen(drawn_player)
+            pygame.draw.rect(screen, (0, 30, 255), player_on_screen)
+            if player_collision_flash_frames > 0:
+                pygame.draw.rect(screen, PLAYER_BLINK_COLOR, player_on_screen, 2)
+            if solvedtheMaze:
+                pygame.draw.rect(
+                    screen, PLAYER_EXIT_COLOR, player_on_screen, 2
+                )  # draw an outline on the player.
+            renderer.add_sprite(player_on_screen)
+        profiler.lap("echo draw")  # the player is drawn with the echoes.
+
+        # 3. update the HUD on the right. only lines whose text changed are redrawn.
+        elapsed_s = max(0.0, time.time() - maze_solve_start_time)
+        hud.set("time", elapsed_s)
+        hud.set("echoes", echoes_count)
+        fps = clock.get_fps()  # infinite when uncapped frames take under a millisecond.
+        hud.set("fps", int(fps) if math.isfinite(fps) else 0)
+        now = (time.process_time(), time.perf_counter())
+        if now[1] - cpu_sample[1] >= 1.0:
+            hud.set("cpu", (now[0] - cpu_sample[0]) / (now[1] - cpu_sample[1]))
+            cpu_sample = now
+        if ENDLESS_MODE:
+            hud.set("depth", rows_scrolled + player.centery // CELL_SIZE)
+        else:
+            player_cell = (player.centerx // CELL_SIZE, player.centery // CELL_SIZE)
+            hud.set("distance", distance_field.distance(*player_cell))
+            hud.set("progress", distance_field.progress(*player_cell, start_cell))
+
+        if show_profile_graph and profiler.frames % PROFILER_STATS_EVERY_FRAMES == 1:
+            profile_stats = profiler.percentiles()
+        if show_profile_graph and profile_stats:
+            hud.set("frame_label", "")
+            hud.set("frame_percentiles", " / ".join(f"{v:.1f}" for v in profile_stats["frame"]))
+            # flip/tick mostly waits for the frame rate cap, so it is left out.
+            hud.set(
+                "slowest_stage",
+                max(PROFILER_STAGES[:-1], key=lambda stage: profile_stats[stage][1]),
+            )
+        else:
+            hud.set("frame_label", None)
+            hud.set("frame_percentiles", None)
+            hud.set("slowest_stage", None)
+
+        for rect in hud.draw(screen):
+            renderer.mark_dirty(rect)
+        if show_profile_graph:
+            graph_rect = pygame.Rect(
+                hud_rect.left + HUD_PADDING,
+                hud.bottom,
+                HUD_PANEL_WIDTH - 2 * HUD_PADDING,
+                PROFILER_GRAPH_HEIGHT,
+            )
+            draw_frame_graph(
+                screen,
+                graph_rect,
+                profiler.frame_times_ms(),
+                1000 / (frame_rate or GAME_FRAME_RATE),
+                PROFILER_GRAPH_COLORS,
+            )
+            renderer.mark_dirty(graph_rect)
+        profiler.lap("hud")
+
+        # finally, refresh the changed parts of the screen.
+        if busy or was_busy:
+            renderer.present()
+        else:
+            renderer.present_unchanged()  # the HUD clock only.
+        if frames == 0:
+            first_frame_at = time.perf_counter()  # the first frame is on screen.
+        if busy:
+            clock.tick(frame_rate)  # frame_rate frames per second; 0 -> as fast as possible.
+        else:
+            # idle: sleep until an event or the next HUD clock tick. the time slept is not
+            # simulated, nothing would move in it; one step is due for whatever woke us.
+            # nor is it profiled: the sleep would swamp the frame times of actual work.
+            profiler.lap("flip/tick")
+            input_source.wait(1000 // IDLE_FRAME_RATE)
+            profiler.skip()
+            clock.tick()
+            idle_frames += 1
+            accumulator = step_seconds
+            last_frame_time = time.perf_counter()
+        was_busy = busy
+        profiler.lap("flip/tick")
+        frames += 1
+        if max_frames is not None and frames >= max_frames:
+            run = False
+        # end of main loop.
+
+    # measure the time taken from the start of the main loop to the end of the main loop.
+    maze_solve_end_time = time.time()
+    return {
+        "solved": solvedtheMaze,
+        "echoes_used": echoes_count,
+        "frames": frames,
+        "steps": steps,
+        "idle_frames": idle_frames,
+        "cpu_seconds": time.process_time() - cpu_start,
+        "wall_seconds": time.perf_counter() - wall_start,
+        "time_taken": round(maze_solve_end_time - maze_solve_start_time, 2),
+        "seed": seed,
+        "started_at": started_at,
+        "first_frame_at": first_frame_at,
+        "profiler": profiler,
+    }
+
+
+def runSession(
+    levels=SESSION_LEVELS,
+    maze_size=(MAZE_W, MAZE_H),
+    frame_rate=GAME_FRAME_RATE,
+    input_source=None,
+    max_frames=None,
+    seed=MAZE_SEED,
+    prefetch_depth=PREFETCH_DEPTH,
+):
+    """
+    Play up to `levels` mazes in a row in the same window, moving on to the next one when
+    the exit is reached. Level n is played on the maze of seed + n. While a level is
+    played, the next prefetch_depth mazes, with their distance fields and wall indexes,
+    are made in worker processes, so the next level starts without waiting for them.
+
+    Args:
+        levels: int - mazes to solve, at least 1
+        prefetch_depth: int - mazes generated ahead; 0 -> each one when its level starts
+        the others: as for runGame(); max_frames counts the frames of all levels
+
+    Returns:
+        dict: the runGame() result of the whole session: solved if every level was, echoes,
+            frames and time summed, the first level's seed and times, the last level's
+            profiler. Plus "levels" (levels solved), "level_waits" (ms each level waited for
+            its maze) and "level_gaps" (ms from reaching an exit to the next level's first
+            frame).
+
+    Raises:
+        ValueError: levels is less than 1
+    """
+    if levels < 1:
+        raise ValueError(f"a session needs at least 1 level, got {levels}")
+    if seed is None:
+        seed = random.randrange(2**32)
+    if ENDLESS_MODE:  # no exit, so no next level.
+        return runGame(maze_size, frame_rate, input_source, max_frames, seed)
+
+    results = []
+    ended_at = []  # time.perf_counter() at the end of each level.
+    frames_left = max_frames
+    seeds = [(seed + level) % 2**32 for level in range(levels)]
+    with MazePrefetcher(
+        *maze_size,
+        MAZE_COMPLEXITY,
+        seeds,
+        prefetch_depth,
+        mazeCache(*maze_size),
+        CELL_SIZE,
+        WALL_INDEX_BUCKET_CELLS,
+    ) as prefetcher:
+        for level in range(levels):
+            level_seed, maze, distance_field, wall_index = prefetcher.next()
+            if prefetcher.loaded[-1]:
+                print(
+                    f"loaded {maze.width}x{maze.height} maze from the cache in "
+                    f"{prefetcher.generate_seconds[-1] * 1000:.2f} ms"
+                )
+            else:
+                printMazeGenerated(maze.width, maze.height, prefetcher.generate_seconds[-1])
+            print(
+                f"level {level + 1}/{levels}: {maze.width}x{maze.height} maze {level_seed} "
+                f"ready after {prefetcher.waits[-1] * 1000:.1f} ms"
+            )
+            result = runGame(
+                maze_size,
+                frame_rate,
+                input_source,
+                frames_left,
+                level_seed,
+                maze,
+                distance_field,
+                wall_index,
+            )
+            ended_at.append(time.perf_counter())
+            results.append(result)
+            if frames_left is not None:
+                frames_left -= result["frames"]
+            if not result["solved"] or frames_left == 0:
+                break
+
+    session = dict(results[-1])
+    session.update(
+        solved=len(results) == levels and results[-1]["solved"],
+        echoes_used=sum(result["echoes_used"] for result in results),
+        frames=sum(result["frames"] for result in results),
+        steps=sum(result["steps"] for result in results),
+        idle_frames=sum(result["idle_frames"] for result in results),
+        cpu_seconds=sum(result["cpu_seconds"] for result in results),
+        wall_seconds=sum(result["wall_seconds"] for result in results),
+        time_taken=round(sum(result["time_taken"] for result in results), 2),
+        seed=seed,
+        started_at=results[0]["started_at"],
+        first_frame_at=results[0]["first_frame_at"],
+        levels=sum(result["solved"] for result in results),
+        level_waits=[wait * 1000 for wait in prefetcher.waits],
+        level_gaps=[
+            (result["first_frame_at"] - previous_end) * 1000
+            for result, previous_end in zip(results[1:], ended_at)
+            if result["first_frame_at"] is not None
+        ],
+    )
+    return session
+
+
+def printGameOver(result):
+    """
+    Print the end-of-game summary for a runGame() result, and write the frame profile if
+    PROFILER_DUMP_PATH is set.
+    """
+    time_taken_to_solve_maze = result["time_taken"]
+    profiler = result["profiler"]
+
+    # TODO: do an animation of the the win. confetti ? snowfall ? fireworks ?
+    # Also, render the entire maze with all walls shown.
+
+    print("########################################################")
+    print("Game over.")
+    print("######")
+    print("Maze seed:         ", result["seed"])
+    if "levels" in result:
+        print("Levels solved:     ", result["levels"])
+    print("Total echoes used: ", result["echoes_used"])
+    print("Total time taken:  ", time_taken_to_solve_maze, "seconds")
+    if result["solved"]:
+        print("time taken to solve: ", time_taken_to_solve_maze, "seconds")
+    else:
+        print("maze unsolved in:", time_taken_to_solve_maze, "seconds")
+    print(
+        f"CPU time per wall second: {result['cpu_seconds'] / max(result['wall_seconds'], 1e-9):.3f} s "
+        f"({result['idle_frames']} of {result['frames']} frames idle)"
+    )
+    if result.get("level_gaps"):
+        waits, gaps = result["level_waits"][1:], result["level_gaps"]
+        print("Between levels (ms), mean / max:")
+        print(f"  maze wait                 {sum(waits) / len(waits):.2f} / {max(waits):.2f}")
+        print(f"  exit to next first frame  {sum(gaps) / len(gaps):.2f} / {max(gaps):.2f}")
+    print("######")
+    print("Frame time p50/p95/p99 (ms) over the last", min(profiler.frames, profiler.history), "frames:")
+    for stage, values in profiler.percentiles().items():
+        print(f"  {stage:<10}", " / ".join(f"{v:.2f}" for v in values))
+    if PROFILER_DUMP_PATH:
+        profiler.dump(PROFILER_DUMP_PATH)
+        print("Frame profile written to", PROFILER_DUMP_PATH)
+    print("########################################################")
+
@@ -0,0 +1,142 @@
+import pygame
+
+
+class GlyphAtlas:
+    """
+    One pre-rendered surface per character, so changing text such as numbers is composed
+    by blitting glyphs instead of rasterizing the whole string with the font every time.
+    Glyphs are rendered on first use and kept.
+    """
+
+    def __init__(self, font, color, background):
+        self.font = font
+        self.color = color
+        self.background = background
+        self.glyphs = {}  # character -> Surface
+        for char in "0123456789.-%/ ":
+            self.glyph(char)
+
+    def glyph(self, char):
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self.font.render(char, True, self.color, self.background)
+        return glyph
+
+    def blit_text(self, surface, text, position):
+        """
+        Blit `text` glyph by glyph with its top-left corner at `position`.
+
+        Returns:
+            int: width of the text in pixels
+        """
+        x, y = position
+        blits = []
+        for char in text:
+            glyph = self.glyph(char)
+            blits.append((glyph, (x, y)))
+            x += glyph.get_width()
+        surface.blits(blits, doreturn=False)
+        return x - position[0]
+
+
+class Hud:
+    """
+    Retained-mode HUD panel: a column of "label value" lines.
+
+    A line's label is rendered once. Its value is formatted every time it is set, but
+    only redrawn, from the glyph atlas, when the formatted text changed. draw() returns
+    the rects that changed, so the panel only joins the display's dirty rects on frames
+    where something in it did.
+
+    Typical frame:
+        hud.set("fps", clock.get_fps())
+        for rect in hud.draw(screen):
+            renderer.mark_dirty(rect)
+    """
+
+    def __init__(self, font, rect, text_color, background_color, padding, line_spacing=6):
+        """
+        Args:
+            font: pygame.font.Font
+            rect: pygame.Rect - the panel on the screen
+            text_color, background_color: (r, g, b)
+            padding: int - pixels between the panel edges and the text
+            line_spacing: int - pixels between lines
+        """
+        self.font = font
+        self.rect = pygame.Rect(rect)
+        self.text_color = text_color
+        self.background_color = background_color
+        self.padding = padding
+        self.line_height = font.get_height() + line_spacing
+        self.atlas = GlyphAtlas(font, text_color, background_color)
+        self.lines = {}  # name -> [label surface, format, text shown, text to show]
+        self._full_repaint = True
+
+    def add_line(self, name, label, fmt="{}"):
+        """
+        Add a line below the others. It stays blank until set().
+
+        Args:
+            name: key for set()
+            label: str - fixed text, rendered once
+            fmt: str - format of the value, e.g. "{:.1f}s"
+        """
+        label_surface = self.font.render(label, True, self.text_color, self.background_color)
+        self.lines[name] = [label_surface, fmt, None, None]
+
+    def set(self, name, value):
+        """
+        Set the value of a line. None hides the line, label included.
+        """
+        line = self.lines[name]
+        line[3] = None if value is None else line[1].format(value)
+
+    @property
+    def bottom(self):
+        """
+        Screen y just below the last line, e.g. to draw a widget under the text.
+        """
+        return self.rect.top + self.padding + len(self.lines) * self.line_height
+
+    def set_rect(self, rect):
+        """
+        Move the panel, e.g. after the window was resized. Everything is redrawn.
+        """
+        self.rect = pygame.Rect(rect)
+        self._full_repaint = True
+
+    def invalidate(self):
+        """
+        Redraw the whole panel on the next draw().
+        """
+        self._full_repaint = True
+
+    def draw(self, surface):
+        """
+        Redraw the lines whose text changed (everything after set_rect/invalidate).
+
+        Returns:
+            list: screen rects that were redrawn
+        """
+        dirty = []
+        if self._full_repaint:
+            surface.fill(self.background_color, self.rect)
+            dirty.append(self.rect.copy())
+        left = self.rect.left + self.padding
+        width = self.rect.width - 2 * self.padding
+        top = self.rect.top + self.padding
+        for line in self.lines.values():
+            label_surface, fmt, shown, text = line
+            if text != shown or self._full_repaint:
+                line_rect = pygame.Rect(left, top, width, self.line_height)
+                surface.fill(self.background_color, line_rect)
+                if text is not None:
+                    surface.blit(label_surface, (left, top))
+                    self.atlas.blit_text(surface, text, (left + label_surface.get_width(), top))
+                line[2] = text
+                if not self._full_repaint:
+                    dirty.append(line_rect)
+            top += self.line_height
+        self._full_repaint = False
+        return dirty
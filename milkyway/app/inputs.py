@@ -0,0 +1,341 @@
+import random
+
+import pygame
+
+from ..solver import Solver
+
+# Bits of one frame of recorded input, see RecordingInput and ReplayInput.
+INPUT_UP = 1
+INPUT_RIGHT = 2
+INPUT_DOWN = 4
+INPUT_LEFT = 8
+INPUT_SHIFT = 16
+INPUT_ECHO = 32  # echo key pressed or mouse clicked this frame.
+INPUT_ECHO_HELD = 64  # echo key or mouse button held, for "rapid" sonar.
+INPUT_SHOW_ALL = 128  # show-all-walls key pressed this frame.
+# held keys recorded as bits, by binding name.
+HELD_INPUT_BITS = (("up", INPUT_UP), ("right", INPUT_RIGHT), ("down", INPUT_DOWN), ("left", INPUT_LEFT))
+
+
+class PressedKeys(set):
+    """
+    A set of held keys that can stand in for pygame.key.get_pressed(): keys[k] is True
+    when k is held.
+    """
+
+    def __getitem__(self, key):
+        return key in self
+
+
+class KeyboardInput:
+    """
+    Input from the real keyboard and mouse. The game loop calls, once per frame:
+        poll() -> this frame's events
+        pressed() -> the held keys, indexable by key code
+        step_count(due) -> simulation steps to run this frame, given the `due` ones the
+            time since the last frame is worth
+        mouse_pressed() -> whether the left mouse button is held, once per step
+    start(maze, player) once the maze and the player exist, and wait(timeout_ms) after a
+    frame in which nothing changed.
+    """
+
+    def start(self, maze, player):
+        pass
+
+    def wait(self, timeout_ms):
+        """
+        Sleep until an event comes in or timeout_ms have passed. The event is left in the
+        queue for poll().
+        """
+        event = pygame.event.wait(timeout_ms)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+
+    def step_count(self, due):
+        return due
+
+    def poll(self):
+        return pygame.event.get()
+
+    def pressed(self):
+        return pygame.key.get_pressed()
+
+    def mouse_pressed(self):
+        return pygame.mouse.get_pressed()[0]
+
+
+class SyntheticInput(KeyboardInput):
+    """
+    Base of the generated inputs. Real events are still drained, so the window keeps
+    responding and can be closed; generated key presses are added as KEYDOWN events.
+
+    bindings: dict with the "up", "right", "down", "left", "echo", "shift" and "show_all"
+        key codes.
+    """
+
+    def __init__(self, bindings, seed=None):
+        self.bindings = bindings
+        self.rng = random.Random(seed)
+        self.held = PressedKeys()
+        self.maze = None
+        self.player = None
+
+    def start(self, maze, player):
+        self.maze = maze
+        self.player = player
+
+    def poll(self):
+        events = pygame.event.get()
+        self.held = PressedKeys()
+        for key in self.step():
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+        return events
+
+    def pressed(self):
+        return self.held
+
+    def wait(self, timeout_ms):
+        pass  # the next frame's input is generated, not waited for.
+
+    def step_count(self, due):
+        return 1  # one step per generated frame, however fast frames are drawn.
+
+    def mouse_pressed(self):
+        return False
+
+    def step(self):
+        """
+        Update self.held for this frame and return the keys pressed this frame.
+        """
+        return []
+
+
+class RandomWalkInput(SyntheticInput):
+    """
+    Holds a random direction, diagonals included, for a random number of frames, with
+    shift now and then, and fires an echo every `echo_every` frames.
+    """
+
+    DIRECTIONS = (("up",), ("right",), ("down",), ("left",), ("up", "right"),
+                  ("right", "down"), ("down", "left"), ("left", "up"))
+
+    def __init__(self, bindings, seed=None, echo_every=60):
+        super().__init__(bindings, seed)
+        self.echo_every = echo_every
+        self.frame = 0
+        self.direction = ()
+        self.frames_left = 0
+
+    def step(self):
+        self.frame += 1
+        if self.frames_left <= 0:
+            self.direction = self.rng.choice(self.DIRECTIONS)
+            if self.rng.random() < 0.2:
+                self.direction += ("shift",)
+            self.frames_left = self.rng.randint(5, 30)
+        self.frames_left -= 1
+        self.held.update(self.bindings[name] for name in self.direction)
+        if self.echo_every and self.frame % self.echo_every == 0:
+            return [self.bindings["echo"]]
+        return []
+
+
+class EchoSpamInput(RandomWalkInput):
+    """
+    A random walk that fires an echo every frame.
+    """
+
+    def __init__(self, bindings, seed=None):
+        super().__init__(bindings, seed, echo_every=1)
+
+
+class CellWalkerInput(SyntheticInput):
+    """
+    Walks the player from cell to neighbouring cell, holding the arrow towards the next
+    cell and lining the player up with the corridor on the way. The next cell is chosen
+    by next_cell() once the player is fully inside the current one. Fires an echo every
+    `echo_every` frames.
+    """
+
+    # (dx, dy, key name), clockwise from up.
+    HEADINGS = ((0, -1, "up"), (1, 0, "right"), (0, 1, "down"), (-1, 0, "left"))
+    HEADING_INDEX = {(dx, dy): i for i, (dx, dy, _) in enumerate(HEADINGS)}
+
+    def __init__(self, bindings, cell_size, seed=None, echo_every=30):
+        super().__init__(bindings, seed)
+        self.cell_size = cell_size
+        self.echo_every = echo_every
+        self.frame = 0
+        self.heading = 1  # start going right.
+        self.target = None  # the cell being walked into.
+
+    def start(self, maze, player):
+        super().start(maze, player)
+        self.heading = 1
+        self.target = None
+
+    def next_cell(self, cell):
+        """
+        The neighbouring cell to walk into from `cell`, or None to stand still.
+        """
+        return None
+
+    def step(self):
+        self.frame += 1
+        player, cell_size = self.player, self.cell_size
+        cell = (player.centerx // cell_size, player.centery // cell_size)
+        cell_rect = pygame.Rect(cell[0] * cell_size, cell[1] * cell_size, cell_size, cell_size)
+        if self.target is None or (cell == self.target and cell_rect.contains(player)):
+            self.target = self.next_cell(cell)
+            if self.target is not None:
+                dx, dy = self.target[0] - cell[0], self.target[1] - cell[1]
+                self.heading = self.HEADING_INDEX[(dx, dy)]
+        if self.target is not None:
+            self.held.add(self.bindings[self.HEADINGS[self.heading][2]])
+            # line up with the corridor while walking along it.
+            target_rect = pygame.Rect(
+                self.target[0] * cell_size, self.target[1] * cell_size, cell_size, cell_size
+            )
+            dx, dy, _ = self.HEADINGS[self.heading]
+            if dx and player.top < target_rect.top:
+                self.held.add(self.bindings["down"])
+            elif dx and player.bottom > target_rect.bottom:
+                self.held.add(self.bindings["up"])
+            elif dy and player.left < target_rect.left:
+                self.held.add(self.bindings["right"])
+            elif dy and player.right > target_rect.right:
+                self.held.add(self.bindings["left"])
+        if self.echo_every and self.frame % self.echo_every == 0:
+            return [self.bindings["echo"]]
+        return []
+
+
+class WallHugInput(CellWalkerInput):
+    """
+    Follows the wall on its right hand, cell by cell, which walks every corridor of a
+    perfect maze and ends at the exit.
+    """
+
+    def next_cell(self, cell):
+        # right hand on the wall: try right, straight, left, then back.
+        for turn in (1, 0, -1, 2):
+            dx, dy, _ = self.HEADINGS[(self.heading + turn) % 4]
+            x, y = cell[0] + dx, cell[1] + dy
+            if self.maze.in_bounds(x, y) and not self.maze.is_wall(x, y):
+                return (x, y)
+        return None
+
+
+class AutoPlayInput(CellWalkerInput):
+    """
+    Walks the shortest way to the exit, the bottom-right cell, found with a Solver.
+    """
+
+    def __init__(self, bindings, cell_size, algorithm="bfs", echo_every=30):
+        super().__init__(bindings, cell_size, echo_every=echo_every)
+        self.algorithm = algorithm
+        self.solver = None
+
+    def start(self, maze, player):
+        super().start(maze, player)
+        self.solver = Solver(maze, (maze.width - 1, maze.height - 1), self.algorithm)
+
+    def next_cell(self, cell):
+        following = self.solver.next_cell(cell)
+        return None if following == cell else following
+
+
+class RecordingInput:
+    """
+    Wraps another input and records what the game reads from it as one byte per frame,
+    a bitmask of the INPUT_* bits, and the simulation steps run in that frame. Only input
+    that changes how the game plays out is kept: held directions, shift, echo presses and
+    holds, and show-all.
+    """
+
+    def __init__(self, inner, bindings):
+        self.inner = inner
+        self.bindings = bindings
+        self.masks = bytearray()  # one mask per frame.
+        self.steps = bytearray()  # steps run per frame.
+        self._pressed_mask = 0  # bits of this frame's events.
+
+    def start(self, maze, player):
+        self.inner.start(maze, player)
+
+    def poll(self):
+        events = self.inner.poll()
+        echo_key, show_all_key = self.bindings["echo"], self.bindings["show_all"]
+        mask = 0
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN or (
+                event.type == pygame.KEYDOWN and event.key == echo_key
+            ):
+                mask |= INPUT_ECHO
+            elif event.type == pygame.KEYDOWN and event.key == show_all_key:
+                mask |= INPUT_SHOW_ALL
+        self._pressed_mask = mask
+        return events
+
+    def pressed(self):
+        # the game reads the held keys once per frame, right after the events: the
+        # frame's mask is complete here.
+        keys = self.inner.pressed()
+        mask = self._pressed_mask
+        for name, bit in HELD_INPUT_BITS:
+            if keys[self.bindings[name]]:
+                mask |= bit
+        if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
+            mask |= INPUT_SHIFT
+        if keys[self.bindings["echo"]] or self.inner.mouse_pressed():
+            mask |= INPUT_ECHO_HELD
+        self.masks.append(mask)
+        return keys
+
+    def wait(self, timeout_ms):
+        self.inner.wait(timeout_ms)
+
+    def step_count(self, due):
+        count = self.inner.step_count(due)
+        self.steps.append(count)
+        return count
+
+    def mouse_pressed(self):
+        return self.inner.mouse_pressed()
+
+
+class ReplayInput(SyntheticInput):
+    """
+    Plays back the per-frame masks and steps of a RecordingInput. Frames past the end of
+    the recording have no input. With no steps recorded, one step runs per frame.
+    """
+
+    def __init__(self, bindings, masks, steps=None):
+        super().__init__(bindings)
+        self.masks = masks
+        self.steps = steps
+        self.frame = 0
+
+    def step_count(self, due):
+        frame = self.frame - 1  # step() has moved on to the next frame.
+        if self.steps is None or frame >= len(self.steps):
+            return 1
+        return self.steps[frame]
+
+    def step(self):
+        mask = self.masks[self.frame] if self.frame < len(self.masks) else 0
+        self.frame += 1
+        bindings = self.bindings
+        for name, bit in HELD_INPUT_BITS:
+            if mask & bit:
+                self.held.add(bindings[name])
+        if mask & INPUT_SHIFT:
+            self.held.add(bindings["shift"])
+        if mask & INPUT_ECHO_HELD:
+            self.held.add(bindings["echo"])
+        pressed = []
+        if mask & INPUT_ECHO:
+            pressed.append(bindings["echo"])
+        if mask & INPUT_SHOW_ALL:
+            pressed.append(bindings["show_all"])
+        return pressed
@@ -0,0 +1,592 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+from ..mazegrid import CELL_REVEALED, CELL_WALL, runs
+
+
+def _draw_walls(surface, cells, cell_size, colors):
+    """
+    Draw the hidden and revealed walls of a block of cells onto a surface, as horizontal
+    runs: one fill per run instead of one per cell.
+
+    Args:
+        surface: pygame.Surface - cell (0, 0) of the block goes at its top-left corner
+        cells: 2D uint8 array of cell flags (a MazeGrid view)
+        cell_size: int - pixels per cell
+        colors: dict with "hidden_wall" and "shown_wall" colors
+    """
+    for y, row in enumerate(cells):
+        top = y * cell_size
+        for flag, color in (
+            (CELL_WALL, colors["hidden_wall"]),
+            (CELL_REVEALED, colors["shown_wall"]),
+        ):
+            starts, ends = runs(row & flag != 0)
+            for start, end in zip(starts, ends):
+                surface.fill(
+                    color, (start * cell_size, top, (end - start) * cell_size, cell_size)
+                )
+
+
+def _merge_rects(rects):
+    """
+    Fewer, larger rects covering at least the same area. A rect inside another is dropped,
+    and two overlapping rects become their union when that is no bigger than both. The
+    largest rects are placed first, so rings nested around one origin collapse into one.
+    """
+    merged = []
+    for rect in sorted(rects, key=lambda rect: rect.width * rect.height, reverse=True):
+        for i, other in enumerate(merged):
+            if other.contains(rect):
+                break
+            if other.colliderect(rect):
+                union = other.union(rect)
+                if union.width * union.height <= (
+                    other.width * other.height + rect.width * rect.height
+                ):
+                    merged[i] = union
+                    break
+        else:
+            merged.append(rect)
+    return merged
+
+
+def draw_frame_graph(surface, rect, frame_times_ms, budget_ms, colors):
+    """
+    Draw the most recent frame times as a line graph, one frame per pixel column, with a
+    horizontal line at the frame budget. The scale fits twice the budget or the slowest
+    frame shown, whichever is larger.
+
+    Args:
+        surface: pygame.Surface
+        rect: pygame.Rect - where to draw the graph
+        frame_times_ms: 1D array of frame times, oldest first
+        budget_ms: float - time available per frame, e.g. 1000 / fps
+        colors: dict with "background", "budget" and "line" colors
+    """
+    surface.fill(colors["background"], rect)
+    times = frame_times_ms[-rect.width :]
+    top = max(2 * budget_ms, float(times.max()) if len(times) else 0.0)
+    budget_y = rect.bottom - 1 - int(budget_ms / top * (rect.height - 1))
+    pygame.draw.line(surface, colors["budget"], (rect.left, budget_y), (rect.right - 1, budget_y))
+    if len(times) < 2:
+        return
+    ys = rect.bottom - 1 - (times / top * (rect.height - 1)).astype(int)
+    pygame.draw.lines(
+        surface, colors["line"], False, list(zip(range(rect.left, rect.left + len(times)), ys.tolist()))
+    )
+
+
+class EchoSprites:
+    """
+    Pre-rendered echo rings, keyed by radius, color and alpha rounded to `alpha_step`.
+
+    Echoes grow and fade in lockstep, so the same few rings are drawn over and over; each
+    is drawn once onto its own (2 * radius + 1) square per-pixel alpha surface and reused.
+    The least recently used rings are dropped once the surfaces take more than
+    `max_bytes`.
+    """
+
+    def __init__(self, thickness, max_bytes, alpha_step=8):
+        """
+        Args:
+            thickness: int - width of the rings in pixels
+            max_bytes: int - memory budget for the cached surfaces
+            alpha_step: int - alpha values are rounded to multiples of this
+        """
+        self.thickness = thickness
+        self.max_bytes = max_bytes
+        self.alpha_step = alpha_step
+        self.sprites = OrderedDict()  # (radius, r, g, b, alpha) -> Surface, LRU first.
+        self.nbytes = 0
+
+    def get(self, radius, color):
+        """
+        The ring surface for a radius and an (r, g, b, a) color. Its center is at (radius, radius).
+        """
+        step = self.alpha_step
+        alpha = min(255, (color[3] + step // 2) // step * step)
+        key = (radius, color[0], color[1], color[2], alpha)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            return sprite
+
+        size = 2 * radius + 1
+        sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+        sprite.fill((0, 0, 0, 0))
+        pygame.draw.circle(
+            sprite, (color[0], color[1], color[2], alpha), (radius, radius), radius, self.thickness
+        )
+        self.sprites[key] = sprite
+        self.nbytes += size * size * 4
+        while self.nbytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.nbytes -= evicted.get_width() * evicted.get_height() * 4
+        return sprite
+
+
+class MazeRenderer:
+    """
+    Retained-mode renderer for the maze area of the screen.
+
+    Layers:
+        maze layer: paths, hidden walls and the exit, drawn once. Revealed walls are
+            painted onto it as they are revealed, so it always holds the current maze.
+        echoes: cached ring sprites from EchoSprites, each blended over its own
+            bounding box, so the cost follows the size of the rings, not of the window.
+
+    The screen is never cleared. Each frame only the rects that changed (last frame's
+    echoes and sprites, this frame's echoes, newly revealed cells) are recomposed from the
+    layers, and only those rects plus whatever the caller marks dirty are presented
+    with pygame.display.update().
+
+    Typical frame:
+        renderer.reveal_cells(newly_revealed)
+        renderer.draw_maze(circles)
+        renderer.draw_echoes()
+        ... draw sprites on renderer.screen, renderer.add_sprite(rect) for each ...
+        ... draw the HUD, renderer.mark_dirty(hud_rect) ...
+        renderer.present()
+    """
+
+    def __init__(self, screen, maze, cell_size, colors, echo_sprites, show_exit=True):
+        """
+        Args:
+            screen: pygame.Surface - the display surface
+            maze: MazeGrid - the maze to draw
+            cell_size: int - pixels per cell
+            colors: dict with "path", "hidden_wall", "shown_wall" and "exit" colors
+            echo_sprites: EchoSprites - cache the echo rings are drawn from
+            show_exit: bool - draw the exit in the bottom-right cell
+        """
+        self.screen = screen
+        self.maze = maze
+        self.exit_cell = (maze.width - 1, maze.height - 1) if show_exit else None
+        self.cell_size = cell_size
+        self.colors = dict(colors)
+        self.echo_sprites = echo_sprites
+        self.scale = 1.0  # screen pixels per maze (world) pixel.
+
+        self._restore_rects = []  # maze-area rects to recompose from the layers this frame.
+        self._echoes = []  # (bounding box, box clipped to the maze area, radius, color) this frame.
+        self._dirty_rects = []  # screen rects to present this frame.
+        self._previous_echo_rects = []  # echo bounding boxes drawn last frame.
+        self._previous_sprite_rects = []  # sprites drawn over the maze last frame.
+        self._sprite_rects = []
+
+        self._layout()
+        self.draw_base()
+
+    def _layout(self):
+        """
+        Size the layers. The maze is drawn at its full pixel size at the top-left of the screen.
+        """
+        self.maze_rect = pygame.Rect(
+            0, 0, self.maze.width * self.cell_size, self.maze.height * self.cell_size
+        )
+        self._create_layers()
+
+    def _create_layers(self):
+        self.maze_layer = pygame.Surface(self.maze_rect.size).convert()
+        self._previous_echo_rects = []
+        self._previous_sprite_rects = []
+
+    def resize(self, screen, area_size):
+        """
+        Re-fit the maze after the window was resized or switched to/from fullscreen.
+        """
+        self.screen = screen
+        self.area_size = area_size
+        self._layout()
+        self.draw_base()
+
+    def follow(self, rect):
+        """
+        Keep a rect (in maze pixel coordinates) in view. The whole maze is always on screen here.
+        """
+
+    def world_to_screen(self, rect):
+        """
+        Screen rect for a rect in maze pixel coordinates.
+        """
+        return pygame.Rect(rect)
+
+    def _restore(self, rect):
+        """
+        Copy the maze under a screen rect back onto the screen.
+        """
+        self.screen.blit(self.maze_layer, rect, rect)
+
+    def draw_base(self):
+        """
+        Redraw the whole maze layer from the grid and schedule a full recompose.
+        Called once at startup, and again only when a maze color changes.
+        """
+        cell_size = self.cell_size
+        layer = self.maze_layer
+        layer.fill(self.colors["path"])
+        _draw_walls(layer, self.maze.cells, cell_size, self.colors)
+
+        if self.exit_cell is not None:
+            layer.fill(self.colors["exit"], self._cell_rect(*self.exit_cell))
+        self._restore_rects.append(self.maze_rect.copy())
+
+    def set_color(self, name, color):
+        """
+        Change one of the maze colors and redraw the maze layer if it actually changed.
+        """
+        if self.colors.get(name) != color:
+            self.colors[name] = color
+            self.draw_base()
+
+    def reveal_cells(self, cells):
+        """
+        Paint newly revealed walls onto the maze layer.
+
+        Args:
+            cells: iterable of (x, y) cells, as returned by RevealEngine.tick()
+        """
+        shown_wall_color = self.colors["shown_wall"]
+        exit_cell = self.exit_cell
+        for x, y in cells:
+            if (x, y) == exit_cell:
+                continue
+            rect = self._cell_rect(x, y)
+            self.maze_layer.fill(shown_wall_color, rect)
+            self._restore_rects.append(rect)
+
+    def draw_maze(self, circles):
+        """
+        Recompose every changed rect of the maze area from the layers: the revealed cells,
+        last frame's echoes and sprites, and the boxes of this frame's echo rings, which
+        draw_echoes() then draws over the maze.
+
+        Args:
+            circles: list of ((x, y), radius, (r, g, b, a)) in pixel coordinates
+        """
+        self._echoes = []
+        echo_rects = []
+        for center, radius, color in circles:
+            box = pygame.Rect(
+                center[0] - radius, center[1] - radius, 2 * radius + 1, 2 * radius + 1
+            )
+            rect = box.clip(self.maze_rect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+            self._echoes.append((box, rect, radius, color))
+            echo_rects.append(rect)
+
+        restore_rects = self._restore_rects
+        restore_rects.extend(self._previous_echo_rects)
+        restore_rects.extend(self._previous_sprite_rects)
+        restore_rects.extend(echo_rects)
+        restore_rects = _merge_rects(restore_rects)
+        for rect in restore_rects:
+            self._restore(rect)
+
+        self._dirty_rects.extend(restore_rects)
+        self._restore_rects = []
+        self._previous_echo_rects = echo_rects
+
+    def draw_echoes(self):
+        """
+        Blend the echo rings passed to draw_maze() over the maze. Every ring box lies in the
+        area draw_maze() just recomposed, so each ring is blended exactly once.
+        """
+        echo_sprites = self.echo_sprites
+        self.screen.blits(
+            [
+                (echo_sprites.get(radius, color), rect.topleft, rect.move(-box.x, -box.y))
+                for box, rect, radius, color in self._echoes
+            ],
+            doreturn=False,
+        )
+
+    def add_sprite(self, rect):
+        """
+        Record a rect drawn directly on the screen over the maze this frame, so that it is
+        presented now and restored from the layers next frame.
+        """
+        rect = pygame.Rect(rect).clip(self.maze_rect)
+        self._sprite_rects.append(rect)
+        self._dirty_rects.append(rect)
+
+    def mark_dirty(self, rect):
+        """
+        Present a screen rect outside the maze area (e.g. the HUD) this frame.
+        """
+        self._dirty_rects.append(pygame.Rect(rect))
+
+    def present(self):
+        """
+        Push this frame's dirty rects to the display.
+        """
+        pygame.display.update(self._dirty_rects)
+        self._dirty_rects = []
+        self._previous_sprite_rects = self._sprite_rects
+        self._sprite_rects = []
+
+    def present_unchanged(self):
+        """
+        Push only the rects marked dirty, for a frame that drew nothing over the maze. Last
+        frame's sprites stay on screen, and are restored by the next frame that is drawn.
+        """
+        pygame.display.update(self._dirty_rects)
+        self._dirty_rects = []
+
+    def _cell_rect(self, x, y):
+        cell_size = self.cell_size
+        return pygame.Rect(x * cell_size, y * cell_size, cell_size, cell_size)
+
+
+class CellRenderer(MazeRenderer):
+    """
+    Renders the maze at one pixel per cell and scales it to the window.
+
+    The cell surface is written straight from the grid through pygame.surfarray, and is
+    scaled into the maze layer with pygame.transform.scale at most once per frame (only on
+    frames where cells changed). Draw calls therefore no longer depend on the number of
+    cells, and the display cell size is derived from the window, which may be resized.
+    Echoes and sprites keep using maze pixel coordinates and are mapped with the scale.
+    """
+
+    def __init__(
+        self, screen, maze, cell_size, colors, echo_sprites, area_size, show_exit=True
+    ):
+        """
+        Args:
+            area_size: (width, height) of the part of the window the maze may use
+            the other arguments are the same as MazeRenderer.
+        """
+        self.area_size = area_size
+        self.cell_surface = pygame.Surface((maze.width, maze.height)).convert()
+        self._needs_rescale = False
+        super().__init__(screen, maze, cell_size, colors, echo_sprites, show_exit)
+
+    def _layout(self):
+        """
+        Fit the maze into the area, keeping cells square.
+        """
+        area_width, area_height = self.area_size
+        self.display_cell_size = max(
+            min(area_width / self.maze.width, area_height / self.maze.height), 1e-3
+        )
+        self.scale = self.display_cell_size / self.cell_size
+        self.maze_rect = pygame.Rect(
+            0,
+            0,
+            max(1, int(self.maze.width * self.display_cell_size)),
+            max(1, int(self.maze.height * self.display_cell_size)),
+        )
+        self._create_layers()
+
+    def draw_base(self):
+        palette = np.zeros((256, 3), dtype=np.uint8)
+        palette[:] = self.colors["path"]
+        palette[CELL_WALL] = self.colors["hidden_wall"]
+        palette[CELL_WALL | CELL_REVEALED] = self.colors["shown_wall"]
+        # surfarray arrays are indexed [x, y], the grid is [y, x].
+        pygame.surfarray.blit_array(self.cell_surface, palette[self.maze.cells].swapaxes(0, 1))
+        if self.exit_cell is not None:
+            self.cell_surface.set_at(self.exit_cell, self.colors["exit"])
+        self._needs_rescale = True
+
+    def reveal_cells(self, cells):
+        exit_cell = self.exit_cell
+        cells = [cell for cell in cells if cell != exit_cell]
+        if not cells:
+            return
+        xs, ys = zip(*cells)
+        pixels = pygame.surfarray.pixels3d(self.cell_surface)
+        pixels[list(xs), list(ys)] = self.colors["shown_wall"]
+        del pixels  # unlock the surface.
+        self._needs_rescale = True
+
+    def draw_maze(self, circles):
+        if self._needs_rescale:
+            pygame.transform.scale(self.cell_surface, self.maze_rect.size, self.maze_layer)
+            self._restore_rects.append(self.maze_rect.copy())
+            self._needs_rescale = False
+
+        scale = self.scale
+        super().draw_maze(
+            [
+                ((int(center[0] * scale), int(center[1] * scale)), int(radius * scale), color)
+                for center, radius, color in circles
+            ]
+        )
+
+    def world_to_screen(self, rect):
+        scale = self.scale
+        rect = pygame.Rect(rect)
+        return pygame.Rect(
+            int(rect.x * scale),
+            int(rect.y * scale),
+            max(1, int(rect.width * scale)),
+            max(1, int(rect.height * scale)),
+        )
+
+
+class ChunkedRenderer(MazeRenderer):
+    """
+    Renders a viewport of a maze that may be far larger than the screen.
+
+    A camera follows the player. The maze is drawn in fixed-size square chunks of cells,
+    each chunk its own surface built from the grid on first use and kept in an LRU cache,
+    so only chunks that intersect the viewport are ever drawn and memory stays bounded
+    however large the maze is. Revealed walls are painted into the cached chunks that
+    hold them; chunks that are not cached pick them up from the grid when rebuilt.
+
+    Everything passed in (echoes, sprites) stays in maze (world) pixel coordinates;
+    world_to_screen() applies the camera.
+    """
+
+    def __init__(
+        self,
+        screen,
+        maze,
+        cell_size,
+        colors,
+        echo_sprites,
+        area_size,
+        chunk_cells,
+        max_chunks,
+        show_exit=True,
+    ):
+        """
+        Args:
+            area_size: (width, height) of the viewport, the part of the window the maze uses
+            chunk_cells: int - cells per chunk side
+            max_chunks: int - how many chunk surfaces to keep cached
+            the other arguments are the same as MazeRenderer.
+        """
+        self.area_size = area_size
+        self.chunk_cells = chunk_cells
+        self.chunk_pixels = chunk_cells * cell_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (chunk x, chunk y) -> Surface, least recently used first.
+        self.camera = pygame.Rect(0, 0, 0, 0)  # the viewport in maze pixel coordinates.
+        super().__init__(screen, maze, cell_size, colors, echo_sprites, show_exit)
+
+    def _layout(self):
+        world_width = self.maze.width * self.cell_size
+        world_height = self.maze.height * self.cell_size
+        self.maze_rect = pygame.Rect(
+            0, 0, min(self.area_size[0], world_width), min(self.area_size[1], world_height)
+        )
+        self.camera.size = self.maze_rect.size
+        self.world_rect = pygame.Rect(0, 0, world_width, world_height)
+        # keep at least every chunk a viewport can touch, twice over, so scrolling back is free.
+        visible = (self.maze_rect.width // self.chunk_pixels + 2) * (
+            self.maze_rect.height // self.chunk_pixels + 2
+        )
+        self.max_chunks = max(self.max_chunks, 2 * visible)
+        self._previous_echo_rects = []
+        self._previous_sprite_rects = []
+
+    def draw_base(self):
+        """
+        Drop every cached chunk; they are rebuilt from the grid as they come into view.
+        """
+        self.chunks.clear()
+        self._restore_rects.append(self.maze_rect.copy())
+
+    def follow(self, rect):
+        """
+        Center the camera on a rect in maze pixel coordinates, clamped to the maze.
+        Moving the camera makes the whole viewport dirty.
+        """
+        camera = self.camera.copy()
+        camera.center = rect.center
+        camera.clamp_ip(self.world_rect)
+        if camera.topleft != self.camera.topleft:
+            self.camera = camera
+            self._restore_rects.append(self.maze_rect.copy())
+
+    def reveal_cells(self, cells):
+        shown_wall_color = self.colors["shown_wall"]
+        exit_cell = self.exit_cell
+        cell_size = self.cell_size
+        chunk_cells = self.chunk_cells
+        for x, y in cells:
+            if (x, y) == exit_cell:
+                continue
+            chunk_x, chunk_y = x // chunk_cells, y // chunk_cells
+            chunk = self.chunks.get((chunk_x, chunk_y))
+            if chunk is None:
+                continue  # built with the revealed wall when it is next needed.
+            chunk.fill(
+                shown_wall_color,
+                (
+                    (x - chunk_x * chunk_cells) * cell_size,
+                    (y - chunk_y * chunk_cells) * cell_size,
+                    cell_size,
+                    cell_size,
+                ),
+            )
+            rect = self.world_to_screen(
+                (x * cell_size, y * cell_size, cell_size, cell_size)
+            ).clip(self.maze_rect)
+            if rect.width and rect.height:
+                self._restore_rects.append(rect)
+
+    def draw_maze(self, circles):
+        left, top = self.camera.topleft
+        super().draw_maze(
+            [((center[0] - left, center[1] - top), radius, color) for center, radius, color in circles]
+        )
+
+    def world_to_screen(self, rect):
+        return pygame.Rect(rect).move(-self.camera.x, -self.camera.y)
+
+    def _restore(self, rect):
+        """
+        Blit the parts of every chunk that overlap a screen rect.
+        """
+        world = rect.move(self.camera.topleft)
+        chunk_pixels = self.chunk_pixels
+        for chunk_y in range(world.top // chunk_pixels, (world.bottom - 1) // chunk_pixels + 1):
+            for chunk_x in range(world.left // chunk_pixels, (world.right - 1) // chunk_pixels + 1):
+                chunk_rect = pygame.Rect(
+                    chunk_x * chunk_pixels, chunk_y * chunk_pixels, chunk_pixels, chunk_pixels
+                )
+                area = world.clip(chunk_rect)
+                if area.width == 0 or area.height == 0:
+                    continue
+                self.screen.blit(
+                    self._chunk(chunk_x, chunk_y),
+                    (area.x - self.camera.x, area.y - self.camera.y),
+                    area.move(-chunk_rect.x, -chunk_rect.y),
+                )
+
+    def _chunk(self, chunk_x, chunk_y):
+        """
+        The surface of a chunk, from the cache or freshly drawn from the grid.
+        """
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = pygame.Surface((self.chunk_pixels, self.chunk_pixels)).convert()
+        chunk.fill(self.colors["path"])
+        cell_size = self.cell_size
+        x0, y0 = chunk_x * self.chunk_cells, chunk_y * self.chunk_cells
+        cells = self.maze.view(x0, y0, x0 + self.chunk_cells, y0 + self.chunk_cells)
+        _draw_walls(chunk, cells, cell_size, self.colors)
+        if self.exit_cell is not None:
+            exit_x, exit_y = self.exit_cell[0] - x0, self.exit_cell[1] - y0
+            if 0 <= exit_x < self.chunk_cells and 0 <= exit_y < self.chunk_cells:
+                chunk.fill(
+                    self.colors["exit"],
+                    (exit_x * cell_size, exit_y * cell_size, cell_size, cell_size),
+                )
+
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
@@ -0,0 +1,80 @@
+"""
+Command line entry point of the game, installed as the `echomaze` command.
+
+    echomaze --size 61x41 --seed 42 --fps 60 --complexity 0.7 --levels 5
+
+The game, and pygame with it, is imported only after the arguments are parsed, so
+--help and argument errors return at once. On exit the cold start is reported: the time
+from entering main() to the first frame on screen, and the part of it spent importing.
+SDL_VIDEODRIVER=dummy with --frames runs it headless, e.g. to measure the cold start.
+"""
+
+import argparse
+import time
+
+
+def parseSize(text):
+    try:
+        width, height = text.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {text!r}") from None
+
+
+def main(argv=None):
+    launched_at = time.perf_counter()
+    parser = argparse.ArgumentParser(prog="echomaze", description="Find the exit by echolocation.")
+    parser.add_argument("--size", type=parseSize, help="maze size as WIDTHxHEIGHT in cells")
+    parser.add_argument("--seed", type=int, help="maze seed (default: a new maze every game)")
+    parser.add_argument("--fps", type=int,
+                        help="frame rate cap; 0 -> uncapped. The game runs at the same speed at any rate")
+    parser.add_argument("--complexity", type=float,
+                        help="0.0 -> long straight corridors, 1.0 -> more turns")
+    parser.add_argument("--levels", type=int, help="mazes to solve in a row")
+    parser.add_argument("--prefetch", type=int,
+                        help="mazes generated ahead in worker processes; 0 -> none")
+    parser.add_argument("--maze-file",
+                        help="play a maze file from the maze cache, e.g. one attached to a bug report")
+    parser.add_argument("--frames", type=int, help="quit after this many frames")
+    args = parser.parse_args(argv)
+    if args.levels is not None and args.levels < 1:
+        parser.error(f"--levels: expected at least 1, got {args.levels}")
+
+    import pygame
+
+    from .app import game
+
+    imported_at = time.perf_counter()
+    if args.complexity is not None:
+        game.MAZE_COMPLEXITY = args.complexity
+    frame_rate = game.GAME_FRAME_RATE if args.fps is None else args.fps
+    if args.maze_file:
+        from .mazecache import loadMaze
+
+        try:
+            maze, header = loadMaze(args.maze_file)
+        except (OSError, ValueError) as error:
+            parser.error(f"--maze-file: {error}")
+        result = game.runGame(
+            (maze.width, maze.height),
+            frame_rate=frame_rate,
+            max_frames=args.frames,
+            seed=header["seed"],
+            maze=maze,
+        )
+    else:
+        result = game.runSession(
+            game.SESSION_LEVELS if args.levels is None else args.levels,
+            args.size or (game.MAZE_W, game.MAZE_H),
+            frame_rate=frame_rate,
+            max_frames=args.frames,
+            seed=game.MAZE_SEED if args.seed is None else args.seed,
+            prefetch_depth=game.PREFETCH_DEPTH if args.prefetch is None else args.prefetch,
+        )
+    game.printGameOver(result)
+    if result["first_frame_at"] is not None:
+        print(
+            f"Cold start: first frame {(result['first_frame_at'] - launched_at) * 1000:.0f} ms "
+            f"after launch, {(imported_at - launched_at) * 1000:.0f} ms of it importing the game."
+        )
+    pygame.quit()
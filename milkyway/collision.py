@@ -0,0 +1,339 @@
+from array import array
+
+from .mazegrid import CELL_WALL, runs
+
+
+def wallRectangles(maze):
+    """
+    Merge the wall cells of a maze into rectangles, greedily.
+
+    Each row is split into horizontal runs of walls. A rectangle grows down into the next
+    row while a run there covers all its columns; what is left of that run, on either
+    side of the rectangles it carries on, starts new rectangles. A rectangle ends at the
+    first row that does not cover it. So a wall ending on a crossing wall (an L or a T
+    lying on its bar) carries on through it, and corridors of walls become a single
+    rectangle. Every wall cell ends up in exactly one rectangle.
+
+    Args:
+        maze: MazeGrid
+
+    Yields:
+        tuple: (x0, y0, x1, y1) in cells, x1 and y1 exclusive.
+    """
+    open_rects = []  # (x0, x1, y0) of the rectangles still growing downwards, left to right.
+    for y, row in enumerate(maze.cells):
+        starts, ends = runs(row & CELL_WALL != 0)
+        continued = []
+        i = 0
+        for start, end in zip(starts, ends):
+            x = start  # the run's columns left of x are taken.
+            while i < len(open_rects) and open_rects[i][1] <= end:
+                x0, x1, y0 = open_rects[i]
+                i += 1
+                if x0 < start:
+                    yield (x0, y0, x1, y)  # not covered by this run: it ends here.
+                    continue
+                if x < x0:
+                    continued.append((x, x0, y))
+                continued.append((x0, x1, y0))
+                x = x1
+            if x < end:
+                continued.append((x, end, y))
+        for x0, x1, y0 in open_rects[i:]:
+            yield (x0, y0, x1, y)
+        open_rects = continued
+    for x0, x1, y0 in open_rects:
+        yield (x0, y0, x1, maze.height)
+
+
+class WallIndex:
+    """
+    The walls of a maze as merged rectangles, bucketed on a coarse grid. The outside of
+    the maze counts as wall too, so nothing can be swept out of it.
+
+    Built once when the maze is built. A query touches only the buckets under the
+    queried box, so its cost follows the number of wall rectangles nearby, not the
+    size of the maze or the length of a move.
+    """
+
+    def __init__(self, maze, cell_size, bucket_cells=8, packed=None):
+        """
+        Args:
+            maze: MazeGrid
+            cell_size: int - pixels per cell
+            bucket_cells: int - cells per side of a bucket
+            packed: optional pack() of an index of the same maze and settings, used
+                instead of merging the walls again
+        """
+        self.cell_size = cell_size
+        self.bucket_pixels = bucket_cells * cell_size
+        self.columns = -(-maze.width // bucket_cells)
+        self.rows = -(-maze.height // bucket_cells)
+        self.rects = array("i")  # left, top, right, bottom in pixels; 4 entries per rectangle.
+        if packed is not None:
+            rects, ends, rect_ids = (array("i", buffer) for buffer in packed)
+            self.rects = rects
+            self.buckets = [rect_ids[start:end] for start, end in zip([0, *ends], ends)]
+            return
+        self.buckets = [array("i") for _ in range(self.columns * self.rows)]
+
+        for x0, y0, x1, y1 in wallRectangles(maze):
+            self._add(x0, y0, x1, y1, bucket_cells)
+
+        # the border: one rectangle along each side, just outside the maze. queries outside
+        # the maze are clamped to the edge buckets, which is where these are stored.
+        width, height = maze.width, maze.height
+        for x0, y0, x1, y1 in (
+            (-1, -1, width + 1, 0),
+            (-1, height, width + 1, height + 1),
+            (-1, 0, 0, height),
+            (width, 0, width + 1, height),
+        ):
+            self._add(x0, y0, x1, y1, bucket_cells)
+
+    def _add(self, x0, y0, x1, y1, bucket_cells):
+        """
+        Store a rectangle given in cells and list it in every bucket it touches.
+        """
+        cell_size = self.cell_size
+        rect_id = len(self.rects) // 4
+        self.rects.extend((x0 * cell_size, y0 * cell_size, x1 * cell_size, y1 * cell_size))
+        # clamped to the bucket grid, so the border lands in the edge buckets.
+        bx0 = min(max(x0 // bucket_cells, 0), self.columns - 1)
+        bx1 = min(max((x1 - 1) // bucket_cells, 0), self.columns - 1)
+        by0 = min(max(y0 // bucket_cells, 0), self.rows - 1)
+        by1 = min(max((y1 - 1) // bucket_cells, 0), self.rows - 1)
+        for bucket_y in range(by0, by1 + 1):
+            row_start = bucket_y * self.columns
+            for bucket_x in range(bx0, bx1 + 1):
+                self.buckets[row_start + bucket_x].append(rect_id)
+
+    def __len__(self):
+        return len(self.rects) // 4 - 4  # not counting the border.
+
+    def pack(self):
+        """
+        The index as three bytes buffers: the rectangles, where each bucket's list of
+        rectangle ids ends, and all those lists back to back. A few large buffers pickle
+        far faster than one small array per bucket, e.g. to hand the index to another
+        process.
+        """
+        ends = array("i")
+        rect_ids = array("i")
+        for bucket in self.buckets:
+            rect_ids.extend(bucket)
+            ends.append(len(rect_ids))
+        return self.rects.tobytes(), ends.tobytes(), rect_ids.tobytes()
+
+    def query(self, left, top, right, bottom):
+        """
+        Wall rectangles in the buckets under a box given in pixels.
+
+        Returns:
+            list: (left, top, right, bottom) pixel tuples. They may not overlap the box.
+        """
+        bucket_pixels = self.bucket_pixels
+        bx0 = min(max(int(left // bucket_pixels), 0), self.columns - 1)
+        bx1 = min(max(int(right // bucket_pixels), 0), self.columns - 1)
+        by0 = min(max(int(top // bucket_pixels), 0), self.rows - 1)
+        by1 = min(max(int(bottom // bucket_pixels), 0), self.rows - 1)
+
+        rects = self.rects
+        if bx0 == bx1 and by0 == by1:
+            rect_ids = self.buckets[by0 * self.columns + bx0]
+        else:
+            rect_ids = set()
+            for bucket_y in range(by0, by1 + 1):
+                row_start = bucket_y * self.columns
+                for bucket_x in range(bx0, bx1 + 1):
+                    rect_ids.update(self.buckets[row_start + bucket_x])
+        return [
+            (rects[i * 4], rects[i * 4 + 1], rects[i * 4 + 2], rects[i * 4 + 3])
+            for i in rect_ids
+        ]
+
+
+def sweptMove(wall_index, x, y, width, height, dx, dy):
+    """
+    Move a box by (dx, dy) pixels, stopping it flush against the first wall in its way.
+
+    The move is resolved one axis at a time: x first, then y from the new x. Along each
+    axis the whole swept area is checked, so the box cannot tunnel through a wall at any
+    speed. Positions are floats, so sub-pixel movement (e.g. diagonals) accumulates
+    instead of being truncated every frame. A box that already overlaps a wall is not
+    pushed out; the wall only blocks it once it is ahead of it.
+
+    Args:
+        wall_index: WallIndex
+        x, y: float - top-left corner of the box in pixels
+        width, height: int - size of the box in pixels
+        dx, dy: float - requested movement in pixels
+
+    Returns:
+        tuple: (x, y, blocked) - the new position, and whether a wall stopped the move.
+    """
+    blocked = False
+
+    if dx > 0:
+        target = x + dx
+        for left, top, right, bottom in wall_index.query(x, y, x + width + dx, y + height):
+            if top < y + height and bottom > y and left >= x + width and left - width < target:
+                target = left - width
+                blocked = True
+        x = target
+    elif dx < 0:
+        target = x + dx
+        for left, top, right, bottom in wall_index.query(x + dx, y, x + width, y + height):
+            if top < y + height and bottom > y and right <= x and right > target:
+                target = right
+                blocked = True
+        x = target
+
+    if dy > 0:
+        target = y + dy
+        for left, top, right, bottom in wall_index.query(x, y, x + width, y + height + dy):
+            if left < x + width and right > x and top >= y + height and top - height < target:
+                target = top - height
+                blocked = True
+        y = target
+    elif dy < 0:
+        target = y + dy
+        for left, top, right, bottom in wall_index.query(x, y + dy, x + width, y + height):
+            if left < x + width and right > x and bottom <= y and bottom > target:
+                target = bottom
+                blocked = True
+        y = target
+
+    return x, y, blocked
+
+
+def detectCollision(player, maze, cell_size):
+    """
+    Detect if the player has collided with a wall in the maze.
+
+    player: any rect with x, y, width and height in pixels, e.g. a pygame.Rect.
+    """
+    # normalize the player to maze grid.
+    player_left = player.x // cell_size
+    player_right = (player.x + player.width - 1) // cell_size
+    player_top = player.y // cell_size
+    player_bottom = (player.y + player.height - 1) // cell_size
+
+    width, height, cells = maze.width, maze.height, maze.data
+
+    # Check if any part of the player is in a wall
+    for y in range(player_top, player_bottom + 1):
+        for x in range(player_left, player_right + 1):
+            if 0 <= y < height and 0 <= x < width:  # Check bounds
+                if cells[y * width + x] & CELL_WALL:
+                    return True
+    return False
+
+
+def resolveCollision(player, maze, cell_size):
+    """
+    Return minimal (dx, dy) displacement vector to resolve overlaps with wall tiles.
+    If no overlap, returns (0, 0).
+    """
+    player_left_cell = player.left // cell_size
+    player_right_cell = (player.right - 1) // cell_size
+    player_top_cell = player.top // cell_size
+    player_bottom_cell = (player.bottom - 1) // cell_size
+
+    width, height, cells = maze.width, maze.height, maze.data
+
+    min_left_clear = float("inf")
+    max_right_clear = float("-inf")
+    min_top_clear = float("inf")
+    max_bottom_clear = float("-inf")
+
+    def intervals_overlap(a_start, a_end, b_start, b_end):
+        return not (a_end <= b_start or b_end <= a_start)
+
+    any_collision = False
+
+    for ty in range(player_top_cell, player_bottom_cell + 1):
+        for tx in range(player_left_cell, player_right_cell + 1):
+            if not (0 <= ty < height and 0 <= tx < width):
+                continue
+            if not cells[ty * width + tx] & CELL_WALL:
+                continue
+
+            wall_left = tx * cell_size
+            wall_top = ty * cell_size
+            wall_right = wall_left + cell_size
+            wall_bottom = wall_top + cell_size
+
+            if not intervals_overlap(player.left, player.right, wall_left, wall_right):
+                continue
+            if not intervals_overlap(player.top, player.bottom, wall_top, wall_bottom):
+                continue
+
+            any_collision = True
+
+            left_clear = wall_left - player.right
+            right_clear = wall_right - player.left
+            if left_clear < min_left_clear:
+                min_left_clear = left_clear
+            if right_clear > max_right_clear:
+                max_right_clear = right_clear
+
+            top_clear = wall_top - player.bottom
+            bottom_clear = wall_bottom - player.top
+            if top_clear < min_top_clear:
+                min_top_clear = top_clear
+            if bottom_clear > max_bottom_clear:
+                max_bottom_clear = bottom_clear
+
+    if not any_collision:
+        return (0, 0)
+
+    # Compute minimal axis-aligned resolution on each axis independently
+    if min_left_clear < 0 < max_right_clear:
+        dx_candidate = (
+            min_left_clear
+            if abs(min_left_clear) <= abs(max_right_clear)
+            else max_right_clear
+        )
+    else:
+        dx_candidate = 0
+
+    if min_top_clear < 0 < max_bottom_clear:
+        dy_candidate = (
+            min_top_clear
+            if abs(min_top_clear) <= abs(max_bottom_clear)
+            else max_bottom_clear
+        )
+    else:
+        dy_candidate = 0
+
+    # Prefer the smallest movement overall and avoid diagonal hops:
+    # move only along the axis with the smaller absolute correction.
+    if dx_candidate == 0 and dy_candidate == 0:
+        # Fallback: pick the smallest absolute among available finite endpoints
+        candidates = []
+        if min_left_clear != float("inf"):
+            candidates.append(min_left_clear)
+        if max_right_clear != float("-inf"):
+            candidates.append(max_right_clear)
+        if min_top_clear != float("inf"):
+            candidates.append(min_top_clear)
+        if max_bottom_clear != float("-inf"):
+            candidates.append(max_bottom_clear)
+        if not candidates:
+            return (0, 0)
+        best = min(candidates, key=lambda v: abs(v))
+        if best in (min_left_clear, max_right_clear):
+            return (int(best), 0)
+        else:
+            return (0, int(best))
+
+    if dx_candidate == 0:
+        return (0, int(dy_candidate))
+    if dy_candidate == 0:
+        return (int(dx_candidate), 0)
+
+    if abs(dx_candidate) <= abs(dy_candidate):
+        return (int(dx_candidate), 0)
+    else:
+        return (0, int(dy_candidate))
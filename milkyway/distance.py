@@ -0,0 +1,339 @@
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+from .mazegrid import CELL_PATH, CELL_WALL
+
+UNREACHABLE = -1  # distance of walls and of open cells cut off from every target.
+
+
+class DistanceField:
+    """
+    Walking distance, in cells, from every cell of a maze to the nearest target cell.
+
+    Built with one multi-source BFS at maze-build time. `data` is an array('i') of int32
+    distances in the same row-major layout as MazeGrid.data, and `distances` is a
+    (height, width) NumPy view over the same memory. Walls and cells that cannot reach a
+    target are UNREACHABLE.
+
+    Once built, the distance to the exit is a lookup, the way to the exit is found by
+    stepping downhill one neighbour at a time, and two cells are connected if they share
+    a component. Walls carved or added at runtime go through set_path()/set_wall(), which
+    update only the cells whose distance changes.
+    """
+
+    def __init__(self, maze, targets, packed=None):
+        """
+        Args:
+            maze: MazeGrid
+            targets: list of (x, y) cells, e.g. [(width - 1, height - 1)] for the exit
+            packed: optional bytes from pack() of a field of the same maze and targets,
+                used instead of running the BFS
+        """
+        self.maze = maze
+        self.targets = list(targets)
+        self.data = array("i", [UNREACHABLE]) * (maze.width * maze.height)
+        self.distances = np.frombuffer(self.data, dtype=np.int32).reshape(
+            maze.height, maze.width
+        )
+        self._components = None  # component labels, computed on the first reachable().
+        if packed is None:
+            self.rebuild()
+        else:
+            self.data[:] = array("i", packed)
+
+    def pack(self):
+        """
+        The distances as bytes, 4 per cell, e.g. to hand the field to another process.
+        """
+        return self.data.tobytes()
+
+    def rebuild(self):
+        """
+        Recompute every distance with a multi-source BFS from the targets.
+        """
+        width, height = self.maze.width, self.maze.height
+        cells, dist = self.maze.data, self.data
+        dist[:] = array("i", [UNREACHABLE]) * len(dist)
+        queue = deque()
+        for x, y in self.targets:
+            index = y * width + x
+            if not cells[index] & CELL_WALL and dist[index] == UNREACHABLE:
+                dist[index] = 0
+                queue.append(index)
+        # _neighbours() inlined: this visits every open cell once, at maze-build time.
+        last_row = (height - 1) * width
+        while queue:
+            current = queue.popleft()
+            next_distance = dist[current] + 1
+            x = current % width
+            for neighbour, in_bounds in (
+                (current - width, current >= width),
+                (current + 1, x < width - 1),
+                (current + width, current < last_row),
+                (current - 1, x > 0),
+            ):
+                if (
+                    in_bounds
+                    and dist[neighbour] == UNREACHABLE
+                    and not cells[neighbour] & CELL_WALL
+                ):
+                    dist[neighbour] = next_distance
+                    queue.append(neighbour)
+        self._components = None
+
+    def _neighbours(self, index):
+        """
+        Flat indices of the open cells next to `index`: up, right, down, left.
+        """
+        width, height = self.maze.width, self.maze.height
+        cells = self.maze.data
+        x = index % width
+        result = []
+        if index >= width and not cells[index - width] & CELL_WALL:
+            result.append(index - width)
+        if x < width - 1 and not cells[index + 1] & CELL_WALL:
+            result.append(index + 1)
+        if index < (height - 1) * width and not cells[index + width] & CELL_WALL:
+            result.append(index + width)
+        if x > 0 and not cells[index - 1] & CELL_WALL:
+            result.append(index - 1)
+        return result
+
+    def distance(self, x, y):
+        """
+        Cells to walk from (x, y) to the nearest target, or UNREACHABLE.
+        """
+        if not self.maze.in_bounds(x, y):
+            return UNREACHABLE
+        return self.data[y * self.maze.width + x]
+
+    def progress(self, x, y, start):
+        """
+        Fraction of the way from `start` to the nearest target covered at (x, y):
+        0.0 at the start, 1.0 on a target. Walking away from the exit lowers it.
+        """
+        total = self.distance(*start)
+        remaining = self.distance(x, y)
+        if total <= 0 or remaining == UNREACHABLE:
+            return 1.0 if remaining == 0 else 0.0
+        return max(0.0, 1.0 - remaining / total)
+
+    def next_step(self, x, y):
+        """
+        The neighbouring cell one step closer to a target, or None on a target or when
+        no target can be reached.
+        """
+        width = self.maze.width
+        index = y * width + x
+        current = self.data[index] if self.maze.in_bounds(x, y) else UNREACHABLE
+        if current <= 0:
+            return None
+        for neighbour in self._neighbours(index):
+            if self.data[neighbour] == current - 1:
+                return (neighbour % width, neighbour // width)
+        return None
+
+    def path(self, x, y, max_steps=None):
+        """
+        The cells walked from (x, y) to the nearest target, both ends included, found by
+        descending the field. Costs O(path length); no search is done.
+
+        Args:
+            max_steps: optional int - stop after this many steps, e.g. for a hint
+
+        Returns:
+            list: (x, y) cells. Empty if no target can be reached from (x, y).
+        """
+        if self.distance(x, y) == UNREACHABLE:
+            return []
+        path = [(x, y)]
+        step = self.next_step(x, y)
+        while step is not None and (max_steps is None or len(path) <= max_steps):
+            path.append(step)
+            step = self.next_step(*step)
+        return path
+
+    def reachable(self, start, end):
+        """
+        Whether there is a path between two cells. Cells that can both reach a target are
+        connected through it; other open cells are compared by connected component,
+        labelled once and kept until the maze is edited.
+        """
+        maze = self.maze
+        if not (maze.in_bounds(*start) and maze.in_bounds(*end)):
+            return False
+        if maze.is_wall(*start) or maze.is_wall(*end):
+            return False
+        if start == end:
+            return True
+        width = maze.width
+        start_index = start[1] * width + start[0]
+        end_index = end[1] * width + end[0]
+        if self.data[start_index] != UNREACHABLE or self.data[end_index] != UNREACHABLE:
+            return self.data[start_index] != UNREACHABLE and self.data[end_index] != UNREACHABLE
+        if self._components is None:
+            self._components = self._label_components()
+        return self._components[start_index] == self._components[end_index]
+
+    def _label_components(self):
+        """
+        Label the open cells that cannot reach a target by connected component (1, 2, ...).
+        Cells that can reach a target keep 0, as do walls.
+        """
+        cells, dist = self.maze.data, self.data
+        labels = array("i", [0]) * len(dist)
+        label = 0
+        for index in range(len(dist)):
+            if cells[index] & CELL_WALL or dist[index] != UNREACHABLE or labels[index]:
+                continue
+            label += 1
+            labels[index] = label
+            queue = deque([index])
+            while queue:
+                current = queue.popleft()
+                for neighbour in self._neighbours(current):
+                    if not labels[neighbour]:
+                        labels[neighbour] = label
+                        queue.append(neighbour)
+        return labels
+
+    def metrics(self, start):
+        """
+        Difficulty metrics of the maze, as seen from `start`.
+
+        Returns:
+            dict:
+                solution_length: cells walked from start to the exit (UNREACHABLE if none)
+                max_distance: distance of the cell furthest from the exit
+                mean_distance: mean distance over the cells that can reach the exit
+                reachable_cells: open cells that can reach the exit
+                dead_ends: open cells with a single open neighbour
+                junctions: open cells with three or more open neighbours
+                solution_ratio: share of the reachable cells on the solution path
+        """
+        distances = self.distances
+        reachable = distances != UNREACHABLE
+        reachable_cells = int(np.count_nonzero(reachable))
+
+        # open neighbours of every cell, counted on a wall-padded copy of the grid.
+        open_cells = np.pad((self.maze.cells & CELL_WALL) == 0, 1, constant_values=False)
+        neighbours = (
+            open_cells[:-2, 1:-1].astype(np.int8)
+            + open_cells[2:, 1:-1]
+            + open_cells[1:-1, :-2]
+            + open_cells[1:-1, 2:]
+        )
+        open_inner = open_cells[1:-1, 1:-1]
+
+        solution_length = self.distance(*start)
+        return {
+            "solution_length": solution_length,
+            "max_distance": int(distances.max()) if reachable_cells else UNREACHABLE,
+            "mean_distance": float(distances[reachable].mean()) if reachable_cells else 0.0,
+            "reachable_cells": reachable_cells,
+            "dead_ends": int(np.count_nonzero(open_inner & (neighbours == 1))),
+            "junctions": int(np.count_nonzero(open_inner & (neighbours >= 3))),
+            "solution_ratio": (
+                (solution_length + 1) / reachable_cells
+                if solution_length != UNREACHABLE
+                else 0.0
+            ),
+        }
+
+    def set_path(self, x, y):
+        """
+        Carve (x, y) out of the maze and lower the distances it shortens.
+
+        Opening a cell can only shorten paths, so the new distances spread outwards from it
+        and stop where they are no better than the ones already there.
+        """
+        maze = self.maze
+        width = maze.width
+        index = y * width + x
+        if not maze.data[index] & CELL_WALL:
+            return
+        maze.data[index] = CELL_PATH
+        self._components = None
+
+        dist = self.data
+        if (x, y) in self.targets:
+            dist[index] = 0
+        else:
+            reached = [dist[n] for n in self._neighbours(index) if dist[n] != UNREACHABLE]
+            if not reached:
+                return  # still cut off from every target.
+            dist[index] = min(reached) + 1
+
+        queue = deque([index])
+        while queue:
+            current = queue.popleft()
+            next_distance = dist[current] + 1
+            for neighbour in self._neighbours(current):
+                if dist[neighbour] == UNREACHABLE or dist[neighbour] > next_distance:
+                    dist[neighbour] = next_distance
+                    queue.append(neighbour)
+
+    def set_wall(self, x, y):
+        """
+        Fill (x, y) with a wall and raise the distances it lengthens.
+
+        Only the cells whose every shortest path went through (x, y) change. They are found
+        by walking away from it, uphill, while a cell has no other neighbour one step closer
+        to the exit. Their distances are then recomputed from the cells around them.
+        """
+        maze = self.maze
+        width = maze.width
+        index = y * width + x
+        if maze.data[index] & CELL_WALL:
+            return
+        maze.data[index] = CELL_WALL
+        self._components = None
+        if (x, y) in self.targets:
+            self.rebuild()
+            return
+
+        dist = self.data
+        if dist[index] == UNREACHABLE:
+            return
+        # 1. the cells that lost their only way downhill. visited in order of distance, so
+        #    every lost cell one step closer is known by the time a cell is looked at.
+        lost = {index}
+        queue = deque([index])
+        while queue:
+            current = queue.popleft()
+            uphill = dist[current] + 1
+            for neighbour in self._neighbours(current):
+                if dist[neighbour] != uphill or neighbour in lost:
+                    continue
+                if any(
+                    dist[other] == uphill - 1 and other not in lost
+                    for other in self._neighbours(neighbour)
+                ):
+                    continue  # still has a way down that does not use a lost cell.
+                lost.add(neighbour)
+                queue.append(neighbour)
+        for lost_index in lost:
+            dist[lost_index] = UNREACHABLE
+
+        # 2. seed each lost cell from its neighbours that kept their distance, then settle
+        #    them closest first. cells that find no way down stay UNREACHABLE.
+        lost.discard(index)
+        heap = []
+        for lost_index in lost:
+            for neighbour in self._neighbours(lost_index):
+                if neighbour not in lost and dist[neighbour] != UNREACHABLE:
+                    heap.append((dist[neighbour] + 1, lost_index))
+        heapq.heapify(heap)
+        while heap:
+            distance, current = heapq.heappop(heap)
+            if dist[current] != UNREACHABLE and dist[current] <= distance:
+                continue
+            dist[current] = distance
+            for neighbour in self._neighbours(current):
+                if neighbour in lost and (
+                    dist[neighbour] == UNREACHABLE or dist[neighbour] > distance + 1
+                ):
+                    heapq.heappush(heap, (distance + 1, neighbour))
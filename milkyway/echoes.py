@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class EchoPool:
+    """
+    Live echoes as parallel NumPy arrays (struct of arrays) with a fixed capacity.
+
+    The first `count` entries of every array are the live echoes, in no particular order.
+    step() grows and fades all of them in one vectorized operation, and dead echoes are
+    removed by moving the last live echo into their slot, so nothing is shifted or
+    reallocated however many echoes there are.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity: int - most echoes alive at once
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.int32)  # origin, in maze pixels.
+        self.y = np.zeros(capacity, dtype=np.int32)
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.alpha = np.zeros(capacity, dtype=np.int32)
+        self.ring_id = np.zeros(capacity, dtype=np.int64)  # RevealEngine ring of the echo.
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, x, y, radius, alpha, ring_id):
+        """
+        Add an echo. Returns False, and adds nothing, when the pool is full.
+        """
+        i = self.count
+        if i >= self.capacity:
+            return False
+        self.x[i], self.y[i] = x, y
+        self.radius[i], self.alpha[i] = radius, alpha
+        self.ring_id[i] = ring_id
+        self.count = i + 1
+        return True
+
+    def step(self, radius_increment, alpha_decrement):
+        """
+        Grow every echo by radius_increment and fade it by alpha_decrement, then remove
+        the ones that faded out.
+
+        Returns:
+            list: ring ids of the removed echoes.
+        """
+        n = self.count
+        self.radius[:n] += radius_increment
+        self.alpha[:n] -= alpha_decrement
+        dead = np.flatnonzero(self.alpha[:n] <= 0)
+        if len(dead) == 0:
+            return []
+        dead_rings = self.ring_id[dead].tolist()
+        # highest slot first, so the echo moved into a slot is never one still to be removed.
+        for i in dead[::-1].tolist():
+            n -= 1
+            if i != n:
+                for array in (self.x, self.y, self.radius, self.alpha, self.ring_id):
+                    array[i] = array[n]
+        self.count = n
+        return dead_rings
+
+    def shift(self, dx, dy):
+        """
+        Move every echo origin by (dx, dy) pixels.
+        """
+        self.x[: self.count] += dx
+        self.y[: self.count] += dy
+
+    def circles(self, color, alpha_min=0, alpha_max=255):
+        """
+        The live echoes as renderer circles: ((x, y), radius, (r, g, b, alpha)).
+        """
+        n = self.count
+        alpha = np.clip(self.alpha[:n], alpha_min, alpha_max).tolist()
+        return [
+            ((x, y), radius, (color[0], color[1], color[2], a))
+            for x, y, radius, a in zip(
+                self.x[:n].tolist(), self.y[:n].tolist(), self.radius[:n].tolist(), alpha
+            )
+        ]
@@ -0,0 +1,270 @@
+import random
+from collections import deque
+
+from .mazegrid import CELL_PATH, CELL_WALL, MazeGrid
+
+DEFAULT_COMPLEXITY = 0.4  # corridor-turning bias used when none (or an invalid one) is given.
+# bump when genMaze carves a different maze for the same arguments; keys the maze cache.
+MAZE_ALGORITHM_VERSION = 1
+
+# The four carving directions: up, right, down, left.
+MAZE_DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+def _shuffledDirections(j3, j2, j1):
+    """
+    Apply the swaps random.shuffle() performs for the draws (j3, j2, j1) to MAZE_DIRECTIONS.
+    """
+    dirs = list(MAZE_DIRECTIONS)
+    for i, j in ((3, j3), (2, j2), (1, j1)):
+        dirs[i], dirs[j] = dirs[j], dirs[i]
+    return tuple(dirs)
+
+
+# All 24 direction orderings, keyed by the random draws that produce them, plus the same
+# orderings with a given direction moved to the front. Lets the generator pick an ordering
+# without copying, shuffling or remove/insert-ing a list for every cell.
+_DIRECTION_ORDERS = {
+    (j3, j2, j1): _shuffledDirections(j3, j2, j1)
+    for j3 in range(4)
+    for j2 in range(3)
+    for j1 in range(2)
+}
+_DIRECTION_ORDERS_STRAIGHT_FIRST = {
+    (order, straight): (straight,) + tuple(d for d in order if d != straight)
+    for order in _DIRECTION_ORDERS.values()
+    for straight in MAZE_DIRECTIONS
+}
+
+
+def genMaze(width, height, complexity=DEFAULT_COMPLEXITY, seed=None):
+    """
+    Generate a maze using a depth-first search algorithm.
+    Starts with all filled up areas and then carves out the maze.
+
+    The search uses an explicit stack instead of recursion, so it is not bound by
+    Python's recursion limit and works for multi-million-cell mazes. For a given seed
+    it carves exactly the same maze as the original recursive carve().
+
+    The exit is always connected by construction: the search visits every cell on the
+    even (x, y) lattice from the start, and the exit is snapped onto that lattice, so no
+    reachability check or regeneration is needed.
+
+    Args:
+        width: int - width of the maze
+        height: int - height of the maze
+        complexity: float in [0.0, 1.0] - corridor-turning bias
+            0.0 -> very simple (straighter, longer corridors)
+            1.0 -> very complex (more turns/branching feel)
+        seed: optional int - seed for the random generator. None -> random maze.
+
+    Returns:
+        MazeGrid: the carved maze, walls flagged with CELL_WALL
+    """
+    maze = MazeGrid(width, height, CELL_WALL)
+    cells = maze.data
+
+    # Clamp complexity to [0, 1]
+    if complexity < 0.0 or complexity > 1.0:
+        complexity = DEFAULT_COMPLEXITY
+    straight_bias = 1.0 - complexity
+
+    rng = random.Random(seed)
+    randrange = rng.randrange
+    rand = rng.random
+
+    # Each stack frame is [x, y, direction order, index of the next direction to try].
+    # The draws below match random.shuffle() on a 4 element list, followed by the
+    # straight-corridor coin flip, so the random sequence is the same as the recursive version.
+    cells[0] = CELL_PATH  # start at the top-left corner
+    order = _DIRECTION_ORDERS[(randrange(4), randrange(3), randrange(2))]
+    stack = [[0, 0, order, 0]]
+    while stack:
+        frame = stack[-1]
+        x, y, order, i = frame
+        while i < 4:
+            direction = order[i]
+            dx, dy = direction
+            i += 1
+            nx, ny = x + dx * 2, y + dy * 2
+            if (
+                0 <= ny < height
+                and 0 <= nx < width
+                and cells[ny * width + nx] == CELL_WALL
+            ):  # if the new position is within the bounds and is a wall
+                cells[(y + dy) * width + x + dx] = CELL_PATH
+                cells[ny * width + nx] = CELL_PATH
+                frame[3] = i  # resume from the next direction once this branch is done.
+                order = _DIRECTION_ORDERS[(randrange(4), randrange(3), randrange(2))]
+                if rand() < straight_bias:
+                    # lower complexity -> prefer to continue in the same direction
+                    order = _DIRECTION_ORDERS_STRAIGHT_FIRST[(order, direction)]
+                stack.append([nx, ny, order, 0])
+                break
+        else:
+            stack.pop()  # every direction tried, backtrack.
+
+    maze.set_path(0, 0)  # set the start position to a path
+    maze.set_path(width - 1, height - 1)  # set the end position to a path
+
+    # Snap the exit to the carved lattice. If the exit has an even coordinate it already
+    # sits on, or next to, a carved lattice cell. On even-width and even-height grids it has
+    # two odd coordinates, so open the cell to its left, whose upper neighbour is a lattice cell.
+    if width > 1 and height > 1 and (width - 1) % 2 == 1 and (height - 1) % 2 == 1:
+        maze.set_path(width - 2, height - 1)
+
+    return maze
+
+
+def genMazeRows(width, height=None, complexity=DEFAULT_COMPLEXITY, seed=None):
+    """
+    Generate a maze one row at a time with Eller's algorithm, using O(width) memory.
+
+    Rows use the same layout as genMaze: cells on even (x, y) are the lattice, the cells
+    between them are walls or carved passages. Every lattice row is followed by a row of
+    downward passages, and every set of connected cells gets at least one way down, so
+    there are no loops and nothing is cut off from the rows below. With a height, the
+    last lattice row joins all remaining sets and the result is a perfect maze. Without
+    one the generator never ends, which is what the endless descent mode pulls from.
+
+    Args:
+        width: int - width of the maze
+        height: optional int - number of rows. None -> endless.
+        complexity: float in [0.0, 1.0] - corridor-turning bias
+            0.0 -> very simple (longer horizontal corridors)
+            1.0 -> very complex (shorter corridors, more turns)
+        seed: optional int - seed for the random generator. None -> random maze.
+
+    Yields:
+        bytes: `width` cell flags per row (CELL_PATH or CELL_WALL)
+    """
+    # Clamp complexity to [0, 1]
+    if complexity < 0.0 or complexity > 1.0:
+        complexity = DEFAULT_COMPLEXITY
+    join_probability = 0.3 + 0.5 * (1.0 - complexity)  # join a lattice cell to its right neighbour.
+    down_probability = 0.3  # extra passages down, on top of the one every set gets.
+
+    rng = random.Random(seed)
+    columns = (width + 1) // 2  # lattice cells per row.
+    cell_set = list(range(columns))  # set id of every lattice cell in the current row.
+    next_set = columns
+    y = 0
+    while height is None or y < height:
+        last_row = height is not None and y + 2 >= height  # no lattice row below this one.
+
+        # lattice row: join neighbours from different sets, merging the sets.
+        members = {}
+        for column, set_id in enumerate(cell_set):
+            members.setdefault(set_id, []).append(column)
+        row = bytearray([CELL_WALL]) * width
+        for column in range(columns):
+            row[column * 2] = CELL_PATH
+        for column in range(columns - 1):
+            left, right = cell_set[column], cell_set[column + 1]
+            if left != right and (last_row or rng.random() < join_probability):
+                row[column * 2 + 1] = CELL_PATH
+                if len(members[left]) < len(members[right]):
+                    left, right = right, left  # relabel the smaller set.
+                for member in members.pop(right):
+                    cell_set[member] = left
+                    members[left].append(member)
+        yield bytes(row)
+        y += 1
+
+        if last_row:
+            if height is not None and y < height:
+                yield bytes([CELL_WALL]) * width  # an even height ends on a wall row.
+                y += 1
+            return
+
+        # passage row: every set goes down at least once; the others start new sets.
+        below = bytearray([CELL_WALL]) * width
+        next_cell_set = [None] * columns
+        for set_id, set_columns in members.items():
+            down = [column for column in set_columns if rng.random() < down_probability]
+            if not down:
+                down = [set_columns[rng.randrange(len(set_columns))]]
+            for column in down:
+                below[column * 2] = CELL_PATH
+                next_cell_set[column] = set_id
+        for column in range(columns):
+            if next_cell_set[column] is None:
+                next_cell_set[column] = next_set
+                next_set += 1
+        cell_set = next_cell_set
+        yield bytes(below)
+        y += 1
+
+
+def is_reachable(maze, start, end):
+    """
+    Check if there's a path from start to end in the maze using BFS.
+
+    Args:
+        maze: MazeGrid
+        start: tuple (x, y) of starting position
+        end: tuple (x, y) of ending position
+
+    Returns:
+        bool: True if end is reachable from start, False otherwise
+    """
+    if maze.width == 0 or maze.height == 0:
+        return False
+
+    height, width = maze.height, maze.width
+    cells = maze.data
+    start_x, start_y = start
+    end_x, end_y = end
+
+    # Check if start and end are valid positions
+    if (
+        start_x < 0
+        or start_x >= width
+        or start_y < 0
+        or start_y >= height
+        or end_x < 0
+        or end_x >= width
+        or end_y < 0
+        or end_y >= height
+    ):
+        return False
+
+    # Check if start and end are paths (not walls)
+    if maze.is_wall(start_x, start_y) or maze.is_wall(end_x, end_y):
+        return False
+
+    # If start and end are the same position
+    if start == end:
+        return True
+
+    # Work on flat row-major indices; a bytearray is far smaller than a set of tuples.
+    start_index = start_y * width + start_x
+    end_index = end_y * width + end_x
+    visited = bytearray(width * height)
+    visited[start_index] = 1
+    queue = deque([start_index])
+
+    while queue:
+        current = queue.popleft()
+
+        # Check if we've reached the end
+        if current == end_index:
+            return True
+
+        # Explore all 4 directions: up, right, down, left
+        current_x = current % width
+        for next_index, in_bounds in (
+            (current - width, current >= width),
+            (current + 1, current_x < width - 1),
+            (current + width, current < (height - 1) * width),
+            (current - 1, current_x > 0),
+        ):
+            if (
+                in_bounds
+                and not visited[next_index]
+                and not cells[next_index] & CELL_WALL
+            ):
+                visited[next_index] = 1
+                queue.append(next_index)
+
+    return False
@@ -0,0 +1,224 @@
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from .maze import DEFAULT_COMPLEXITY, MAZE_ALGORITHM_VERSION, genMaze
+from .mazegrid import MazeGrid
+
+########################################################
+# Maze files: a 32-byte header, then the walls bit-packed as by MazeGrid.pack().
+########################################################
+
+MAZE_FILE_MAGIC = b"EMAZ"
+MAZE_FILE_VERSION = 1
+# magic, file format version, genMaze algorithm version, width, height, complexity, seed.
+# the seed is signed, so negative seeds are stored as they are.
+MAZE_FILE_HEADER = struct.Struct("<4sHHIIdq")
+# a .partial file older than this was left by a writer that was killed, e.g. a prefetch worker.
+PARTIAL_FILE_SECONDS = 60
+# cache directories whose OSError was printed already, so it is printed once per process.
+_failed_directories = set()
+
+
+def _packedSize(width, height):
+    return (width * height + 7) // 8
+
+
+def saveMaze(path, maze, complexity, seed):
+    """
+    Write a maze to `path`, with the arguments genMaze() made it from. The file is
+    written next to `path` and renamed over it, so a reader never sees half a file; if
+    writing fails, the half-written file is deleted and the OSError raised.
+
+    Raises:
+        struct.error: a size or seed that does not fit the header, e.g. a seed past 64 bits
+    """
+    header = MAZE_FILE_HEADER.pack(
+        MAZE_FILE_MAGIC,
+        MAZE_FILE_VERSION,
+        MAZE_ALGORITHM_VERSION,
+        maze.width,
+        maze.height,
+        complexity,
+        seed,
+    )
+    partial = f"{path}.{os.getpid()}.partial"
+    try:
+        with open(partial, "wb") as file:
+            file.write(header)
+            file.write(maze.pack())
+        os.replace(partial, path)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+
+
+def loadMaze(path):
+    """
+    Read a maze written by saveMaze(). The file is memory-mapped and its bits are
+    unpacked straight from the mapping into the grid, with no read() copy in between.
+
+    Returns:
+        (MazeGrid, dict): the maze, and its header: width, height, complexity, seed and
+            algorithm_version
+
+    Raises:
+        ValueError: the file is not a maze file, or is cut short
+    """
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        if len(mapped) < MAZE_FILE_HEADER.size:
+            raise ValueError(f"{path}: not a maze file")
+        magic, file_version, algorithm_version, width, height, complexity, seed = (
+            MAZE_FILE_HEADER.unpack_from(mapped)
+        )
+        if magic != MAZE_FILE_MAGIC or file_version != MAZE_FILE_VERSION:
+            raise ValueError(f"{path}: not a maze file")
+        if len(mapped) < MAZE_FILE_HEADER.size + _packedSize(width, height):
+            raise ValueError(f"{path}: cut short")
+        bits = np.frombuffer(
+            mapped, dtype=np.uint8, count=_packedSize(width, height), offset=MAZE_FILE_HEADER.size
+        )
+        maze = MazeGrid.from_packed(width, height, bits)
+        del bits  # the mapping can't be closed while a view of it is alive.
+    return maze, {
+        "width": width,
+        "height": height,
+        "complexity": complexity,
+        "seed": seed,
+        "algorithm_version": algorithm_version,
+    }
+
+
+class MazeCache:
+    """
+    Generated mazes kept on disk, one maze file per (width, height, complexity, seed,
+    genMaze algorithm version), so a maze is only ever carved once.
+
+    A 4001x4001 maze is a 2 MB file that loads in tens of milliseconds, against seconds
+    to generate. The least recently used files are deleted once the directory holds more
+    than `max_bytes` of them; a hit refreshes the file's modification time. Files are
+    written atomically, so several processes (e.g. the MazePrefetcher workers) can share
+    a directory.
+
+    The cache is best-effort: if the directory can't be created, read or written (no
+    permission, disk full, ...) the error is printed once and mazes are generated as if
+    it were empty. A maze whose seed does not fit in a maze file is generated every time.
+
+    The cache only holds plain settings, so it can be handed to worker processes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        """
+        Args:
+            directory: str - where the maze files are kept; created if missing
+            max_bytes: int - most bytes of maze files kept
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, width, height, complexity, seed):
+        if complexity < 0.0 or complexity > 1.0:
+            complexity = DEFAULT_COMPLEXITY  # genMaze carves these the same way.
+        return os.path.join(
+            self.directory,
+            f"{width}x{height}-c{complexity!r}-s{seed}-v{MAZE_ALGORITHM_VERSION}.maze",
+        )
+
+    def load(self, width, height, complexity, seed):
+        """
+        The cached maze, or None if it is not cached. An unreadable file is deleted.
+        """
+        path = self.path(width, height, complexity, seed)
+        try:
+            maze, _ = loadMaze(path)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self._remove(path)
+            return None
+        except OSError as error:
+            self._failed(error)
+            return None
+        try:
+            os.utime(path)  # most recently used.
+        except FileNotFoundError:
+            pass  # evicted by another process since.
+        except OSError as error:
+            self._failed(error)
+        return maze
+
+    def store(self, maze, complexity, seed):
+        """
+        Cache a maze. Returns False if it could not be written.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(maze.width, maze.height, complexity, seed)
+            saveMaze(path, maze, complexity, seed)
+            self.evict()
+        except struct.error:
+            return False  # a seed past 64 bits: not an error of the cache.
+        except OSError as error:
+            self._failed(error)
+            return False
+        return True
+
+    def get(self, width, height, complexity, seed):
+        """
+        The maze genMaze(width, height, complexity, seed=seed) makes, from the cache if it
+        is there, else generated and cached.
+        """
+        maze = self.load(width, height, complexity, seed)
+        if maze is not None:
+            self.hits += 1
+            return maze
+        self.misses += 1
+        maze = genMaze(width, height, complexity, seed=seed)
+        self.store(maze, complexity, seed)
+        return maze
+
+    def evict(self):
+        """
+        Delete the least recently used maze files until they fit in max_bytes, and the
+        partial files of writers that never finished.
+        """
+        files = []
+        stale = time.time_ns() - PARTIAL_FILE_SECONDS * 10**9
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith((".maze", ".partial")):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    if entry.name.endswith(".maze"):
+                        files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    elif stat.st_mtime_ns < stale:
+                        self._remove(entry.path)
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            self._failed(error)
+
+    def _failed(self, error):
+        if self.directory not in _failed_directories:
+            _failed_directories.add(self.directory)
+            print(f"Maze cache in {self.directory} is not working, mazes are generated:", error)
@@ -0,0 +1,144 @@
+import numpy as np
+
+########################################################
+# Cell flags. A cell is one byte; path/wall and revealed state are bits.
+########################################################
+
+CELL_PATH = 0  # open cell, no bits set.
+CELL_WALL = 1  # the cell is a wall.
+CELL_REVEALED = 2  # the wall has been revealed by an echo.
+CELL_HIDDEN_WALL = CELL_WALL
+CELL_SHOWN_WALL = CELL_WALL | CELL_REVEALED
+
+
+def runs(flags):
+    """
+    Start and end (exclusive) indices of the runs of True in a 1D boolean array,
+    e.g. the wall runs of a row: runs(maze.cells[y] & CELL_WALL != 0).
+    """
+    padded = np.concatenate(([False], flags, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return edges[0::2].tolist(), edges[1::2].tolist()
+
+
+class MazeGrid:
+    """
+    A maze stored as one byte per cell in a flat, row-major bytearray.
+
+    `data` is the bytearray itself and is the fastest way to touch single cells from
+    Python (`data[y * width + x]`). `cells` is a (height, width) NumPy uint8 array over
+    the same memory, for vectorized work and zero-copy sub-rectangle views. Writes
+    through either one are visible through the other.
+
+    A 4001x4001 maze costs about 16 MB, against more than 130 MB for a list of lists.
+    """
+
+    __slots__ = ("width", "height", "data", "cells")
+
+    def __init__(self, width, height, fill=CELL_WALL):
+        """
+        Args:
+            width: int - number of cells per row
+            height: int - number of rows
+            fill: int - initial flags for every cell (default: all walls)
+        """
+        self.width = width
+        self.height = height
+        self.data = bytearray([fill]) * (width * height)
+        self.cells = np.frombuffer(self.data, dtype=np.uint8).reshape(height, width)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a grid from a 2D list where 0 = path and anything else = wall.
+        """
+        height = len(rows)
+        width = len(rows[0]) if height > 0 else 0
+        grid = cls(width, height, CELL_PATH)
+        for y, row in enumerate(rows):
+            grid.data[y * width : (y + 1) * width] = bytes(
+                CELL_WALL if cell else CELL_PATH for cell in row
+            )
+        return grid
+
+    def to_rows(self):
+        """
+        Return the maze as a 2D list where 0 = path and 1 = wall.
+        """
+        return (self.cells & CELL_WALL).tolist()
+
+    def pack(self):
+        """
+        The walls as one bit per cell, row-major and most significant bit first, in
+        ceil(width * height / 8) bytes. Revealed state is not kept.
+        """
+        return np.packbits(self.cells & CELL_WALL, axis=None).tobytes()
+
+    @classmethod
+    def from_packed(cls, width, height, packed):
+        """
+        Build a grid from the bits of pack(), given as any bytes-like object.
+        """
+        grid = cls(width, height, CELL_PATH)
+        grid.cells[:] = np.unpackbits(
+            np.frombuffer(packed, dtype=np.uint8), count=width * height
+        ).reshape(height, width)
+        return grid
+
+    @property
+    def nbytes(self):
+        return len(self.data)
+
+    def index(self, x, y):
+        """
+        Row-major offset of cell (x, y) into `data`.
+        """
+        return y * self.width + x
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_wall(self, x, y):
+        return self.data[y * self.width + x] & CELL_WALL != 0
+
+    def is_revealed(self, x, y):
+        return self.data[y * self.width + x] & CELL_REVEALED != 0
+
+    def set_path(self, x, y):
+        self.data[y * self.width + x] = CELL_PATH
+
+    def set_wall(self, x, y):
+        self.data[y * self.width + x] = CELL_WALL
+
+    def view(self, x0, y0, x1, y1):
+        """
+        Zero-copy view of the cells in columns [x0, x1) and rows [y0, y1).
+        The bounds are clamped to the grid.
+        """
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(self.width, x1), min(self.height, y1)
+        return self.cells[y0:y1, x0:x1]
+
+    def scroll(self, rows):
+        """
+        Drop rows from the top of the grid and append new rows at the bottom, keeping the
+        height. Everything below the dropped rows moves up by len(rows).
+
+        Args:
+            rows: list of `width`-byte rows of cell flags, as yielded by genMazeRows()
+        """
+        count = len(rows)
+        if count == 0:
+            return
+        if count < self.height:
+            self.cells[: self.height - count] = self.cells[count:]
+        else:
+            rows = rows[count - self.height :]
+            count = self.height
+        self.data[(self.height - count) * self.width :] = b"".join(rows)
+
+    def clear_revealed(self):
+        """
+        Hide every revealed wall again.
+        """
+        np.bitwise_and(self.cells, ~CELL_REVEALED & 0xFF, out=self.cells)
@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+
+from .collision import WallIndex
+from .distance import DistanceField
+from .maze import genMaze
+from .mazegrid import MazeGrid
+
+
+def _lowerPriority():
+    """
+    Worker initializer: let the game's own process have the CPU first.
+    """
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _makeMaze(width, height, complexity, seed, cache):
+    """
+    The maze, and whether it was loaded from the cache rather than generated.
+    """
+    if cache is None:
+        return genMaze(width, height, complexity, seed=seed), False
+    hits = cache.hits
+    maze = cache.get(width, height, complexity, seed)
+    return maze, cache.hits > hits
+
+
+def _makeLevel(width, height, complexity, seed, cache, cell_size, bucket_cells):
+    """
+    A level: the maze, its DistanceField to the exit and its WallIndex (the last two None
+    without a cell_size), then the seconds the maze alone took and whether it was loaded
+    from the cache.
+    """
+    start = time.perf_counter()
+    maze, loaded = _makeMaze(width, height, complexity, seed, cache)
+    seconds = time.perf_counter() - start
+    if cell_size is None:
+        return maze, None, None, seconds, loaded
+    distance_field = DistanceField(maze, [(width - 1, height - 1)])
+    wall_index = WallIndex(maze, cell_size, bucket_cells)
+    return maze, distance_field, wall_index, seconds, loaded
+
+
+def _generatePacked(width, height, complexity, seed, cache, cell_size, bucket_cells):
+    """
+    Worker side of MazePrefetcher: make a level as _makeLevel() does and return it with
+    the maze, distance field and wall index packed.
+    """
+    maze, distance_field, wall_index, seconds, loaded = _makeLevel(
+        width, height, complexity, seed, cache, cell_size, bucket_cells
+    )
+    packed = (
+        maze.pack(),
+        None if distance_field is None else distance_field.pack(),
+        None if wall_index is None else wall_index.pack(),
+    )
+    return packed, seconds, loaded
+
+
+class MazePrefetcher:
+    """
+    Generates the next mazes of a session in worker processes while the current one is
+    played.
+
+    Up to `depth` mazes are generated ahead, each in its own worker. A finished maze
+    comes back bit-packed (MazeGrid.pack(), 1 bit per cell: 2 MB for 4001x4001 instead
+    of 16 MB of cells to pickle) and is unpacked into a MazeGrid by next(). The first
+    maze is generated in this process, and the workers start on the ones after it once
+    it is done, so they don't slow it down on a machine with few cores. With depth 0
+    every maze is generated in this process when it is asked for.
+
+    With a cell_size, each maze comes with its DistanceField to the exit (the bottom-right
+    cell) and its WallIndex, built in the worker too and handed back as a few flat
+    buffers, so a level starts without building them: together they take longer than
+    the maze itself.
+
+    genMaze connects the exit by construction, so no reachability check is needed. With a
+    MazeCache, mazes already on disk are loaded rather than generated, wherever they are
+    made.
+
+    The workers are spawned, not forked, so they share nothing with a running game
+    (SDL threads, the audio device); they only import the core package. They run at a
+    lower priority than the game, and close() kills them, mid-maze or not.
+    """
+
+    def __init__(
+        self, width, height, complexity, seeds, depth=1, cache=None, cell_size=None, bucket_cells=8
+    ):
+        """
+        Args:
+            width, height: int - maze size in cells
+            complexity: float - corridor-turning bias, as for genMaze()
+            seeds: iterable of int - seed of every maze, in order
+            depth: int - mazes generated ahead; 0 -> none
+            cache: optional MazeCache shared by this process and the workers
+            cell_size: optional int - pixels per cell of the WallIndex; None -> only the
+                mazes are made
+            bucket_cells: int - cells per side of a WallIndex bucket
+        """
+        self.width = width
+        self.height = height
+        self.complexity = complexity
+        self.seeds = iter(seeds)
+        self.depth = depth
+        self.cache = cache
+        self.cell_size = cell_size
+        self.bucket_cells = bucket_cells
+        self.pending = deque()  # (seed, AsyncResult) of the mazes being made, oldest first.
+        self.pool = None
+        self.waits = []  # seconds next() blocked for each maze, unpacking included.
+        self.generate_seconds = []  # seconds each maze took to generate or load, wherever.
+        self.loaded = []  # whether each maze was loaded from the cache.
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """
+        Kill the workers, dropping the mazes not asked for yet, even half-made ones.
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.pending.clear()
+
+    def _top_up(self):
+        while len(self.pending) < self.depth:
+            seed = next(self.seeds, None)
+            if seed is None:
+                return
+            if self.pool is None:
+                self.pool = multiprocessing.get_context("spawn").Pool(
+                    self.depth, initializer=_lowerPriority
+                )
+            result = self.pool.apply_async(
+                _generatePacked,
+                (
+                    self.width,
+                    self.height,
+                    self.complexity,
+                    seed,
+                    self.cache,
+                    self.cell_size,
+                    self.bucket_cells,
+                ),
+            )
+            self.pending.append((seed, result))
+
+    def next(self):
+        """
+        The next maze of the session, waiting for it if it is not ready yet.
+
+        Returns:
+            (seed, MazeGrid, DistanceField, WallIndex), the last two None without a
+            cell_size; or None once every seed has been used
+        """
+        start = time.perf_counter()
+        if self.pending:
+            seed, result = self.pending.popleft()
+            self._top_up()
+            (packed_maze, packed_distances, packed_walls), seconds, loaded = result.get()
+            maze = MazeGrid.from_packed(self.width, self.height, packed_maze)
+            distance_field = wall_index = None
+            if self.cell_size is not None:
+                exit_cell = (self.width - 1, self.height - 1)
+                distance_field = DistanceField(maze, [exit_cell], packed_distances)
+                wall_index = WallIndex(maze, self.cell_size, self.bucket_cells, packed_walls)
+        else:
+            seed = next(self.seeds, None)
+            if seed is None:
+                return None
+            maze, distance_field, wall_index, seconds, loaded = _makeLevel(
+                self.width,
+                self.height,
+                self.complexity,
+                seed,
+                self.cache,
+                self.cell_size,
+                self.bucket_cells,
+            )
+            self._top_up()
+        self.generate_seconds.append(seconds)
+        self.loaded.append(loaded)
+        self.waits.append(time.perf_counter() - start)
+        return seed, maze, distance_field, wall_index
@@ -0,0 +1,117 @@
+import csv
+import json
+import time
+from array import array
+
+import numpy as np
+
+
+class FrameProfiler:
+    """
+    Per-stage frame timings in a fixed-size ring buffer.
+
+    A frame is a sequence of laps: start_frame() takes a timestamp, and every lap(stage)
+    charges the time since the previous timestamp to that stage. Timings are integer
+    nanoseconds from time.perf_counter_ns(), stored in one flat array('q') of
+    `history` frames x stages, so recording a lap allocates nothing. The buffer keeps
+    the last `history` frames; summaries are computed with NumPy only when asked for.
+    """
+
+    def __init__(self, stages, history=600):
+        """
+        Args:
+            stages: list of stage names, in the order they run in a frame
+            history: int - frames kept in the ring buffer
+        """
+        self.stages = list(stages)
+        self.stage_index = {name: i for i, name in enumerate(self.stages)}
+        self.history = history
+        self.samples = array("q", [0]) * (history * len(self.stages))
+        self.frames = 0  # frames recorded since the start, including overwritten ones.
+        self._row = 0  # offset of the current frame's row in `samples`.
+        self._last = 0
+
+    def start_frame(self):
+        """
+        Begin a new frame, reusing the oldest row once the buffer is full.
+        """
+        stage_count = len(self.stages)
+        self._row = (self.frames % self.history) * stage_count
+        self.samples[self._row : self._row + stage_count] = array("q", [0]) * stage_count
+        self.frames += 1
+        self._last = time.perf_counter_ns()
+
+    def lap(self, stage):
+        """
+        Charge the time since the last lap (or start_frame) to `stage`.
+        """
+        now = time.perf_counter_ns()
+        self.samples[self._row + self.stage_index[stage]] += now - self._last
+        self._last = now
+
+    def skip(self):
+        """
+        Leave the time since the last lap out of every stage, e.g. time slept waiting for
+        input, which is not work of the frame.
+        """
+        self._last = time.perf_counter_ns()
+
+    def timings(self):
+        """
+        Recorded frames, oldest first, as a (frames, stages) int64 array of nanoseconds.
+        """
+        stage_count = len(self.stages)
+        rows = np.frombuffer(self.samples, dtype=np.int64).reshape(self.history, stage_count)
+        count = min(self.frames, self.history)
+        if self.frames <= self.history:
+            return rows[:count].copy()
+        start = self.frames % self.history
+        return np.concatenate((rows[start:], rows[:start]))
+
+    def frame_times_ms(self):
+        """
+        Total time of every recorded frame, oldest first, in milliseconds.
+        """
+        return self.timings().sum(axis=1) / 1e6
+
+    def percentiles(self, percents=(50, 95, 99)):
+        """
+        Percentiles of every stage and of the whole frame, in milliseconds.
+
+        Returns:
+            dict: stage name (and "frame") -> list of values, one per percent
+        """
+        timings = self.timings()
+        if len(timings) == 0:
+            return {}
+        columns = dict(zip(self.stages, timings.T))
+        columns["frame"] = timings.sum(axis=1)
+        return {
+            name: (np.percentile(column, percents) / 1e6).round(3).tolist()
+            for name, column in columns.items()
+        }
+
+    def dump(self, path, percents=(50, 95, 99)):
+        """
+        Write the recorded frames to `path`: a summary plus every frame as JSON, or one
+        row of per-stage milliseconds per frame as CSV, depending on the extension.
+        """
+        timings = self.timings() / 1e6
+        if str(path).endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.stages + ["frame"])
+                for row in timings.round(4).tolist():
+                    writer.writerow(row + [round(sum(row), 4)])
+            return
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "stages": self.stages,
+                    "frames_recorded": self.frames,
+                    "percents": list(percents),
+                    "percentiles_ms": self.percentiles(percents),
+                    "frames_ms": timings.round(4).tolist(),
+                },
+                f,
+            )
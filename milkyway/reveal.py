@@ -0,0 +1,135 @@
+import numpy as np
+
+from .mazegrid import CELL_REVEALED, CELL_WALL
+
+
+class RevealEngine:
+    """
+    Reveals hidden walls as echo rings sweep over them, and remembers them.
+
+    The revealed state is the CELL_REVEALED bit on the maze grid, so it persists after
+    the echo that found a wall has faded. Every ring keeps its origin (in pixels) plus
+    the radius it had at the previous tick and the radius it has now. A tick only looks
+    at the annulus between those two radii, inside the ring's bounding box clamped to
+    the maze, so the cost scales with the ring area and not with maze size.
+
+    With a LineOfSight, a ring only reveals the walls in line of sight of its origin cell,
+    measured from that cell's center, instead of every wall inside the circle.
+    """
+
+    def __init__(self, maze, cell_size, line_of_sight=None):
+        """
+        Args:
+            maze: MazeGrid - the maze whose walls get revealed
+            cell_size: int - pixels per cell
+            line_of_sight: optional LineOfSight - None -> rings see through walls
+        """
+        self.maze = maze
+        self.cell_size = cell_size
+        self.line_of_sight = line_of_sight
+        self.rings = {}  # ring id -> [origin x, origin y, previous radius, radius]
+        self._next_ring_id = 0
+        # pixel coordinates of the cell centers of every column and row, computed once.
+        self._center_x = np.arange(maze.width, dtype=np.int64) * cell_size + cell_size // 2
+        self._center_y = np.arange(maze.height, dtype=np.int64) * cell_size + cell_size // 2
+
+    def add_ring(self, origin, radius=0):
+        """
+        Start tracking a new ring centered on `origin`, a pixel (x, y) tuple.
+
+        Returns:
+            int: id of the ring, for set_radius() and remove_ring().
+        """
+        ring_id = self._next_ring_id
+        self._next_ring_id += 1
+        # previous radius -1: nothing covered yet, so the first tick includes the origin.
+        self.rings[ring_id] = [origin[0], origin[1], -1, radius]
+        return ring_id
+
+    def set_radius(self, ring_id, radius):
+        self.rings[ring_id][3] = radius
+
+    def set_radii(self, ring_ids, radii):
+        rings = self.rings
+        for ring_id, radius in zip(ring_ids, radii):
+            rings[ring_id][3] = radius
+
+    def remove_ring(self, ring_id):
+        self.rings.pop(ring_id, None)
+
+    def shift(self, dx, dy):
+        """
+        Move every ring origin by (dx, dy) pixels, e.g. when the maze under them scrolls.
+        """
+        for ring in self.rings.values():
+            ring[0] += dx
+            ring[1] += dy
+        if self.line_of_sight is not None:
+            self.line_of_sight.clear()  # the cached shadowcasts are of the old position.
+
+    def tick(self):
+        """
+        Reveal the hidden walls covered by every ring since the last tick.
+
+        Returns:
+            list: (x, y) cells that were revealed by this tick.
+        """
+        newly_revealed = []
+        for ring in self.rings.values():
+            cx, cy, previous_radius, radius = ring
+            if radius <= previous_radius:
+                continue
+            ring[2] = radius
+            if self.line_of_sight is not None:
+                newly_revealed.extend(self._reveal_visible(cx, cy, previous_radius, radius))
+            else:
+                newly_revealed.extend(self._reveal_annulus(cx, cy, previous_radius, radius))
+        return newly_revealed
+
+    def _reveal_visible(self, cx, cy, inner_radius, outer_radius):
+        """
+        Reveal hidden walls in line of sight of the cell under (cx, cy) whose distance from
+        that cell's center lies in inner_radius < distance <= outer_radius.
+        """
+        cell_size = self.cell_size
+        walls = self.line_of_sight.walls_between(
+            (cx // cell_size, cy // cell_size),
+            inner_radius / cell_size if inner_radius >= 0 else -1,
+            outer_radius / cell_size,
+        )
+        width, cells = self.maze.width, self.maze.data
+        newly = []
+        for x, y in walls:
+            index = y * width + x
+            if cells[index] & (CELL_WALL | CELL_REVEALED) == CELL_WALL:
+                cells[index] |= CELL_REVEALED
+                newly.append((x, y))
+        return newly
+
+    def _reveal_annulus(self, cx, cy, inner_radius, outer_radius):
+        """
+        Reveal hidden walls whose cell center lies in inner_radius < distance <= outer_radius.
+        """
+        cell_size = self.cell_size
+        min_x = max(0, (cx - outer_radius) // cell_size)
+        max_x = min(self.maze.width, (cx + outer_radius) // cell_size + 1)
+        min_y = max(0, (cy - outer_radius) // cell_size)
+        max_y = min(self.maze.height, (cy + outer_radius) // cell_size + 1)
+        if min_x >= max_x or min_y >= max_y:
+            return []
+
+        box = self.maze.view(min_x, min_y, max_x, max_y)
+        dx = self._center_x[min_x:max_x] - cx
+        dy = self._center_y[min_y:max_y] - cy
+        dist_sq = dy[:, np.newaxis] ** 2 + dx[np.newaxis, :] ** 2
+        in_ring = dist_sq <= outer_radius * outer_radius
+        if inner_radius >= 0:
+            in_ring &= dist_sq > inner_radius * inner_radius
+
+        hidden_wall = (box & (CELL_WALL | CELL_REVEALED)) == CELL_WALL
+        newly = in_ring & hidden_wall
+        ys, xs = np.nonzero(newly)
+        if len(xs) == 0:
+            return []
+        box[ys, xs] |= CELL_REVEALED
+        return list(zip((xs + min_x).tolist(), (ys + min_y).tolist()))
@@ -0,0 +1,293 @@
+import heapq
+from array import array
+from collections import deque
+
+import numpy as np
+
+from .mazegrid import CELL_WALL
+
+UNSOLVED = -2  # Solver.next: no path through this cell is known yet.
+NO_PATH = -1  # Solver.next: the goal cannot be reached from this cell.
+
+
+def _open_index(maze, cell):
+    """
+    Flat index of `cell`, or None when it is outside the maze or a wall.
+    """
+    x, y = cell
+    if not maze.in_bounds(x, y) or maze.is_wall(x, y):
+        return None
+    return y * maze.width + x
+
+
+def _to_coordinates(indices, width):
+    """
+    Flat cell indices as an (n, 2) int32 array of (x, y) coordinates.
+    """
+    indices = np.asarray(indices, dtype=np.int32)
+    path = np.empty((len(indices), 2), dtype=np.int32)
+    np.remainder(indices, width, out=path[:, 0])
+    np.floor_divide(indices, width, out=path[:, 1])
+    return path
+
+
+def _trace(parent, end, width):
+    """
+    The path from the root of a parent array (the cell that is its own parent) to `end`.
+    """
+    indices = [end]
+    while parent[end] != end:
+        end = parent[end]
+        indices.append(end)
+    indices.reverse()
+    return _to_coordinates(indices, width)
+
+
+def _descend(dist, index, width, height):
+    """
+    The cells from `index` down a BFS distance array to its source, `index` excluded.
+    """
+    last_row = (height - 1) * width
+    cells = []
+    while dist[index] > 0:
+        x = index % width
+        for neighbour, in_bounds in (
+            (index - width, index >= width),
+            (index + 1, x < width - 1),
+            (index + width, index < last_row),
+            (index - 1, x > 0),
+        ):
+            if in_bounds and dist[neighbour] == dist[index] - 1:
+                index = neighbour
+                break
+        cells.append(index)
+    return cells
+
+
+def bfs(maze, start, goal):
+    """
+    Shortest path from start to goal with a breadth-first search.
+
+    Args:
+        maze: MazeGrid
+        start, goal: (x, y) cells
+
+    Returns:
+        numpy.ndarray: (n, 2) int32 array of the (x, y) cells walked, both ends included.
+            Empty (0, 2) when there is no path.
+    """
+    width, height = maze.width, maze.height
+    start_index, goal_index = _open_index(maze, start), _open_index(maze, goal)
+    if start_index is None or goal_index is None:
+        return _to_coordinates([], width)
+    cells = maze.data
+    parent = array("i", [-1]) * (width * height)
+    parent[start_index] = start_index
+    queue = deque([start_index])
+    last_row = (height - 1) * width
+    while queue:
+        current = queue.popleft()
+        if current == goal_index:
+            return _trace(parent, goal_index, width)
+        x = current % width
+        for neighbour, in_bounds in (
+            (current - width, current >= width),
+            (current + 1, x < width - 1),
+            (current + width, current < last_row),
+            (current - 1, x > 0),
+        ):
+            if in_bounds and parent[neighbour] == -1 and not cells[neighbour] & CELL_WALL:
+                parent[neighbour] = current
+                queue.append(neighbour)
+    return _to_coordinates([], width)
+
+
+def astar(maze, start, goal):
+    """
+    Shortest path from start to goal with A* and the Manhattan distance as heuristic.
+    Among cells of equal estimate, the one furthest from the start is expanded first.
+
+    Same arguments and result as bfs().
+    """
+    width, height = maze.width, maze.height
+    start_index, goal_index = _open_index(maze, start), _open_index(maze, goal)
+    if start_index is None or goal_index is None:
+        return _to_coordinates([], width)
+    cells = maze.data
+    goal_x, goal_y = goal
+    parent = array("i", [-1]) * (width * height)
+    cost = array("i", [-1]) * (width * height)  # steps from the start, -1 -> not reached.
+    parent[start_index] = start_index
+    cost[start_index] = 0
+    heap = [(abs(start[0] - goal_x) + abs(start[1] - goal_y), 0, start_index)]
+    last_row = (height - 1) * width
+    push, pop = heapq.heappush, heapq.heappop
+    while heap:
+        _, negative_cost, current = pop(heap)
+        if current == goal_index:
+            return _trace(parent, goal_index, width)
+        if -negative_cost > cost[current]:
+            continue  # a shorter way to this cell was pushed after this entry.
+        next_cost = cost[current] + 1
+        x, y = current % width, current // width
+        for neighbour, in_bounds, neighbour_x, neighbour_y in (
+            (current - width, current >= width, x, y - 1),
+            (current + 1, x < width - 1, x + 1, y),
+            (current + width, current < last_row, x, y + 1),
+            (current - 1, x > 0, x - 1, y),
+        ):
+            if (
+                in_bounds
+                and not cells[neighbour] & CELL_WALL
+                and (cost[neighbour] == -1 or next_cost < cost[neighbour])
+            ):
+                cost[neighbour] = next_cost
+                parent[neighbour] = current
+                estimate = next_cost + abs(neighbour_x - goal_x) + abs(neighbour_y - goal_y)
+                push(heap, (estimate, -next_cost, neighbour))
+    return _to_coordinates([], width)
+
+
+def bidirectional_bfs(maze, start, goal):
+    """
+    Shortest path from start to goal with two breadth-first searches, one from each end,
+    growing the smaller frontier one whole level at a time until they meet.
+
+    Same arguments and result as bfs().
+    """
+    width, height = maze.width, maze.height
+    start_index, goal_index = _open_index(maze, start), _open_index(maze, goal)
+    if start_index is None or goal_index is None:
+        return _to_coordinates([], width)
+    if start_index == goal_index:
+        return _to_coordinates([start_index], width)
+    cells = maze.data
+    # steps from the start and from the goal, -1 -> not reached from that side.
+    from_start = array("i", [-1]) * (width * height)
+    from_goal = array("i", [-1]) * (width * height)
+    from_start[start_index] = 0
+    from_goal[goal_index] = 0
+    start_frontier, goal_frontier = [start_index], [goal_index]
+    last_row = (height - 1) * width
+    meeting, best = -1, -1
+    while start_frontier and goal_frontier and meeting == -1:
+        if len(start_frontier) <= len(goal_frontier):
+            frontier, dist, other = start_frontier, from_start, from_goal
+        else:
+            frontier, dist, other = goal_frontier, from_goal, from_start
+        next_frontier = []
+        for current in frontier:
+            next_distance = dist[current] + 1
+            x = current % width
+            for neighbour, in_bounds in (
+                (current - width, current >= width),
+                (current + 1, x < width - 1),
+                (current + width, current < last_row),
+                (current - 1, x > 0),
+            ):
+                if in_bounds and dist[neighbour] == -1 and not cells[neighbour] & CELL_WALL:
+                    dist[neighbour] = next_distance
+                    next_frontier.append(neighbour)
+                    if other[neighbour] != -1 and (
+                        meeting == -1 or next_distance + other[neighbour] < best
+                    ):
+                        # finish the level: a later meeting may still be shorter.
+                        meeting, best = neighbour, next_distance + other[neighbour]
+        if frontier is start_frontier:
+            start_frontier = next_frontier
+        else:
+            goal_frontier = next_frontier
+    if meeting == -1:
+        return _to_coordinates([], width)
+
+    # from the meeting cell, walk down each side's distances to its end.
+    towards_start = _descend(from_start, meeting, width, height)
+    towards_goal = _descend(from_goal, meeting, width, height)
+    towards_start.reverse()
+    return _to_coordinates(towards_start + [meeting] + towards_goal, width)
+
+
+ALGORITHMS = {"bfs": bfs, "astar": astar, "bidirectional": bidirectional_bfs}
+
+
+class Solver:
+    """
+    Paths from any cell of a maze to one goal cell, e.g. for auto-play.
+
+    Solved paths are cached per cell: `next` is an array('i') in the maze layout holding,
+    for every cell on a path found so far, the flat index of the next cell towards the
+    goal. A path from a cell that is already on one is followed without any search, so
+    after the first path, paths from along it cost O(steps asked for). A search is run
+    only from a cell no path went through, and its path is added to the cache. For paths
+    from anywhere with no search at all, see DistanceField.path().
+
+    The cache must be cleared when walls change.
+    """
+
+    def __init__(self, maze, goal, algorithm="bfs"):
+        """
+        Args:
+            maze: MazeGrid
+            goal: (x, y) cell, e.g. the exit
+            algorithm: "bfs", "astar" or "bidirectional"
+        """
+        self.maze = maze
+        self.goal = goal
+        self.search = ALGORITHMS[algorithm]
+        self.next = array("i", [UNSOLVED]) * (maze.width * maze.height)
+        self.searches = 0  # searches run so far; the other path() calls were cache hits.
+
+    def clear(self):
+        self.next = array("i", [UNSOLVED]) * (self.maze.width * self.maze.height)
+
+    def _solve(self, index):
+        width = self.maze.width
+        path = self.search(self.maze, (index % width, index // width), self.goal)
+        self.searches += 1
+        if len(path) == 0:
+            self.next[index] = NO_PATH
+            return
+        indices = (path[:, 1] * width + path[:, 0]).tolist()
+        following = self.next
+        for current, step in zip(indices, indices[1:]):
+            following[current] = step
+        following[indices[-1]] = indices[-1]  # the goal leads to itself.
+
+    def path(self, start, max_steps=None):
+        """
+        The cells walked from `start` to the goal, both ends included.
+
+        Args:
+            start: (x, y) cell
+            max_steps: optional int - stop after this many steps, e.g. for a hint
+
+        Returns:
+            numpy.ndarray: (n, 2) int32 array of (x, y) cells; empty when start is a wall,
+                outside the maze or cut off from the goal
+        """
+        width = self.maze.width
+        index = _open_index(self.maze, start)
+        if index is None:
+            return _to_coordinates([], width)
+        following = self.next
+        if following[index] == UNSOLVED:
+            self._solve(index)
+        if following[index] == NO_PATH:
+            return _to_coordinates([], width)
+        indices = [index]
+        steps = 0
+        while following[index] != index and (max_steps is None or steps < max_steps):
+            index = following[index]
+            indices.append(index)
+            steps += 1
+        return _to_coordinates(indices, width)
+
+    def next_cell(self, cell):
+        """
+        The cell after `cell` on its way to the goal: `cell` itself on the goal, None when
+        there is no way.
+        """
+        path = self.path(cell, 1)
+        if len(path) == 0:
+            return None
+        return tuple(path[-1].tolist())
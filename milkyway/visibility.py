@@ -0,0 +1,139 @@
+from bisect import bisect_right
+from collections import OrderedDict
+
+from .mazegrid import CELL_WALL
+
+# Each quadrant maps (depth, column) to a cell offset from the origin: north, east, south, west.
+_QUADRANTS = ((0, -1, 1, 0), (1, 0, 0, 1), (0, 1, 1, 0), (-1, 0, 0, 1))
+
+
+class Shadowcast:
+    """
+    The walls in line of sight of one origin cell, found by symmetric shadowcasting.
+
+    The scan moves outwards one depth (row of cells) at a time, in all four quadrants at
+    once, and only as far as it has been asked to: extend(depth) picks up where the last
+    call stopped. Slopes are kept as integer fractions, so there is no rounding.
+
+    Walls are stored sorted by squared distance (in cells) from the origin cell center.
+    A wall is only stored once every wall at least as close has been found, so the sorted
+    lists are final up to the depth scanned so far.
+    """
+
+    __slots__ = ("maze", "origin", "depth", "rows", "distances", "walls", "_pending", "_seen")
+
+    def __init__(self, maze, origin):
+        """
+        Args:
+            maze: MazeGrid
+            origin: (x, y) cell the sound comes from
+        """
+        self.maze = maze
+        self.origin = origin
+        self.depth = 0
+        self.distances = []  # squared distances of the walls below, in cells, ascending.
+        self.walls = []  # (x, y) walls in line of sight.
+        self._pending = []  # (squared distance, x, y) walls found beyond the scanned depth.
+        self._seen = set()  # cells on a quadrant edge are scanned twice; store them once.
+        x, y = origin
+        if maze.is_wall(x, y):
+            self.distances.append(0)
+            self.walls.append(origin)
+            self.rows = []
+        else:
+            # one row per quadrant: (quadrant, start slope, end slope) as numerator/denominator.
+            self.rows = [(quadrant, -1, 1, 1, 1) for quadrant in _QUADRANTS]
+
+    def extend(self, depth):
+        """
+        Scan every row up to `depth` cells from the origin.
+        """
+        maze = self.maze
+        width, height, cells = maze.width, maze.height, maze.data
+        ox, oy = self.origin
+        found = self._pending
+        seen = self._seen
+        while self.depth < depth and self.rows:
+            row_depth = self.depth + 1
+            next_rows = []
+            for quadrant, start_n, start_d, end_n, end_d in self.rows:
+                qx, qy, cx, cy = quadrant
+                # columns whose centers lie between the slopes, rounding ties outwards.
+                min_col = (2 * row_depth * start_n + start_d) // (2 * start_d)
+                max_col = -((end_d - 2 * row_depth * end_n) // (2 * end_d))
+                previous_wall = None
+                for col in range(min_col, max_col + 1):
+                    x = ox + qx * row_depth + cx * col
+                    y = oy + qy * row_depth + cy * col
+                    if 0 <= x < width and 0 <= y < height:
+                        wall = cells[y * width + x] & CELL_WALL != 0
+                        if wall and (x, y) not in seen:
+                            seen.add((x, y))
+                            found.append((row_depth * row_depth + col * col, x, y))
+                    else:
+                        wall = True  # outside the maze blocks like a wall.
+                    if previous_wall is True and not wall:
+                        start_n, start_d = 2 * col - 1, 2 * row_depth
+                    elif previous_wall is False and wall:
+                        next_rows.append((quadrant, start_n, start_d, 2 * col - 1, 2 * row_depth))
+                    previous_wall = wall
+                if previous_wall is False:
+                    next_rows.append((quadrant, start_n, start_d, end_n, end_d))
+            self.rows = next_rows
+            self.depth = row_depth
+
+        # every wall within `depth` of the origin has been found now.
+        settled_limit = self.depth * self.depth if self.rows else float("inf")
+        found.sort()
+        settled = bisect_right(found, (settled_limit, width, height))
+        for distance, x, y in found[:settled]:
+            self.distances.append(distance)
+            self.walls.append((x, y))
+        del found[:settled]
+
+    def walls_between(self, inner, outer):
+        """
+        Walls in line of sight with inner < distance <= outer, in cells. inner < 0 includes
+        the origin. Scans further first if needed.
+        """
+        self.extend(int(outer) + 1)
+        lo = 0 if inner < 0 else bisect_right(self.distances, inner * inner)
+        hi = bisect_right(self.distances, outer * outer)
+        return self.walls[lo:hi]
+
+
+class LineOfSight:
+    """
+    Shadowcasts cached by origin cell, least recently used dropped first.
+
+    Repeated echoes from the same cell reuse the walls already found and only scan the
+    rows beyond them. The cache must be cleared when the maze under it changes.
+    """
+
+    def __init__(self, maze, max_origins=256):
+        """
+        Args:
+            maze: MazeGrid
+            max_origins: int - shadowcasts kept in the cache
+        """
+        self.maze = maze
+        self.max_origins = max_origins
+        self.shadowcasts = OrderedDict()  # (x, y) -> Shadowcast
+
+    def walls_between(self, origin, inner, outer):
+        """
+        Walls in line of sight of the `origin` cell with inner < distance <= outer cells.
+        """
+        if not self.maze.in_bounds(*origin):
+            return []
+        shadowcast = self.shadowcasts.get(origin)
+        if shadowcast is None:
+            shadowcast = self.shadowcasts[origin] = Shadowcast(self.maze, origin)
+            if len(self.shadowcasts) > self.max_origins:
+                self.shadowcasts.popitem(last=False)
+        else:
+            self.shadowcasts.move_to_end(origin)
+        return shadowcast.walls_between(inner, outer)
+
+    def clear(self):
+        self.shadowcasts.clear()
@@ -0,0 +1,202 @@
+"""
+Record a game and replay it headless.
+
+A recording is the maze seed and size, the game config, and one byte of input and the
+simulation steps run per frame (see milkyway.app.inputs.RecordingInput), saved as JSON
+together with the result of the game. Since the game advances by fixed steps and the maze
+comes from the seed, replaying the input plays the game out again exactly. Replays run
+on SDL's dummy video driver with no frame rate cap, and check that the result is the
+recorded one: solved or not, echoes used and frame count. Version 1 recordings, from
+before the fixed timestep, ran one step per frame and replay that way.
+
+    python replay.py record game.json --seed 42
+    python replay.py play game.json other.json --dump frames.csv
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import zlib
+
+import pygame
+
+from milkyway.app import game
+from milkyway.app.inputs import KeyboardInput, RecordingInput, ReplayInput
+
+SESSION_VERSION = 2
+VERIFIED_KEYS = ("solved", "echoes_used", "frames")
+# the config constants of the game module that change how a game plays out, and so are
+# recorded and replayed. Paths, caches, colors and sound are left to the machine replaying.
+SIMULATION_CONFIG = (
+    "SIMULATION_RATE",
+    "MAX_STEPS_PER_FRAME",
+    "MAZE_COMPLEXITY",
+    "CELL_SIZE",
+    "ECHO_RADIUS_START",
+    "ECHO_RADIUS_INCREMENT",
+    "ECHO_ALPHA_START",
+    "ECHO_ALPHA_DECREMENT",
+    "MAX_ECHOES_ALLOWED",
+    "ECHO_POOL_CAPACITY",
+    "SONAR_MODE",
+    "SONAR_INTERVAL_FRAMES",
+    "ECHO_LINE_OF_SIGHT",
+    "PLAYER_SIZE",
+    "PLAYER_START_X",
+    "PLAYER_START_Y",
+    "PLAYER_XAXIS_MOVEMENT_SPEED",
+    "PLAYER_YAXIS_MOVEMENT_SPEED",
+    "PLAYER_SHIFT_KEY_MULTIPLIER",
+    "PLAYER_DIAGONAL_MOVEMENT_FACTOR",
+    "ENDLESS_MODE",
+    "ENDLESS_WINDOW_ROWS",
+    "ENDLESS_SCROLL_ROWS",
+    # the window size decides when ENDLESS_MODE pulls in new rows.
+    "RENDER_MODE",
+    "WINDOW_MAX_SIZE",
+    "HUD_PANEL_WIDTH",
+)
+
+
+def configSnapshot():
+    """
+    The SIMULATION_CONFIG constants of the game module, as JSON values.
+    """
+    config = {}
+    for name in SIMULATION_CONFIG:
+        value = getattr(game, name)
+        config[name] = list(value) if isinstance(value, tuple) else value
+    return config
+
+
+def applyConfig(config):
+    """
+    Set game's config constants from a snapshot. Constants outside SIMULATION_CONFIG
+    are ignored, e.g. MAZE_CACHE_DIR in recordings made before it was left out.
+
+    Returns:
+        dict: the values they had before, to restore with applyConfig()
+    """
+    previous = {}
+    for name, value in config.items():
+        if name not in SIMULATION_CONFIG or not hasattr(game, name):
+            continue  # not recorded any more, or a constant that no longer exists.
+        previous[name] = getattr(game, name)
+        setattr(game, name, tuple(value) if isinstance(value, list) else value)
+    return previous
+
+
+def makeSession(maze_size, config, source, result):
+    """
+    The recording of a game played with a RecordingInput, as saved by record().
+
+    Args:
+        maze_size: (width, height) the game was started with
+        config: configSnapshot() taken before the game
+        source: the RecordingInput the game was played with
+        result: what runGame() returned
+    """
+    return {
+        "version": SESSION_VERSION,
+        "maze_size": list(maze_size),
+        "seed": result["seed"],
+        "config": config,
+        "result": {key: result[key] for key in VERIFIED_KEYS},
+        # zlib does well on the long runs of identical frames.
+        "inputs": base64.b64encode(zlib.compress(bytes(source.masks), 9)).decode("ascii"),
+        "steps": base64.b64encode(zlib.compress(bytes(source.steps), 9)).decode("ascii"),
+    }
+
+
+def record(path, maze_size, seed):
+    """
+    Play a game with the keyboard and save it, with its input, to `path`.
+    """
+    config = configSnapshot()
+    source = RecordingInput(KeyboardInput(), game.INPUT_BINDINGS)
+    result = game.runGame(maze_size, input_source=source, seed=seed)
+    game.printGameOver(result)
+    session = makeSession(maze_size, config, source, result)
+    with open(path, "w") as f:
+        json.dump(session, f, indent=1)
+    print(f"Recorded {len(source.masks)} frames to {path}")
+
+
+def replay(session, dump_path=None):
+    """
+    Replay a recorded session headless and as fast as possible.
+
+    Returns:
+        (dict, float): the replayed result and the wall time it took, in seconds
+    """
+    if session["version"] not in (1, SESSION_VERSION):
+        raise ValueError(f"unsupported recording version {session['version']}")
+    masks = zlib.decompress(base64.b64decode(session["inputs"]))
+    steps = zlib.decompress(base64.b64decode(session["steps"])) if "steps" in session else None
+    previous = applyConfig(session["config"])
+    game.WINDOW_FULLSCREEN = False  # the window does not change how the game plays out.
+    try:
+        start = time.perf_counter()
+        result = game.runGame(
+            tuple(session["maze_size"]),
+            frame_rate=0,
+            input_source=ReplayInput(game.INPUT_BINDINGS, masks, steps),
+            max_frames=session["result"]["frames"],
+            seed=session["seed"],
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        applyConfig(previous)
+    if dump_path:
+        result["profiler"].dump(dump_path)
+    return result, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a game and replay it headless.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="play a game and record it")
+    record_parser.add_argument("path", help="JSON file to write")
+    record_parser.add_argument("--size", type=lambda text: tuple(map(int, text.lower().split("x"))),
+                               default=(game.MAZE_W, game.MAZE_H), help="maze size as WIDTHxHEIGHT")
+    record_parser.add_argument("--seed", type=int, default=game.MAZE_SEED,
+                               help="maze seed (default: random)")
+
+    play_parser = commands.add_parser("play", help="replay recordings headless and verify them")
+    play_parser.add_argument("paths", nargs="+", help="recorded JSON files")
+    play_parser.add_argument("--dump", help="write the frame profile of the replay (.json or .csv); "
+                                            "with several recordings, of the last one")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.path, args.size, args.seed)
+        pygame.quit()
+        sys.exit()
+
+    # the video driver is read when pygame.init() opens the display, in runGame().
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    failures = 0
+    for path in args.paths:
+        with open(path) as f:
+            session = json.load(f)
+        result, elapsed = replay(session, args.dump)
+        expected = session["result"]
+        mismatches = [
+            f"{key} {result[key]} != {expected[key]}"
+            for key in VERIFIED_KEYS
+            if result[key] != expected[key]
+        ]
+        config = session["config"]
+        step_rate = config.get("SIMULATION_RATE", config.get("GAME_FRAME_RATE")) or game.SIMULATION_RATE
+        game_seconds = result["steps"] / step_rate
+        print(f"{path}: {'MISMATCH ' + ', '.join(mismatches) if mismatches else 'ok'} - "
+              f"{result['frames']} frames in {elapsed:.2f}s "
+              f"({game_seconds / max(elapsed, 1e-9):.1f}x real time)")
+        failures += bool(mismatches)
+    pygame.quit()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,182 @@
+"""
+Headless soak test of the real game loop.
+
+Runs game.runGame() on SDL's dummy video driver with synthetic input and no frame rate
+cap, for a number of frames per maze size, and reports the frame-time distribution,
+the slowest stages, peak RSS and memory allocated per frame.
+
+    python soak.py --sizes 30x21 301x301 1001x1001 --frames 1000 --input echospam
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from array import array
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+import pygame  # noqa: E402
+
+from milkyway.app import game  # noqa: E402
+from milkyway.app.inputs import AutoPlayInput, EchoSpamInput, RandomWalkInput, WallHugInput  # noqa: E402
+
+BINDINGS = game.INPUT_BINDINGS
+INPUTS = {
+    "random": lambda seed: RandomWalkInput(BINDINGS, seed),
+    "wallhug": lambda seed: WallHugInput(BINDINGS, game.CELL_SIZE, seed),
+    "echospam": lambda seed: EchoSpamInput(BINDINGS, seed),
+    "autoplay": lambda seed: AutoPlayInput(BINDINGS, game.CELL_SIZE, game.SOLVER_ALGORITHM),
+}
+
+
+class MeasuredInput:
+    """
+    Wraps an input and, since the loop polls it once at the start of every frame, takes
+    the per-frame measurements there: frame time, live allocated blocks and, with
+    tracemalloc on, the peak memory allocated during the frame.
+    """
+
+    def __init__(self, inner, trace):
+        self.inner = inner
+        self.trace = trace
+        # array('q') rather than lists, so recording a sample allocates no int objects.
+        self.frame_ns = array("q")
+        self.blocks = array("q")
+        self.frame_peak_bytes = array("q")
+        self._last_poll = None
+        self._last_traced = 0
+
+    def start(self, maze, player):
+        self.inner.start(maze, player)
+
+    def poll(self):
+        now = time.perf_counter_ns()
+        if self._last_poll is not None:
+            self.frame_ns.append(now - self._last_poll)
+        self._last_poll = now
+        self.blocks.append(sys.getallocatedblocks())
+        if self.trace:
+            current, peak = tracemalloc.get_traced_memory()
+            if len(self.blocks) > 1:
+                self.frame_peak_bytes.append(peak - self._last_traced)
+            self._last_traced = current
+            tracemalloc.reset_peak()
+        return self.inner.poll()
+
+    def pressed(self):
+        return self.inner.pressed()
+
+    def wait(self, timeout_ms):
+        self.inner.wait(timeout_ms)
+
+    def step_count(self, due):
+        return self.inner.step_count(due)
+
+    def mouse_pressed(self):
+        return self.inner.mouse_pressed()
+
+
+def soak(size, frames, input_name, seed, trace):
+    """
+    Run `frames` frames on a maze of `size`, starting a new maze whenever one is solved.
+
+    Returns:
+        dict: the report for this size
+    """
+    game.PROFILER_HISTORY_FRAMES = frames  # keep every frame for the stage percentiles.
+    stage_ms = []
+    measured = []
+    runs = 0
+    frames_left = frames
+    while frames_left > 0:
+        source = MeasuredInput(INPUTS[input_name](seed + runs), trace)
+        result = game.runGame(
+            size, frame_rate=0, input_source=source, max_frames=frames_left, seed=seed + runs
+        )
+        stage_ms.append(result["profiler"].timings() / 1e6)
+        measured.append(source)
+        frames_left -= result["frames"]
+        runs += 1
+        if result["frames"] == 0:
+            break  # the window was closed.
+
+    frame_ms = np.concatenate([np.frombuffer(m.frame_ns, dtype=np.int64) for m in measured]) / 1e6
+    stage_ms = np.concatenate(stage_ms)
+    net_blocks = sum(m.blocks[-1] - m.blocks[0] for m in measured if m.blocks)
+    report = {
+        "size": f"{size[0]}x{size[1]}",
+        "input": input_name,
+        "frames": int(len(stage_ms)),
+        "mazes": runs,
+        "fps_mean": round(1000 / frame_ms.mean(), 1) if len(frame_ms) else 0.0,
+        "frame_ms": {
+            f"p{p}": round(float(np.percentile(frame_ms, p)), 3) for p in (50, 95, 99)
+        }
+        | {"max": round(float(frame_ms.max()), 3)},
+        "stage_p95_ms": {
+            stage: round(float(np.percentile(stage_ms[:, i], 95)), 3)
+            for i, stage in enumerate(game.PROFILER_STAGES)
+        },
+        # ru_maxrss is in kilobytes on Linux; it is the peak of the whole process so far.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "net_blocks_per_frame": round(net_blocks / max(1, len(frame_ms)), 2),
+    }
+    if trace:
+        peaks = np.concatenate([np.frombuffer(m.frame_peak_bytes, dtype=np.int64) for m in measured])
+        report["allocated_bytes_per_frame"] = {
+            f"p{p}": int(np.percentile(peaks, p)) for p in (50, 95, 99)
+        }
+    return report
+
+
+def printReport(report):
+    frame = report["frame_ms"]
+    slowest = sorted(report["stage_p95_ms"].items(), key=lambda item: -item[1])[:3]
+    print("######")
+    print(f"{report['size']} maze, {report['input']} input: {report['frames']} frames over "
+          f"{report['mazes']} maze(s), {report['fps_mean']} fps")
+    print(f"  frame ms p50/p95/p99/max: {frame['p50']} / {frame['p95']} / {frame['p99']} / {frame['max']}")
+    print("  slowest stages (p95 ms): " + ", ".join(f"{s} {v}" for s, v in slowest))
+    print(f"  peak RSS: {report['peak_rss_mb']} MB, net allocated blocks per frame: "
+          f"{report['net_blocks_per_frame']}")
+    if "allocated_bytes_per_frame" in report:
+        allocated = report["allocated_bytes_per_frame"]
+        print(f"  bytes allocated per frame p50/p95/p99: {allocated['p50']} / "
+              f"{allocated['p95']} / {allocated['p99']}")
+
+
+def parseSize(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless soak test of the game loop.")
+    parser.add_argument("--sizes", nargs="+", type=parseSize, default=[(game.MAZE_W, game.MAZE_H)],
+                        help="maze sizes as WIDTHxHEIGHT (default: the configured size)")
+    parser.add_argument("--frames", type=int, default=1000, help="frames to run per size")
+    parser.add_argument("--input", choices=sorted(INPUTS), default="random")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the mazes and the synthetic input")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also measure bytes allocated per frame (slows the loop down)")
+    parser.add_argument("--json", help="write the reports to this file")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    reports = [soak(size, args.frames, args.input, args.seed, args.tracemalloc) for size in args.sizes]
+    pygame.quit()
+    print("########################################################")
+    print("Soak test")
+    for report in reports:
+        printReport(report)
+    print("########################################################")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,5 @@
+import os
+
+# the game tests open a window and an audio device; SDL reads these when pygame opens them.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,80 @@
+import os
+
+import numpy as np
+import pygame
+import pytest
+
+from milkyway.app.audio import EchoAudio, echo_profile, synthesize_echo
+
+SAMPLE_RATE = 44100
+RANGE = 10.0  # cells an echo is heard over.
+SECONDS_PER_CELL = 0.1  # long sounds, so the channels are still busy when the next one plays.
+PING_SAMPLES = int(0.03 * SAMPLE_RATE)
+
+
+@pytest.fixture
+def audio():
+    assert os.environ["SDL_AUDIODRIVER"] == "dummy"
+
+    def make(channels=4, max_bytes=8 * 1024 * 1024):
+        return EchoAudio(RANGE, SECONDS_PER_CELL, 0.5, channels, max_bytes, SAMPLE_RATE)
+
+    yield make
+    pygame.mixer.quit()
+
+
+def echo(walls, origin=(20, 20)):
+    """
+    The samples of an echo from `origin` off walls given relative to it, ping left out.
+    """
+    walls = [(origin[0] + dx, origin[1] + dy) for dx, dy in walls]
+    profile = echo_profile(origin, walls, RANGE)
+    return synthesize_echo(profile, SAMPLE_RATE, RANGE, SECONDS_PER_CELL)[PING_SAMPLES:].astype(
+        np.int64
+    )
+
+
+def test_echo_plays_on_the_dummy_driver(audio):
+    echo_audio = audio()
+    assert echo_audio.enabled
+    assert pygame.mixer.get_init() == (SAMPLE_RATE, -16, 2)
+    assert echo_audio.play((5, 5), [(6, 5), (5, 7)])
+    assert pygame.mixer.get_busy()
+    assert (echo_audio.hits, echo_audio.misses) == (0, 1)
+    # the same walls from the same cell: the cached sound.
+    assert echo_audio.play((5, 5), [(6, 5), (5, 7)])
+    assert (echo_audio.hits, echo_audio.misses) == (1, 1)
+
+
+def test_echoes_past_the_channels_are_dropped(audio):
+    echo_audio = audio(channels=2)
+    assert echo_audio.play((5, 5), [(6, 5)])
+    assert echo_audio.play((5, 5), [(4, 5)])
+    assert not echo_audio.play((5, 5), [(5, 8)])
+    assert echo_audio.dropped == 1
+    assert echo_audio.misses == 2  # a dropped echo is not synthesized.
+
+
+def test_sound_cache_stays_within_its_bytes(audio):
+    one_sound = synthesize_echo(echo_profile((0, 0), [], RANGE), SAMPLE_RATE, RANGE, SECONDS_PER_CELL)
+    echo_audio = audio(channels=8, max_bytes=one_sound.nbytes)
+    for x in range(1, 4):
+        echo_audio.play((0, 0), [(x, 0)])
+    assert len(echo_audio.sounds) == 1
+    assert echo_audio.bytes <= one_sound.nbytes
+
+
+def test_walls_on_the_right_are_heard_on_the_right():
+    right = echo([(3, 0)])
+    assert np.abs(right[:, 1]).sum() > 10 * np.abs(right[:, 0]).sum()
+    left = echo([(-3, 0)])
+    assert np.abs(left[:, 0]).sum() > 10 * np.abs(left[:, 1]).sum()
+    ahead = echo([(0, -3)])
+    assert np.abs(ahead[:, 0]).sum() == pytest.approx(np.abs(ahead[:, 1]).sum(), rel=0.01)
+
+
+def test_further_walls_are_quieter_and_later():
+    near, far = echo([(0, 2)]), echo([(0, 6)])
+    assert np.abs(near).max() > 2 * np.abs(far).max()
+    assert np.flatnonzero(near[:, 0])[0] < np.flatnonzero(far[:, 0])[0]
+    assert not echo([(0, int(RANGE) + 2)]).any()  # out of range: the ping alone.
@@ -0,0 +1,30 @@
+import pytest
+
+from milkyway import cli
+from milkyway.app import game
+
+
+@pytest.mark.parametrize("levels", ["0", "-2"])
+def test_fewer_than_one_level_is_an_argument_error(levels, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["--levels", levels])
+    assert exit_info.value.code == 2
+    assert "--levels: expected at least 1" in capsys.readouterr().err
+
+
+def test_a_session_needs_a_level():
+    with pytest.raises(ValueError):
+        game.runSession(levels=0)
+
+
+@pytest.mark.parametrize(
+    "content", [None, b"", b"EMAZ not really a maze"], ids=["missing", "empty", "bad"]
+)
+def test_an_unreadable_maze_file_is_an_argument_error(tmp_path, content, capsys):
+    path = tmp_path / "bug.maze"
+    if content is not None:
+        path.write_bytes(content)
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(["--maze-file", str(path)])
+    assert exit_info.value.code == 2
+    assert "--maze-file: " in capsys.readouterr().err
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from milkyway import MazeGrid, genMaze, wallRectangles
+
+
+def covered(maze, rects):
+    """
+    How many rectangles cover each cell, row by row.
+    """
+    counts = [[0] * maze.width for _ in range(maze.height)]
+    for x0, y0, x1, y1 in rects:
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                counts[y][x] += 1
+    return counts
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("kind", ["maze", "grid"])
+def test_every_wall_cell_is_in_exactly_one_rectangle(seed, kind):
+    rng = random.Random(seed)
+    if kind == "maze":
+        maze = genMaze(41, 29, seed=seed)
+    else:
+        maze = MazeGrid.from_rows([[rng.random() < 0.6 for _ in range(30)] for _ in range(20)])
+    walls = [[int(maze.is_wall(x, y)) for x in range(maze.width)] for y in range(maze.height)]
+    assert covered(maze, wallRectangles(maze)) == walls
+
+
+def test_a_wall_carries_on_through_the_wall_it_ends_on():
+    maze = MazeGrid.from_rows(
+        [
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [1, 1, 1, 1, 1],
+        ]
+    )
+    assert sorted(wallRectangles(maze)) == [(0, 2, 2, 3), (2, 0, 3, 3), (3, 2, 5, 3)]
+
+
+def test_identical_runs_become_one_rectangle():
+    maze = MazeGrid.from_rows([[0, 1, 1, 1, 0]] * 4)
+    assert list(wallRectangles(maze)) == [(1, 0, 4, 4)]
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from milkyway import UNREACHABLE, DistanceField, MazeGrid, genMaze
+
+
+def rebuilt(maze, targets):
+    """
+    The distances a new DistanceField computes from scratch on a copy of the maze.
+    """
+    copy = MazeGrid(maze.width, maze.height)
+    copy.data[:] = maze.data
+    return DistanceField(copy, targets).data.tolist()
+
+
+def randomGrid(width, height, rng, walls=0.3):
+    """
+    A grid with scattered walls and many loops, unlike a perfect maze.
+    """
+    return MazeGrid.from_rows(
+        [[rng.random() < walls for _ in range(width)] for _ in range(height)]
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("kind", ["maze", "grid"])
+def test_incremental_edits_match_a_rebuild(seed, kind):
+    rng = random.Random(seed)
+    if kind == "maze":
+        maze = genMaze(31, 21, seed=seed)
+    else:
+        maze = randomGrid(24, 18, rng)
+    targets = [(maze.width - 1, maze.height - 1)]
+    field = DistanceField(maze, targets)
+    for _ in range(200):
+        x, y = rng.randrange(maze.width), rng.randrange(maze.height)
+        if maze.is_wall(x, y):
+            field.set_path(x, y)
+        else:
+            field.set_wall(x, y)
+        assert field.data.tolist() == rebuilt(maze, targets), f"after editing {(x, y)}"
+
+
+def test_edits_with_several_targets():
+    rng = random.Random(7)
+    maze = randomGrid(20, 20, rng, walls=0.2)
+    targets = [(0, 0), (19, 19), (10, 5)]
+    field = DistanceField(maze, targets)
+    for _ in range(200):
+        x, y = rng.randrange(maze.width), rng.randrange(maze.height)
+        if maze.is_wall(x, y):
+            field.set_path(x, y)
+        else:
+            field.set_wall(x, y)
+        assert field.data.tolist() == rebuilt(maze, targets)
+
+
+def test_walling_off_the_exit_makes_everything_unreachable():
+    maze = genMaze(11, 11, seed=3)
+    field = DistanceField(maze, [(10, 10)])
+    field.set_wall(10, 10)
+    assert set(field.data) == {UNREACHABLE}
+    field.set_path(10, 10)
+    assert field.data.tolist() == rebuilt(maze, [(10, 10)])
+    assert field.distance(0, 0) != UNREACHABLE
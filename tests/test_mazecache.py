@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from milkyway import MazeCache, genMaze, loadMaze, saveMaze
+from milkyway.mazecache import MAZE_FILE_HEADER, MAZE_FILE_VERSION
+
+
+def test_a_saved_maze_loads_back_the_same(tmp_path):
+    maze = genMaze(37, 23, 0.6, seed=11)
+    path = tmp_path / "a.maze"
+    saveMaze(path, maze, 0.6, 11)
+    loaded, header = loadMaze(path)
+    assert (loaded.width, loaded.height) == (37, 23)
+    assert loaded.data == maze.data
+    assert header["complexity"] == 0.6 and header["seed"] == 11
+    assert not list(tmp_path.glob("*.partial"))
+
+
+@pytest.mark.parametrize(
+    "field, value", [(0, b"NOPE"), (1, MAZE_FILE_VERSION + 1)], ids=["magic", "version"]
+)
+def test_a_bad_header_is_not_a_maze_file(tmp_path, field, value):
+    path = tmp_path / "a.maze"
+    saveMaze(path, genMaze(9, 9, seed=1), 0.7, 1)
+    data = path.read_bytes()
+    header = list(MAZE_FILE_HEADER.unpack_from(data))
+    header[field] = value
+    path.write_bytes(MAZE_FILE_HEADER.pack(*header) + data[MAZE_FILE_HEADER.size :])
+    with pytest.raises(ValueError, match="not a maze file"):
+        loadMaze(path)
+
+
+@pytest.mark.parametrize("keep", [MAZE_FILE_HEADER.size - 1, MAZE_FILE_HEADER.size + 3])
+def test_a_truncated_file_is_rejected_and_dropped_from_the_cache(tmp_path, keep):
+    cache = MazeCache(str(tmp_path), 10**6)
+    expected = cache.get(41, 41, 0.7, 2)
+    path = cache.path(41, 41, 0.7, 2)
+    with open(path, "r+b") as file:
+        file.truncate(keep)
+    with pytest.raises(ValueError):
+        loadMaze(path)
+    assert cache.load(41, 41, 0.7, 2) is None
+    assert not os.path.exists(path)
+    assert cache.get(41, 41, 0.7, 2).data == expected.data
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_the_least_recently_used_files_are_evicted_first(tmp_path):
+    cache = MazeCache(str(tmp_path), 10**6)
+    seeds = [1, 2, 3, 4]
+    for age, seed in enumerate(seeds):
+        cache.get(51, 51, 0.7, seed)
+        mtime = 1_000_000 + age * 10  # seed 1 oldest, seed 4 newest.
+        os.utime(cache.path(51, 51, 0.7, seed), (mtime, mtime))
+    cache.get(51, 51, 0.7, 1)  # a hit: seed 1 becomes the most recently used.
+    size = os.path.getsize(cache.path(51, 51, 0.7, 1))
+
+    cache.max_bytes = 2 * size
+    cache.evict()
+    left = [seed for seed in seeds if os.path.exists(cache.path(51, 51, 0.7, seed))]
+    assert left == [1, 4]
+
+
+def test_an_unusable_directory_falls_back_to_generating(tmp_path, capsys):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    cache = MazeCache(str(blocker / "echomaze"), 10**6)
+    for _ in range(2):
+        assert cache.get(21, 21, 0.7, 3).data == genMaze(21, 21, 0.7, seed=3).data
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert capsys.readouterr().out.count("not working") == 1
+
+
+@pytest.mark.parametrize("seed", [-1, -(2**63), 2**64])
+def test_seeds_outside_64_unsigned_bits_do_not_break_the_cache(tmp_path, seed):
+    cache = MazeCache(str(tmp_path), 10**6)
+    expected = genMaze(21, 21, 0.7, seed=seed)
+    assert cache.get(21, 21, 0.7, seed).data == expected.data
+    assert cache.get(21, 21, 0.7, seed).data == expected.data
+    if seed < 2**63:
+        assert cache.hits == 1
+        assert loadMaze(cache.path(21, 21, 0.7, seed))[1]["seed"] == seed
+    else:
+        assert (cache.hits, cache.misses) == (0, 2)
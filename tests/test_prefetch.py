@@ -0,0 +1,35 @@
+from milkyway import DistanceField, MazeCache, MazePrefetcher, WallIndex, genMaze
+
+
+def test_levels_made_in_a_worker_match_levels_made_here():
+    seeds = [3, 4, 5]
+    with MazePrefetcher(41, 31, 0.7, seeds, depth=2, cell_size=10, bucket_cells=4) as prefetcher:
+        levels = [prefetcher.next() for _ in seeds]
+        assert prefetcher.next() is None
+    for seed, (level_seed, maze, distance_field, wall_index) in zip(seeds, levels):
+        expected = genMaze(41, 31, 0.7, seed=seed)
+        assert level_seed == seed
+        assert maze.data == expected.data
+        assert distance_field.data == DistanceField(expected, [(40, 30)]).data
+        fresh = WallIndex(expected, 10, 4)
+        assert wall_index.rects == fresh.rects
+        assert wall_index.buckets == fresh.buckets
+        assert sorted(wall_index.query(0, 0, 410, 310)) == sorted(fresh.query(0, 0, 410, 310))
+
+
+def test_without_a_cell_size_only_mazes_are_made():
+    with MazePrefetcher(21, 21, 0.7, [1, 2], depth=1) as prefetcher:
+        for _ in range(2):
+            _, maze, distance_field, wall_index = prefetcher.next()
+            assert (maze.width, maze.height) == (21, 21)
+            assert distance_field is None and wall_index is None
+
+
+def test_mazes_from_the_cache_are_reported_as_loaded(tmp_path):
+    cache = MazeCache(str(tmp_path), 10**6)
+    for loaded in (False, True):
+        with MazePrefetcher(31, 31, 0.7, [1, 2], depth=1, cache=cache) as prefetcher:
+            prefetcher.next()
+            prefetcher.next()
+        assert prefetcher.loaded == [loaded, loaded]
+        assert len(prefetcher.generate_seconds) == 2
@@ -0,0 +1,16 @@
+import time
+
+from milkyway import FrameProfiler
+
+
+def test_skipped_time_is_charged_to_no_stage():
+    profiler = FrameProfiler(["work", "tick"], history=4)
+    for _ in range(3):
+        profiler.start_frame()
+        profiler.lap("work")
+        time.sleep(0.05)
+        profiler.skip()
+        profiler.lap("tick")
+    assert profiler.frames == 3
+    assert profiler.frame_times_ms().max() < 10
+    assert profiler.percentiles()["frame"][2] < 10
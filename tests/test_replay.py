@@ -0,0 +1,81 @@
+import json
+
+import pygame
+import pytest
+
+import replay
+from milkyway import CELL_REVEALED, genMaze
+from milkyway.app import game
+from milkyway.app.inputs import EchoSpamInput, RandomWalkInput, RecordingInput, ReplayInput
+
+MAZE_SIZE = (21, 15)
+SEED = 1234
+FRAMES = 240
+
+
+@pytest.fixture(autouse=True)
+def closeWindow():
+    yield
+    pygame.quit()
+
+
+def play(source, maze):
+    return game.runGame(
+        MAZE_SIZE, frame_rate=0, input_source=source, max_frames=FRAMES, seed=SEED, maze=maze
+    )
+
+
+def seededMaze():
+    return genMaze(*MAZE_SIZE, game.MAZE_COMPLEXITY, seed=SEED)
+
+
+def outcome(result):
+    return {key: result[key] for key in (*replay.VERIFIED_KEYS, "steps")}
+
+
+@pytest.mark.parametrize("make_input", [RandomWalkInput, EchoSpamInput])
+def test_replay_plays_out_the_recorded_game(make_input):
+    config = replay.configSnapshot()
+    maze = seededMaze()
+    source = RecordingInput(make_input(game.INPUT_BINDINGS, seed=5), game.INPUT_BINDINGS)
+    recorded = play(source, maze)
+    assert recorded["echoes_used"] > 0
+
+    # through a saved recording, twice: nothing may carry over from one run to the next.
+    session = json.loads(json.dumps(replay.makeSession(MAZE_SIZE, config, source, recorded)))
+    for _ in range(2):
+        replayed, _ = replay.replay(session)
+        assert outcome(replayed) == outcome(recorded)
+
+    # the final state: every echo went off at the same place and revealed the same walls.
+    replayed_maze = seededMaze()
+    replayed = play(
+        ReplayInput(game.INPUT_BINDINGS, bytes(source.masks), bytes(source.steps)), replayed_maze
+    )
+    assert outcome(replayed) == outcome(recorded)
+    revealed = maze.cells & CELL_REVEALED
+    assert revealed.any()
+    assert (replayed_maze.cells & CELL_REVEALED == revealed).all()
+
+
+def test_version_1_recordings_replay_one_step_per_frame():
+    config = replay.configSnapshot()
+    source = RecordingInput(RandomWalkInput(game.INPUT_BINDINGS, seed=9), game.INPUT_BINDINGS)
+    recorded = play(source, seededMaze())
+    session = replay.makeSession(MAZE_SIZE, config, source, recorded)
+    session["version"] = 1
+    del session["steps"]
+    replayed, _ = replay.replay(session)
+    assert outcome(replayed) == outcome(recorded)
+
+
+def test_paths_are_not_recorded_or_replayed(monkeypatch):
+    monkeypatch.setattr(game, "MAZE_CACHE_DIR", "/home/recorder/.cache/echomaze")
+    monkeypatch.setattr(game, "PROFILER_DUMP_PATH", "recorder.json")
+    config = replay.configSnapshot()
+    assert "MAZE_CACHE_DIR" not in config and "PROFILER_DUMP_PATH" not in config
+    assert config["SIMULATION_RATE"] == game.SIMULATION_RATE
+    # recordings made before paths were left out still carry them.
+    previous = replay.applyConfig({**config, "MAZE_CACHE_DIR": "/proc/nope"})
+    assert game.MAZE_CACHE_DIR == "/home/recorder/.cache/echomaze"
+    replay.applyConfig(previous)
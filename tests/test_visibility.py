@@ -0,0 +1,142 @@
+import random
+from fractions import Fraction
+
+import pytest
+
+from milkyway import CELL_REVEALED, LineOfSight, MazeGrid, RevealEngine, genMaze
+
+CELL = 10  # pixels per cell for the RevealEngine.
+HALF = Fraction(1, 2)
+# (x, y) of one step deeper, then of one column across: north, east, south, west.
+QUADRANTS = ((0, -1, 1, 0), (1, 0, 0, 1), (0, 1, 1, 0), (-1, 0, 0, 1))
+
+
+def castRays(maze, origin):
+    """
+    Walls seen from the center of `origin` by brute force: a ray is cast along every
+    distinct slope of every quadrant and walked out one row of cells at a time. At each
+    row's center line it sees the cells it touches there, and it stops at the first row
+    where one of them is a wall or off the maze. This is the visibility symmetric
+    shadowcasting computes, one ray at a time.
+    """
+    ox, oy = origin
+    if maze.is_wall(ox, oy):
+        return {origin}
+    depth = max(maze.width, maze.height)
+    # the slopes where a ray starts or stops touching a cell, and one between each two.
+    edges = sorted(
+        {Fraction(2 * col + 1, 2 * row) for row in range(1, depth + 1) for col in range(-row - 1, row + 1)}
+        | {Fraction(-1), Fraction(1)}
+    )
+    edges = [slope for slope in edges if -1 <= slope <= 1]
+    slopes = edges + [(a + b) / 2 for a, b in zip(edges, edges[1:])]
+
+    seen = set()
+    for qx, qy, cx, cy in QUADRANTS:
+        for slope in slopes:
+            for row in range(1, depth + 1):
+                column = row * slope
+                blocked = False
+                for col in range(int(column) - 1, int(column) + 2):
+                    if not col - HALF <= column <= col + HALF:
+                        continue
+                    x, y = ox + qx * row + cx * col, oy + qy * row + cy * col
+                    if not maze.in_bounds(x, y):
+                        blocked = True
+                    elif maze.is_wall(x, y):
+                        seen.add((x, y))
+                        blocked = True
+                if blocked:
+                    break
+    return seen
+
+
+def clearLine(maze, start, end, ignore):
+    """
+    Whether the segment between two points, in cells, stays out of every wall but
+    `ignore`. Walls are grown by a hair, so lines grazing a corner count as blocked.
+    """
+    (ax, ay), (bx, by) = start, end
+    grow = 1e-6
+    for y in range(int(min(ay, by)) - 1, int(max(ay, by)) + 2):
+        for x in range(int(min(ax, bx)) - 1, int(max(ax, bx)) + 2):
+            if (x, y) == ignore or not maze.in_bounds(x, y) or not maze.is_wall(x, y):
+                continue
+            # Liang-Barsky: clip the segment to the wall's square.
+            enter, leave = 0.0, 1.0
+            for p, q in (
+                (ax - bx, ax - (x - grow)),
+                (bx - ax, x + 1 + grow - ax),
+                (ay - by, ay - (y - grow)),
+                (by - ay, y + 1 + grow - ay),
+            ):
+                if p == 0:
+                    if q <= 0:
+                        enter, leave = 1.0, 0.0
+                elif p < 0:
+                    enter = max(enter, q / p)
+                else:
+                    leave = min(leave, q / p)
+            if enter < leave:
+                return False
+    return True
+
+
+def revealed(maze):
+    return {
+        (x, y)
+        for y in range(maze.height)
+        for x in range(maze.width)
+        if maze.data[y * maze.width + x] & CELL_REVEALED
+    }
+
+
+def echo(maze, origin, radii):
+    """
+    The walls an echo from `origin` reveals as its ring grows through `radii` (cells).
+    """
+    engine = RevealEngine(maze, CELL, LineOfSight(maze))
+    ring = engine.add_ring((origin[0] * CELL + CELL // 2, origin[1] * CELL + CELL // 2))
+    for radius in radii:
+        engine.set_radius(ring, radius * CELL)
+        engine.tick()
+    cells = revealed(maze)
+    maze.clear_revealed()
+    return cells
+
+
+def mazes():
+    for seed in range(4):
+        yield genMaze(21, 15, seed=seed)
+        rng = random.Random(seed)
+        yield MazeGrid.from_rows([[rng.random() < 0.25 for _ in range(16)] for _ in range(12)])
+
+
+def origins(maze, count=4):
+    cells = [(x, y) for y in range(maze.height) for x in range(maze.width) if not maze.is_wall(x, y)]
+    return random.Random(maze.width * maze.height).sample(cells, count)
+
+
+@pytest.mark.parametrize("maze", list(mazes()), ids=lambda maze: f"{maze.width}x{maze.height}")
+def test_reveal_matches_brute_force_ray_casting(maze):
+    for origin in origins(maze):
+        cells = echo(maze, origin, [max(maze.width, maze.height) * 2])
+        assert cells == castRays(maze, origin), f"echo from {origin}"
+        # every wall with a clear line from the origin's center to its own is revealed.
+        center = (origin[0] + 0.5, origin[1] + 0.5)
+        for y in range(maze.height):
+            for x in range(maze.width):
+                if maze.is_wall(x, y) and clearLine(maze, center, (x + 0.5, y + 0.5), (x, y)):
+                    assert (x, y) in cells, f"{(x, y)} in plain sight of {origin}"
+
+
+def test_growing_ring_reveals_the_walls_in_range():
+    maze = genMaze(21, 15, seed=5)
+    for origin in origins(maze):
+        radius = 4
+        in_range = {
+            (x, y)
+            for x, y in castRays(maze, origin)
+            if (x - origin[0]) ** 2 + (y - origin[1]) ** 2 <= radius * radius
+        }
+        assert echo(maze, origin, [1, 2.5, radius]) == in_range